@@ -0,0 +1,135 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-01-03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("company"):
+        # Created by the old create_all() on startup, before migrations were tracked
+        raise RuntimeError(
+            "The schema already exists but has no migration history; "
+            "run `alembic stamp 0001` once, then `alembic upgrade head`"
+        )
+    op.create_table(
+        "company",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("company_name", sa.Text(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("password", sa.Text(), nullable=False),
+        sa.Column("phone", sa.Text()),
+        sa.Column("logo", sa.LargeBinary()),
+    )
+    op.create_index("ix_company_id", "company", ["id"])
+
+    op.create_table(
+        "employee",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("company_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("company.id"), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("password", sa.Text(), nullable=False),
+        sa.Column("phone", sa.Text()),
+        sa.Column("department", sa.Text()),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("manager", sa.Text()),
+        sa.Column("location", sa.Text()),
+        sa.Column("job_position", sa.Text()),
+        sa.Column("prof_pic", sa.LargeBinary()),
+        sa.Column("current_status", sa.Integer()),
+    )
+    op.create_index("ix_employee_id", "employee", ["id"])
+
+    op.create_table(
+        "private_info",
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("dob", sa.Date()),
+        sa.Column("address", sa.Text()),
+        sa.Column("nationality", sa.Text()),
+        sa.Column("gender", sa.Text()),
+        sa.Column("martial_status", sa.Boolean()),
+        sa.Column("doj", sa.Date()),
+        sa.Column("bank_acc_no", sa.Text()),
+        sa.Column("bank_name", sa.Text()),
+        sa.Column("ifsc_code", sa.Text()),
+        sa.Column("pan_no", sa.Text()),
+        sa.Column("uan_no", sa.Text()),
+    )
+
+    op.create_table(
+        "leave_table",
+        sa.Column("leave_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), nullable=False),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("leave_type", sa.Text()),
+        sa.Column("end_date", sa.Date()),
+        sa.Column("is_approved", sa.Boolean()),
+    )
+
+    op.create_table(
+        "attendance",
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("start_time", sa.DateTime()),
+        sa.Column("end_time", sa.DateTime()),
+        sa.Column("work_hours", sa.DateTime()),
+        sa.Column("extra_hours", sa.DateTime()),
+        sa.Column("on_leave", sa.Boolean()),
+    )
+
+    op.create_table(
+        "resume",
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("about", sa.Text()),
+        sa.Column("skills", sa.Text()),
+        sa.Column("certification", sa.Text()),
+    )
+
+    op.create_table(
+        "salary",
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("monthly_wage", sa.BigInteger()),
+        sa.Column("yearly_wage", sa.BigInteger()),
+        sa.Column("basic_sal", sa.BigInteger()),
+        sa.Column("hra", sa.BigInteger()),
+        sa.Column("sa", sa.BigInteger()),
+        sa.Column("perf_bonus", sa.BigInteger()),
+        sa.Column("ita", sa.BigInteger()),
+        sa.Column("fa", sa.BigInteger()),
+        sa.Column("pf1", sa.BigInteger()),
+        sa.Column("pf2", sa.BigInteger()),
+        sa.Column("prof_tax", sa.BigInteger()),
+    )
+
+    op.create_table(
+        "summary",
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("present_days", sa.Integer()),
+        sa.Column("leave_count", sa.Integer()),
+        sa.Column("leave_left", sa.Integer()),
+        sa.Column("tot_work_days", sa.Integer()),
+    )
+
+
+def downgrade():
+    op.drop_table("summary")
+    op.drop_table("salary")
+    op.drop_table("resume")
+    op.drop_table("attendance")
+    op.drop_table("leave_table")
+    op.drop_table("private_info")
+    op.drop_index("ix_employee_id", table_name="employee")
+    op.drop_table("employee")
+    op.drop_index("ix_company_id", table_name="company")
+    op.drop_table("company")
@@ -0,0 +1,28 @@
+"""Row version columns for optimistic concurrency
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-01-10
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ("employee", "salary", "resume")
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("version")
@@ -0,0 +1,51 @@
+"""Payroll run tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-01-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "payroll_run",
+        sa.Column("run_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("company_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("company.id"), nullable=False),
+        sa.Column("month", sa.String(), nullable=False),
+        sa.Column("working_days", sa.Integer()),
+        sa.Column("employee_count", sa.Integer()),
+        sa.Column("total_gross", sa.BigInteger()),
+        sa.Column("total_deductions", sa.BigInteger()),
+        sa.Column("total_net", sa.BigInteger()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.UniqueConstraint("company_id", "month", name="uq_payroll_run_company_month"),
+    )
+
+    op.create_table(
+        "payroll",
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("payroll_run.run_id"), primary_key=True),
+        sa.Column("emp_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("present_days", sa.Integer()),
+        sa.Column("leave_days", sa.Integer()),
+        sa.Column("paid_days", sa.Integer()),
+        sa.Column("overtime_hours", sa.Float()),
+        sa.Column("gross_pay", sa.BigInteger()),
+        sa.Column("overtime_pay", sa.BigInteger()),
+        sa.Column("deductions", sa.BigInteger()),
+        sa.Column("net_pay", sa.BigInteger()),
+    )
+
+
+def downgrade():
+    op.drop_table("payroll")
+    op.drop_table("payroll_run")
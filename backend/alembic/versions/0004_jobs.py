@@ -0,0 +1,41 @@
+"""Background job table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-01-24
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job",
+        sa.Column("job_id", sa.String(), primary_key=True),
+        sa.Column("company_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("company.id"), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("params", sa.Text()),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress_done", sa.Integer()),
+        sa.Column("progress_total", sa.Integer()),
+        sa.Column("result_path", sa.Text()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_job_status", "job", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_job_status", table_name="job")
+    op.drop_table("job")
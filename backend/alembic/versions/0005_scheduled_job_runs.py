@@ -0,0 +1,34 @@
+"""Scheduled job run history
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-01-31
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scheduled_job_run",
+        sa.Column("run_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("job_name", sa.String(), nullable=False),
+        sa.Column("scheduled_for", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("processed", sa.Integer()),
+        sa.Column("error", sa.Text()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.UniqueConstraint("job_name", "scheduled_for", name="uq_scheduled_job_run_slot"),
+    )
+
+
+def downgrade():
+    op.drop_table("scheduled_job_run")
@@ -0,0 +1,92 @@
+"""Monthly range partitioning of attendance (Postgres) and archive index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-02-07
+
+On Postgres the attendance table is rebuilt as a table partitioned by month
+on `date`, with one partition per month that has data plus a DEFAULT
+partition as a safety net. Other databases keep the plain table.
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def upgrade():
+    op.create_table(
+        "attendance_archive",
+        sa.Column("month", sa.String(), primary_key=True),
+        sa.Column("path", sa.Text(), nullable=False),
+        sa.Column("row_count", sa.Integer()),
+        sa.Column("archived_at", sa.DateTime()),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE attendance RENAME TO attendance_legacy")
+    op.execute("ALTER TABLE attendance_legacy RENAME CONSTRAINT attendance_pkey TO attendance_legacy_pkey")
+    op.execute("""
+        CREATE TABLE attendance (
+            emp_id VARCHAR NOT NULL REFERENCES employee (id),
+            date DATE NOT NULL,
+            start_time TIMESTAMP WITHOUT TIME ZONE,
+            end_time TIMESTAMP WITHOUT TIME ZONE,
+            work_hours TIMESTAMP WITHOUT TIME ZONE,
+            extra_hours TIMESTAMP WITHOUT TIME ZONE,
+            on_leave BOOLEAN,
+            CONSTRAINT attendance_pkey PRIMARY KEY (emp_id, date)
+        ) PARTITION BY RANGE (date)
+    """)
+    op.execute("CREATE TABLE attendance_default PARTITION OF attendance DEFAULT")
+
+    # One partition per month from the oldest row through next month
+    oldest = bind.execute(sa.text("SELECT MIN(date) FROM attendance_legacy")).scalar()
+    month = (oldest or date.today()).replace(day=1)
+    last = _next_month(date.today().replace(day=1))
+    while month <= last:
+        following = _next_month(month)
+        op.execute(
+            f"CREATE TABLE attendance_y{month.year:04d}m{month.month:02d} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+
+    op.execute("INSERT INTO attendance SELECT emp_id, date, start_time, end_time, work_hours, extra_hours, on_leave FROM attendance_legacy")
+    op.execute("DROP TABLE attendance_legacy")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE attendance RENAME TO attendance_partitioned")
+        op.execute("ALTER TABLE attendance_partitioned RENAME CONSTRAINT attendance_pkey TO attendance_partitioned_pkey")
+        op.execute("""
+            CREATE TABLE attendance (
+                emp_id VARCHAR NOT NULL REFERENCES employee (id),
+                date DATE NOT NULL,
+                start_time TIMESTAMP WITHOUT TIME ZONE,
+                end_time TIMESTAMP WITHOUT TIME ZONE,
+                work_hours TIMESTAMP WITHOUT TIME ZONE,
+                extra_hours TIMESTAMP WITHOUT TIME ZONE,
+                on_leave BOOLEAN,
+                CONSTRAINT attendance_pkey PRIMARY KEY (emp_id, date)
+            )
+        """)
+        op.execute("INSERT INTO attendance SELECT * FROM attendance_partitioned")
+        op.execute("DROP TABLE attendance_partitioned CASCADE")
+
+    op.drop_table("attendance_archive")
@@ -0,0 +1,26 @@
+"""Composite indexes for company-scoped queries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-02-10
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_employee_company_department", "employee", ["company_id", "department"])
+    op.create_index("ix_employee_company_status", "employee", ["company_id", "current_status"])
+    op.create_index("ix_leave_table_emp_start", "leave_table", ["emp_id", "start_date"])
+
+
+def downgrade():
+    op.drop_index("ix_leave_table_emp_start", table_name="leave_table")
+    op.drop_index("ix_employee_company_status", table_name="employee")
+    op.drop_index("ix_employee_company_department", table_name="employee")
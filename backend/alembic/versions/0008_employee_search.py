@@ -0,0 +1,38 @@
+"""Text search indexes for employee search (Postgres)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-02-14
+
+A 'simple' tsvector index serves prefix matches and a pg_trgm index serves
+typo-tolerant matches, both over the same expression that
+services/employee_search.py queries. Other databases search in process.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = (
+    "lower(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(department, '') || ' ' || "
+    "coalesce(job_position, '') || ' ' || coalesce(location, '') || ' ' || coalesce(manager, ''))"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX ix_employee_search_tsv ON employee USING gin (to_tsvector('simple', {SEARCH_DOCUMENT}))")
+    op.execute(f"CREATE INDEX ix_employee_search_trgm ON employee USING gin (({SEARCH_DOCUMENT}) gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_employee_search_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_employee_search_tsv")
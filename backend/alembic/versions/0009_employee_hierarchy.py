@@ -0,0 +1,90 @@
+"""Manager foreign key and reporting-tree closure table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-02-18
+
+Existing free-text managers are linked where the name matches exactly one
+employee of the same company; links that would form a cycle are dropped.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+BATCH = 5000
+
+
+def upgrade():
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.add_column(sa.Column("manager_id", sa.String()))
+        batch_op.create_foreign_key("fk_employee_manager_id", "employee", ["manager_id"], ["id"])
+        batch_op.create_index("ix_employee_manager_id", ["manager_id"])
+
+    hierarchy = op.create_table(
+        "employee_hierarchy",
+        sa.Column("ancestor_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("descendant_id", sa.String(), sa.ForeignKey("employee.id"), primary_key=True),
+        sa.Column("depth", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_employee_hierarchy_descendant", "employee_hierarchy", ["descendant_id", "depth"])
+
+    # Backfill manager_id from unambiguous manager names
+    bind = op.get_bind()
+    employee = sa.table(
+        "employee",
+        sa.column("id", sa.String()), sa.column("company_id"), sa.column("name", sa.Text()),
+        sa.column("manager", sa.Text()), sa.column("manager_id", sa.String()),
+    )
+    rows = bind.execute(sa.select(employee.c.id, employee.c.company_id, employee.c.name, employee.c.manager)).all()
+    by_name: dict = {}
+    for emp_id, company_id, name, _ in rows:
+        by_name.setdefault((company_id, (name or "").strip().lower()), []).append(emp_id)
+
+    parent = {}
+    for emp_id, company_id, _, manager in rows:
+        matches = by_name.get((company_id, (manager or "").strip().lower()), [])
+        if len(matches) == 1 and matches[0] != emp_id:
+            parent[emp_id] = matches[0]
+
+    # Drop the link that closes a cycle
+    for emp_id in list(parent):
+        seen = {emp_id}
+        node = parent.get(emp_id)
+        while node is not None:
+            if node in seen:
+                parent.pop(emp_id, None)
+                break
+            seen.add(node)
+            node = parent.get(node)
+
+    updates = [{"b_id": emp_id, "b_manager_id": manager_id} for emp_id, manager_id in parent.items()]
+    for start in range(0, len(updates), BATCH):
+        bind.execute(
+            employee.update().where(employee.c.id == sa.bindparam("b_id")).values(manager_id=sa.bindparam("b_manager_id")),
+            updates[start:start + BATCH]
+        )
+
+    closure = []
+    for emp_id, *_ in rows:
+        closure.append({"ancestor_id": emp_id, "descendant_id": emp_id, "depth": 0})
+        node, depth = parent.get(emp_id), 1
+        while node is not None:
+            closure.append({"ancestor_id": node, "descendant_id": emp_id, "depth": depth})
+            node, depth = parent.get(node), depth + 1
+    for start in range(0, len(closure), BATCH):
+        op.bulk_insert(hierarchy, closure[start:start + BATCH])
+
+
+def downgrade():
+    op.drop_index("ix_employee_hierarchy_descendant", table_name="employee_hierarchy")
+    op.drop_table("employee_hierarchy")
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.drop_index("ix_employee_manager_id")
+        batch_op.drop_constraint("fk_employee_manager_id", type_="foreignkey")
+        batch_op.drop_column("manager_id")
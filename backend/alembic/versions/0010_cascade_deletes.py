@@ -0,0 +1,72 @@
+"""ON DELETE CASCADE foreign keys and employee soft delete
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-02-21
+
+Deleting an employee (or company) now removes dependent rows in the
+database instead of through the ORM. Foreign keys created without a name
+have the dialect's default name on Postgres; on SQLite they are matched
+through a naming convention while batch mode rebuilds the table.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# table -> [(column, referred table, referred column, ON DELETE action)]
+FOREIGN_KEYS = {
+    "employee": [("company_id", "company", "id", "CASCADE"), ("manager_id", "employee", "id", "SET NULL")],
+    "private_info": [("emp_id", "employee", "id", "CASCADE")],
+    "leave_table": [("emp_id", "employee", "id", "CASCADE")],
+    "attendance": [("emp_id", "employee", "id", "CASCADE")],
+    "resume": [("emp_id", "employee", "id", "CASCADE")],
+    "salary": [("emp_id", "employee", "id", "CASCADE")],
+    "summary": [("emp_id", "employee", "id", "CASCADE")],
+    "payroll_run": [("company_id", "company", "id", "CASCADE")],
+    "payroll": [("run_id", "payroll_run", "run_id", "CASCADE"), ("emp_id", "employee", "id", "CASCADE")],
+    "job": [("company_id", "company", "id", "CASCADE")],
+    "employee_hierarchy": [("ancestor_id", "employee", "id", "CASCADE"), ("descendant_id", "employee", "id", "CASCADE")],
+}
+
+
+def _fk_name(dialect: str, table: str, column: str, referred: str) -> str:
+    if (table, column) == ("employee", "manager_id"):
+        return "fk_employee_manager_id"  # Named in 0009
+    if dialect == "postgresql":
+        return f"{table}_{column}_fkey"
+    return f"fk_{table}_{column}_{referred}"
+
+
+def _replace_foreign_keys(cascade: bool):
+    dialect = op.get_bind().dialect.name
+    for table, keys in FOREIGN_KEYS.items():
+        with op.batch_alter_table(table, naming_convention=SQLITE_NAMING) as batch_op:
+            for column, referred, referred_column, action in keys:
+                name = _fk_name(dialect, table, column, referred)
+                batch_op.drop_constraint(name, type_="foreignkey")
+                batch_op.create_foreign_key(
+                    name, referred, [column], [referred_column],
+                    ondelete=action if cascade else None
+                )
+
+
+def upgrade():
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.add_column(sa.Column("deleted_at", sa.DateTime()))
+        batch_op.create_index("ix_employee_deleted_at", ["deleted_at"])
+    _replace_foreign_keys(cascade=True)
+
+
+def downgrade():
+    _replace_foreign_keys(cascade=False)
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.drop_index("ix_employee_deleted_at")
+        batch_op.drop_column("deleted_at")
@@ -0,0 +1,32 @@
+"""Revoked token table
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-02-24
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "revoked_token",
+        sa.Column("jti", sa.String(), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_revoked_token_expires_at", "revoked_token", ["expires_at"])
+    op.create_index("ix_revoked_token_revoked_at", "revoked_token", ["revoked_at"])
+
+
+def downgrade():
+    op.drop_index("ix_revoked_token_revoked_at", table_name="revoked_token")
+    op.drop_index("ix_revoked_token_expires_at", table_name="revoked_token")
+    op.drop_table("revoked_token")
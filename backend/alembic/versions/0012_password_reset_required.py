@@ -0,0 +1,27 @@
+"""Employee password_reset_required flag
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-02-26
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "employee",
+        sa.Column("password_reset_required", sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.drop_column("password_reset_required")
@@ -0,0 +1,36 @@
+"""Attendance devices for punch uploads
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-03-02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "attendance_device",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column(
+            "company_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("company.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("key_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_attendance_device_company_id", "attendance_device", ["company_id"])
+
+
+def downgrade():
+    op.drop_index("ix_attendance_device_company_id", table_name="attendance_device")
+    op.drop_table("attendance_device")
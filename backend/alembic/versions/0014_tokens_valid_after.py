@@ -0,0 +1,24 @@
+"""Employee tokens_valid_after, so a password change ends refresh tokens
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-03-09
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("employee", sa.Column("tokens_valid_after", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("employee") as batch_op:
+        batch_op.drop_column("tokens_valid_after")
@@ -0,0 +1,26 @@
+"""Summary counts of archived attendance
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-03-12
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("summary", sa.Column("archived_present_days", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("summary", sa.Column("archived_leave_count", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("summary") as batch_op:
+        batch_op.drop_column("archived_leave_count")
+        batch_op.drop_column("archived_present_days")
@@ -1,53 +1,136 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import hmac
+import uuid
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from config import settings
 from database.database import get_db
-from database.models import Company, Employee
+from database.models import Company, Employee, AttendanceDevice
+from database.tenancy import set_tenant
+from auth.revocation import denylist
+from utils.timing import timed, mark_authenticated
 
 token_auth_scheme = HTTPBearer()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    with timed("bcrypt"):
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password with BCRYPT_ROUNDS (or the given cost)"""
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
+    with timed("bcrypt"):
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create JWT access token"""
+_dummy_hashes: dict[int, str] = {}
+
+
+def dummy_password_hash() -> str:
+    """
+    A hash with the BCRYPT_ROUNDS cost that no password matches; logins for
+    unknown accounts verify against it so they take as long as real ones
+    """
+    rounds = settings.BCRYPT_ROUNDS
+    if rounds not in _dummy_hashes:
+        # A real salt with an all-zero checksum: checking it costs a full bcrypt run
+        _dummy_hashes[rounds] = bcrypt.gensalt(rounds=rounds).decode('utf-8') + "." * 31
+    return _dummy_hashes[rounds]
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if a bcrypt hash ($2b$<cost>$...) was made with another cost than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, token_type: str = "access"):
+    """Create JWT access token (or a refresh token with token_type="refresh")"""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; iat lets a password change end older ones
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex, "type": token_type})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str):
-    """Decode JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+def create_refresh_token(data: dict):
+    """Create a long-lived JWT that can only be exchanged at POST /auth/refresh"""
+    return create_access_token(data, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS), token_type="refresh")
+
+
+def decode_token(token: str, token_type: str = "access"):
+    """Decode JWT token; rejects revoked tokens and tokens of another type"""
+    with timed("token"):
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            payload = None
+    # Tokens issued before the type claim are access tokens
+    if (
+        payload is None
+        or payload.get("type", "access") != token_type
+        or payload.get("jti") in denylist
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+
+def bearer_payload(headers) -> Optional[dict]:
+    """Claims of a valid bearer access token in the request headers, else None (no DB access)"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token)
+    except HTTPException:
+        return None
+
+
+def token_caller(headers) -> Optional[str]:
+    """Role and subject of a valid bearer token in the request headers, else None (no DB access)"""
+    payload = bearer_payload(headers)
+    if payload is None:
+        return None
+    return f"{payload.get('role')}:{payload.get('sub')}"
+
+
+def token_company(headers) -> Optional[str]:
+    """Company of a valid admin or employee bearer token in the request headers, else None (no DB access)"""
+    payload = bearer_payload(headers)
+    if payload is None:
+        return None
+    if payload.get("role") == "admin":
+        return payload.get("sub")
+    return payload.get("company_id")
+
+
+def require_password_set(payload: dict):
+    """Tokens of employees still on their initial password only work for changing it"""
+    if payload.get("reset_required"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Password change required"
+        )
 
 
 async def get_current_company(
@@ -67,13 +150,16 @@ async def get_current_company(
             detail="Invalid authentication credentials"
         )
     
-    company = db.query(Company).filter(Company.id == company_id).first()
+    with timed("auth"):
+        company = db.query(Company).filter(Company.id == company_id).first()
     if company is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Company not found"
         )
     
+    mark_authenticated()
+    set_tenant(db, company.id)
     return company
 
 
@@ -84,6 +170,7 @@ async def get_current_employee(
     """Get current authenticated employee"""
     token = credentials.credentials
     payload = decode_token(token)
+    require_password_set(payload)
     
     employee_id: str = payload.get("sub")
     role: str = payload.get("role")
@@ -94,11 +181,38 @@ async def get_current_employee(
             detail="Invalid authentication credentials"
         )
     
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    with timed("auth"):
+        employee = db.query(Employee).filter(Employee.id == employee_id, Employee.deleted_at.is_(None)).first()
     if employee is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Employee not found"
         )
     
+    mark_authenticated()
+    set_tenant(db, employee.company_id)
     return employee
+
+
+def hash_device_secret(secret: str) -> str:
+    """Device secrets are random, so a plain SHA-256 is enough (and cheap per upload)"""
+    return hashlib.sha256(secret.encode('utf-8')).hexdigest()
+
+
+async def get_current_device(
+    x_device_key: str = Header(..., description="Device key: <device_id>.<secret>"),
+    db: Session = Depends(get_db)
+):
+    """Get the attendance device authenticated by its X-Device-Key header"""
+    device_id, _, secret = x_device_key.partition(".")
+    with timed("auth"):
+        device = db.get(AttendanceDevice, device_id) if secret else None
+    if device is None or not hmac.compare_digest(device.key_hash, hash_device_secret(secret)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid device key"
+        )
+    
+    mark_authenticated()
+    set_tenant(db, device.company_id)
+    return device
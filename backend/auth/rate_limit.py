@@ -0,0 +1,225 @@
+"""
+Login throttling
+
+Every login attempt takes a token from two buckets, one for the account
+(email or employee ID) and one for the client IP, before the database or
+bcrypt is touched; an empty bucket is answered with 429 right away. A
+successful login gives the tokens back, so only failures use up the budget.
+
+Buckets live in this process by default. Set LOGIN_RATE_LIMIT_REDIS_URL
+(and install `redis`) to share them between worker processes and hosts.
+
+bcrypt itself runs in the threadpool, at most LOGIN_MAX_CONCURRENT_HASHES at
+a time per process; an attempt that cannot get a slot within
+LOGIN_HASH_WAIT_SECONDS gets 503 instead of queueing behind a flood.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from auth.auth import verify_password, get_password_hash
+
+try:
+    import redis
+except ImportError:  # redis is optional, buckets stay per process without it
+    redis = None
+
+
+@dataclass(frozen=True)
+class BucketRule:
+    capacity: float
+    per_second: float  # Refill rate
+
+
+class MemoryBucketBackend:
+    """Token buckets in a bounded, thread-safe LRU of key -> (tokens, updated_at)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rule: BucketRule, cost: float = 1.0) -> float:
+        """Take `cost` tokens (negative gives them back); returns 0 or the seconds until enough are available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (rule.capacity, now))
+            tokens = min(rule.capacity, tokens + (now - updated_at) * rule.per_second)
+            if cost > 0 and tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / rule.per_second
+            self._buckets[key] = (min(rule.capacity, tokens - cost), now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Same arithmetic as MemoryBucketBackend.take, atomically in Redis
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * per_second)
+local wait = 0
+if cost > 0 and tokens < cost then
+    wait = (cost - tokens) / per_second
+else
+    tokens = math.min(capacity, tokens - cost)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketBackend:
+    """Token buckets shared through Redis"""
+
+    def __init__(self, url: str, prefix: str = "login-bucket:"):
+        if redis is None:
+            raise RuntimeError("LOGIN_RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, rule: BucketRule, cost: float = 1.0) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[rule.capacity, rule.per_second, cost, time.time()]))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+class LoginCounters:
+    """Per-process login outcome counters"""
+
+    FIELDS = ("succeeded", "failed", "rejected_account", "rejected_ip", "rejected_busy")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def add(self, field: str):
+        with self._lock:
+            self._counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+class LoginGuard:
+    """Rate limits login attempts and bounds concurrent bcrypt work"""
+
+    def __init__(self):
+        self.counters = LoginCounters()
+        self._backend = None
+        self._hash_slots = None
+        self._hash_slots_loop = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.LOGIN_RATE_LIMIT_REDIS_URL:
+                self._backend = RedisBucketBackend(settings.LOGIN_RATE_LIMIT_REDIS_URL)
+            else:
+                self._backend = MemoryBucketBackend()
+        return self._backend
+
+    @property
+    def account_rule(self) -> BucketRule:
+        return BucketRule(settings.LOGIN_ACCOUNT_BURST, settings.LOGIN_ACCOUNT_PER_MINUTE / 60)
+
+    @property
+    def ip_rule(self) -> BucketRule:
+        return BucketRule(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE / 60)
+
+    def _keys(self, request: Request, account: str):
+        client_ip = request.client.host if request.client else "unknown"
+        return (
+            (f"account:{account.strip().lower()}", self.account_rule, "rejected_account"),
+            (f"ip:{client_ip}", self.ip_rule, "rejected_ip"),
+        )
+
+    def check(self, request: Request, account: str):
+        """Take a token for the account and the client IP, or raise 429"""
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+        taken = []
+        for key, rule, counter in self._keys(request, account):
+            wait = self.backend.take(key, rule)
+            if wait > 0:
+                for taken_key, taken_rule in taken:
+                    self.backend.take(taken_key, taken_rule, cost=-1)
+                self.counters.add(counter)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, try again later",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+            taken.append((key, rule))
+
+    def succeeded(self, request: Request, account: str):
+        """Give back the tokens of a successful login"""
+        self.counters.add("succeeded")
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+        for key, rule, _ in self._keys(request, account):
+            self.backend.take(key, rule, cost=-1)
+
+    def failed(self):
+        self.counters.add("failed")
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._hash_slots_loop is not loop:
+            self._hash_slots = asyncio.Semaphore(settings.LOGIN_MAX_CONCURRENT_HASHES)
+            self._hash_slots_loop = loop
+        return self._hash_slots
+
+    async def rehash(self, plain_password: str) -> Optional[str]:
+        """Hash with the current BCRYPT_ROUNDS if a slot is free right now; None if busy (try next login)"""
+        slots = self._slots()
+        if slots.locked():
+            return None
+        async with slots:
+            return await run_in_threadpool(get_password_hash, plain_password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password in the threadpool, with bounded concurrency per process"""
+        self._slots()
+        try:
+            await asyncio.wait_for(self._hash_slots.acquire(), timeout=settings.LOGIN_HASH_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            self.counters.add("rejected_busy")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            return await run_in_threadpool(verify_password, plain_password, hashed_password)
+        finally:
+            self._hash_slots.release()
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,145 @@
+"""
+Token revocation
+
+Revoked token IDs (the `jti` claim) are stored in `revoked_token` until the
+token would have expired anyway. Each process keeps the unexpired ones in an
+in-memory set, so decode_token checks revocation with a dict lookup instead
+of a query. A background thread pulls rows revoked since its last sync every
+TOKEN_DENYLIST_SYNC_SECONDS; revocations made by this process are added to
+the set immediately. Short-lived access tokens keep the set small.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from database.database import SessionLocal, get_engine
+from database.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read a little before the last sync so rows committed late are not missed
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class TokenDenylist:
+    """Per-process set of revoked, not yet expired token IDs"""
+
+    def __init__(self):
+        self._expiry: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._synced_at: Optional[datetime] = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            self._expiry[jti] = expires_at
+
+    def sync(self, db: Session) -> int:
+        """Load rows revoked since the last sync and drop expired entries; returns rows read"""
+        now = datetime.utcnow()
+        query = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        if self._synced_at is not None:
+            query = query.where(RevokedToken.revoked_at >= self._synced_at - SYNC_OVERLAP)
+        rows = db.execute(query).all()
+        with self._lock:
+            for jti, expires_at in rows:
+                self._expiry[jti] = expires_at
+            for jti in [jti for jti, expires_at in self._expiry.items() if expires_at <= now]:
+                del self._expiry[jti]
+            self._synced_at = now
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
+            self._synced_at = None
+
+
+denylist = TokenDenylist()
+
+
+def revoke_token(db: Session, payload: dict):
+    """Revoke a decoded token by its jti; tokens issued without one are left to expire. Callers commit"""
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    db.merge(RevokedToken(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()))
+    denylist.add(jti, expires_at)
+
+
+def claim_token(db: Session, payload: dict) -> bool:
+    """
+    Revoke a decoded token with a plain INSERT and commit; False if it was
+    already revoked (another request got there first, even in another process)
+    """
+    jti = payload.get("jti")
+    if jti is None:
+        return True
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    try:
+        db.execute(insert(RevokedToken).values(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    denylist.add(jti, expires_at)
+    return True
+
+
+def purge_expired(db: Session) -> int:
+    """Delete revocations of tokens that have expired anyway"""
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
+
+
+class DenylistSyncer:
+    """Background thread that keeps this process's denylist in sync with the table"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Sync in the background, starting right away; startup doesn't wait for
+        the database, and a failed sync is logged and retried on the next tick
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-denylist", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _sync(self):
+        try:
+            with SessionLocal() as db:
+                denylist.sync(db)
+        except Exception:
+            logger.exception("Token denylist sync failed")
+
+    def _run(self):
+        get_engine()
+        self._sync()
+        while not self._stop.wait(settings.TOKEN_DENYLIST_SYNC_SECONDS):
+            self._sync()
+
+
+denylist_syncer = DenylistSyncer()
@@ -1,10 +1,13 @@
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from database.database import get_db
 from database.models import Company, Employee
-from auth.auth import decode_token
+from auth.auth import decode_token, require_password_set
+from database.tenancy import set_tenant
+from utils.timing import mark_authenticated
 
 security = HTTPBearer()
 
@@ -17,8 +20,21 @@ async def get_current_user(
     Get current user (either Company or Employee)
     Returns a dict with 'user_type', 'user_id', and 'role'
     """
-    token = credentials.credentials
+    return resolve_user(credentials.credentials, db, allow_password_reset=False)
+
+
+async def get_current_user_for_password_change(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """get_current_user that also accepts employees who still have to replace their initial password"""
+    return resolve_user(credentials.credentials, db, allow_password_reset=True)
+
+
+def resolve_user(token: str, db: Session, allow_password_reset: bool):
     payload = decode_token(token)
+    if not allow_password_reset:
+        require_password_set(payload)
     
     if not payload:
         raise HTTPException(
@@ -37,8 +53,37 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Scope the request's session to the user's company
+    if role == "admin":
+        try:
+            company_id = uuid.UUID(user_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    else:
+        # Tokens issued before the company_id claim was added fall back to a lookup
+        company_id = payload.get("company_id")
+        if company_id is not None:
+            company_id = uuid.UUID(company_id)
+        else:
+            company_id = db.query(Employee.company_id).filter(
+                Employee.id == user_id, Employee.deleted_at.is_(None)
+            ).scalar()
+        if company_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    mark_authenticated()
+    set_tenant(db, company_id)
+    
     return {
         "user_id": user_id,
         "role": role,
-        "user_type": "company" if role == "admin" else "employee"
+        "user_type": "company" if role == "admin" else "employee",
+        "company_id": company_id
     }
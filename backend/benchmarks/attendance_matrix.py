@@ -0,0 +1,104 @@
+"""
+Attendance matrix benchmark
+
+Seeds a scratch SQLite database (or the database given with --database-url)
+with one company, N employees and a month of attendance, then compares
+building the month grid from one /attendance/company-style query per day
+against build_matrix (one query plus pivot) and a cached get_matrix_body.
+
+Usage (from backend/):
+    python -m benchmarks.attendance_matrix [--employees 10000] [--database-url sqlite:///matrix_bench.db]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from benchmarks.payroll import seed, YEAR, MONTH
+from database.database import Base
+from database.models import Attendance, Employee
+from services.attendance_matrix import build_matrix, get_matrix_body, matrix_cache
+from utils.dates import month_bounds
+from utils.fast_json import dumps
+
+
+def per_day_queries(session: Session, company_id) -> int:
+    """What a client does today: the company view once per day of the month"""
+    first_day, last_day = month_bounds(YEAR, MONTH)
+    cells = 0
+    day = first_day
+    while day <= last_day:
+        session.query(Employee).filter(Employee.company_id == company_id).all()
+        records = session.query(Attendance).join(Employee).filter(
+            Employee.company_id == company_id,
+            Attendance.date == day
+        ).all()
+        # AttendanceRecord needs the employee's name and department (lazy load per row)
+        for record in records:
+            record.employee.name
+        cells += len(records)
+        day += timedelta(days=1)
+    return cells
+
+
+def timed(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the monthly attendance matrix")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            company_id, attendance_rows = seed(session, args.employees)
+            print(f"seeded {args.employees} employees, {attendance_rows} attendance rows in {time.perf_counter() - start:.1f} s")
+
+            def per_day():
+                session.expunge_all()
+                per_day_queries(session, company_id)
+
+            def uncached():
+                dumps(build_matrix(session, company_id, YEAR, MONTH))
+
+            def cached():
+                get_matrix_body(session, company_id, YEAR, MONTH)
+
+            per_day_time = timed(per_day, 1)
+            matrix_time = timed(uncached, args.runs)
+            matrix_cache.clear()
+            get_matrix_body(session, company_id, YEAR, MONTH)
+            cached_time = timed(cached, args.runs)
+            size = len(get_matrix_body(session, company_id, YEAR, MONTH))
+
+        print(f"{'per-day company view (x days)':32} {per_day_time * 1000:10.1f} ms")
+        print(f"{'matrix, built':32} {matrix_time * 1000:10.1f} ms   ({size / 1024:,.0f} KiB JSON)")
+        print(f"{'matrix, cached':32} {cached_time * 1000:10.3f} ms")
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Check-in storm benchmark: many employees checking in at shift start
+
+Runs the app in-process against a scratch SQLite database (a file, so every
+commit is a real fsync) with one company of N employees, then fires one
+POST /attendance/checkin per employee from --concurrency clients at once.
+Compares the per-request transaction path with CHECKIN_BATCHING (group
+commit) and reports requests and commits per second and p50/p99 latency.
+
+Usage (from backend/):
+    python -m benchmarks.checkin_storm [--employees 3000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_scratch.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch.name}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["JOB_WORKER_ENABLED"] = "False"
+os.environ["SCHEDULER_ENABLED"] = "False"
+os.environ["ACCESS_LOG_ENABLED"] = "False"
+
+import uuid  # noqa: E402
+import httpx  # noqa: E402
+from sqlalchemy import event, insert, delete, update  # noqa: E402
+from config import settings  # noqa: E402
+from database.database import Base, SessionLocal, get_engine  # noqa: E402
+from database.models import Company, Employee, Attendance  # noqa: E402
+from auth.auth import create_access_token  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed(employees: int) -> list[str]:
+    with SessionLocal() as db:
+        company_id = uuid.uuid4()
+        db.add(Company(id=company_id, company_name="Bench", email="bench@example.com", password="x"))
+        db.flush()
+        emp_ids = [f"BEEMP{i:06d}" for i in range(employees)]
+        db.execute(insert(Employee), [
+            {"id": emp_id, "company_id": company_id, "name": emp_id, "password": "x",
+             "email": f"{emp_id}@example.com", "current_status": 0}
+            for emp_id in emp_ids
+        ])
+        db.commit()
+    return [
+        create_access_token({"sub": emp_id, "role": "employee", "company_id": str(company_id)})
+        for emp_id in emp_ids
+    ]
+
+
+def reset():
+    with SessionLocal() as db:
+        db.execute(delete(Attendance))
+        db.execute(update(Employee).values(current_status=0))
+        db.commit()
+
+
+async def storm(tokens: list[str], concurrency: int) -> tuple[float, list[float]]:
+    queue = list(reversed(tokens))
+    latencies = []
+
+    async def client():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            while queue:
+                token = queue.pop()
+                start = time.perf_counter()
+                response = await http.post("/attendance/checkin", headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 200, response.text
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+def run(label: str, tokens: list[str], concurrency: int, commits: list):
+    reset()
+    commits.clear()
+    elapsed, latencies = asyncio.run(storm(tokens, concurrency))
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"  {label:26} {len(latencies) / elapsed:7.0f} req/s   {len(commits) / elapsed:7.0f} commits/s "
+          f"({len(commits)} total)   p50 {statistics.median(latencies) * 1000:6.0f} ms   p99 {p99 * 1000:6.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check-in throughput and latency at shift start")
+    parser.add_argument("--employees", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=200, help="Check-ins in flight at once")
+    args = parser.parse_args()
+
+    try:
+        Base.metadata.create_all(get_engine())
+        tokens = seed(args.employees)
+        commits = []
+        event.listen(get_engine(), "commit", lambda connection: commits.append(1))
+        print(f"check-in storm ({args.employees} employees, {args.concurrency} concurrent)")
+
+        settings.CHECKIN_BATCHING = False
+        run("per-request transaction", tokens, args.concurrency, commits)
+
+        settings.CHECKIN_BATCHING = True
+        run(f"group commit (<= {settings.CHECKIN_BATCH_SIZE}, "
+            f"{settings.CHECKIN_BATCH_LATENCY_MS:g} ms)", tokens, args.concurrency, commits)
+    finally:
+        get_engine().dispose()
+        os.unlink(_scratch.name)
+
+
+if __name__ == "__main__":
+    main()
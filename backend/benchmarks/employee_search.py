@@ -0,0 +1,102 @@
+"""
+Employee search benchmark
+
+Seeds a scratch SQLite database (or the database given with --database-url)
+with one company of N employees with generated names, departments,
+positions, locations and managers, then times search_employees for exact,
+prefix, multi-word and misspelled queries. On SQLite the first search also
+builds the in-process index, which is reported separately.
+
+Usage (from backend/):
+    python -m benchmarks.employee_search [--employees 100000] [--database-url sqlite:///search_bench.db]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from database.database import Base
+from database.models import Company, Employee
+from services.employee_search import search_employees, search_indexes
+
+BATCH = 10000
+FIRST_NAMES = (
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Shaurya",
+    "Ananya", "Diya", "Saanvi", "Aadhya", "Pari", "Myra", "Anika", "Navya", "Kiara", "Riya",
+    "James", "Mary", "Robert", "Patricia", "Michael", "Jennifer", "William", "Linda", "David", "Elizabeth"
+)
+LAST_NAMES = (
+    "Patel", "Shah", "Mehta", "Desai", "Joshi", "Panchal", "Sharma", "Verma", "Gupta", "Iyer",
+    "Nair", "Reddy", "Rao", "Kumar", "Singh", "Smith", "Johnson", "Williams", "Brown", "Jones"
+)
+DEPARTMENTS = ("Engineering", "Sales", "Support", "Finance", "Human Resources", "Legal", "Marketing", "Operations")
+POSITIONS = ("Engineer", "Senior Engineer", "Manager", "Analyst", "Designer", "Accountant", "Recruiter", "Consultant")
+LOCATIONS = ("Ahmedabad", "Gandhinagar", "Mumbai", "Pune", "Bengaluru", "Hyderabad", "Chennai", "Delhi")
+QUERIES = ("panchal", "pan", "ananya sh", "enginer", "ahmedbad", "aditya mehta pune", "finance", "zzzz")
+
+
+def seed(session: Session, employees: int) -> uuid.UUID:
+    rng = random.Random(42)
+    company_id = uuid.uuid4()
+    session.execute(insert(Company), [{"id": company_id, "company_name": "Bench", "email": "bench@example.com", "password": "x"}])
+    rows = []
+    for i in range(employees):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append({
+            "id": f"BE{i:07d}", "company_id": company_id, "name": f"{first} {last}", "password": "x",
+            "email": f"{first.lower()}.{last.lower()}{i}@example.com", "department": rng.choice(DEPARTMENTS),
+            "job_position": rng.choice(POSITIONS), "location": rng.choice(LOCATIONS),
+            "manager": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        })
+    for start in range(0, len(rows), BATCH):
+        session.execute(insert(Employee), rows[start:start + BATCH])
+    session.commit()
+    return company_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark employee search")
+    parser.add_argument("--employees", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            company_id = seed(session, args.employees)
+            print(f"seeded {args.employees} employees in {time.perf_counter() - start:.1f} s")
+
+            search_indexes.clear()
+            start = time.perf_counter()
+            search_employees(session, company_id, "warmup", 20, 0)
+            print(f"first search (builds the in-process index on SQLite) {time.perf_counter() - start:.2f} s")
+
+            for q in QUERIES:
+                timings = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    total, results = search_employees(session, company_id, q, 20, 0)
+                    timings.append(time.perf_counter() - start)
+                top = results[0]["name"] if results else "-"
+                print(f"  {q!r:22} {min(timings) * 1000:8.2f} ms   {total:7} matches   top: {top}")
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
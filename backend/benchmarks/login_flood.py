@@ -0,0 +1,129 @@
+"""
+Login flood benchmark: legitimate login latency while another client floods
+the login endpoints with wrong passwords
+
+Runs the app in-process against a scratch SQLite database. One client logs
+in with the right password every --interval seconds from its own IP while
+--attackers concurrent clients send wrong passwords for other accounts from
+a second IP. Compares login throttling off (every attempt runs bcrypt) with
+the default settings, and prints the login counters.
+
+Usage (from backend/):
+    python -m benchmarks.login_flood [--attackers 20] [--seconds 10] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_scratch.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch.name}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["JOB_WORKER_ENABLED"] = "False"
+os.environ["SCHEDULER_ENABLED"] = "False"
+os.environ["ACCESS_LOG_ENABLED"] = "False"
+
+import uuid  # noqa: E402
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+from config import settings  # noqa: E402
+from database.database import Base, SessionLocal, get_engine  # noqa: E402
+from database.models import Company  # noqa: E402
+from auth.rate_limit import login_guard  # noqa: E402
+from main import app  # noqa: E402
+
+USER_IP = "10.0.0.1"
+ATTACKER_IP = "10.6.6.6"
+
+
+def seed(rounds: int, accounts: int):
+    password = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=rounds)).decode()
+    with SessionLocal() as db:
+        for i in range(accounts):
+            db.add(Company(id=uuid.uuid4(), company_name=f"Bench {i}", email=f"admin{i}@example.com", password=password))
+        db.commit()
+
+
+def client_for(ip: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 40000)), base_url="http://bench")
+
+
+async def attacker(index: int, accounts: int, stop: float, statuses: dict):
+    async with client_for(ATTACKER_IP) as client:
+        attempt = 0
+        while time.perf_counter() < stop:
+            email = f"admin{1 + (index + attempt) % (accounts - 1)}@example.com"
+            response = await client.post("/auth/company/login", json={"email": email, "password": "guess"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            attempt += 1
+
+
+async def user(interval: float, stop: float, latencies: list):
+    async with client_for(USER_IP) as client:
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            response = await client.post("/auth/company/login", json={"email": "admin0@example.com", "password": "secret"})
+            assert response.status_code == 200, response.text
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(interval)
+
+
+async def run(attackers: int, seconds: float, interval: float, accounts: int):
+    login_guard.backend.clear()
+    login_guard.counters.reset()
+    stop = time.perf_counter() + seconds
+    latencies, statuses = [], {}
+    await asyncio.gather(
+        user(interval, stop, latencies),
+        *(attacker(i, accounts, stop, statuses) for i in range(attackers))
+    )
+    return latencies, statuses
+
+
+def report(label: str, latencies: list, statuses: dict):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    attempts = sum(statuses.values())
+    print(f"  {label:28} user logins {len(latencies):4d}   p50 {statistics.median(latencies) * 1000:7.0f} ms"
+          f"   p95 {p95 * 1000:7.0f} ms   flood attempts {attempts:6d} {dict(sorted(statuses.items()))}")
+    print(f"  {'':28} counters {login_guard.counters.snapshot()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login latency during a wrong-password flood")
+    parser.add_argument("--attackers", type=int, default=20, help="Concurrent flooding clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between the user's logins")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost of the seeded passwords")
+    parser.add_argument("--accounts", type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        Base.metadata.create_all(get_engine())
+        seed(args.rounds, args.accounts)
+        print(f"login flood ({args.attackers} attackers, {args.seconds:.0f} s, bcrypt cost {args.rounds})")
+
+        latencies, statuses = asyncio.run(run(0, args.seconds / 2, args.interval, args.accounts))
+        report("no flood", latencies, statuses)
+
+        settings.LOGIN_RATE_LIMIT_ENABLED = False
+        settings.LOGIN_MAX_CONCURRENT_HASHES = 10000
+        settings.LOGIN_HASH_WAIT_SECONDS = 3600
+        latencies, statuses = asyncio.run(run(args.attackers, args.seconds, args.interval, args.accounts))
+        report("flood, no throttling", latencies, statuses)
+
+        settings.LOGIN_RATE_LIMIT_ENABLED = True
+        settings.LOGIN_MAX_CONCURRENT_HASHES = 4
+        settings.LOGIN_HASH_WAIT_SECONDS = 2.0
+        latencies, statuses = asyncio.run(run(args.attackers, args.seconds, args.interval, args.accounts))
+        report("flood, throttled", latencies, statuses)
+    finally:
+        get_engine().dispose()
+        os.unlink(_scratch.name)
+
+
+if __name__ == "__main__":
+    main()
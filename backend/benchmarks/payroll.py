@@ -0,0 +1,111 @@
+"""
+Payroll run benchmark
+
+Seeds a scratch SQLite database (or the database given with --database-url)
+with one company, N employees, a month of attendance and some approved
+leave, then times run_payroll for that month.
+
+Usage (from backend/):
+    python -m benchmarks.payroll [--employees 50000] [--database-url sqlite:///payroll_bench.db]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from database.database import Base
+from database.models import Company, Employee, Salary, Attendance, LeaveTable
+from services.payroll import run_payroll
+from utils.dates import month_bounds
+
+YEAR, MONTH = 2026, 1
+BATCH = 10000
+
+
+def insert_batched(session: Session, model, rows):
+    for start in range(0, len(rows), BATCH):
+        session.execute(insert(model), rows[start:start + BATCH])
+
+
+def seed(session: Session, employees: int):
+    """Create one company with `employees` employees and a month of data"""
+    company_id = uuid.uuid4()
+    session.execute(insert(Company), [{"id": company_id, "company_name": "Bench", "email": "bench@example.com", "password": "x"}])
+
+    emp_ids = [f"BEEMP{YEAR}{i:06d}" for i in range(employees)]
+    insert_batched(session, Employee, [
+        {"id": emp_id, "company_id": company_id, "name": emp_id, "password": "x", "email": f"{emp_id}@example.com"}
+        for emp_id in emp_ids
+    ])
+    insert_batched(session, Salary, [
+        {"emp_id": emp_id, "monthly_wage": 50000, "yearly_wage": 600000, "basic_sal": 25000, "hra": 12500,
+         "sa": 5000, "perf_bonus": 4000, "ita": 2000, "fa": 1500, "pf1": 3000, "pf2": 3000, "prof_tax": 200}
+        for emp_id in emp_ids
+    ])
+
+    rng = random.Random(42)
+    first_day, last_day = month_bounds(YEAR, MONTH)
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    weekdays = [day for day in days if day.weekday() < 5]
+    attendance = []
+    for emp_id in emp_ids:
+        for day in weekdays:
+            if rng.random() < 0.9:
+                start = datetime.combine(day, dt_time(9, rng.randint(0, 30)))
+                attendance.append({
+                    "emp_id": emp_id, "date": day, "start_time": start,
+                    "end_time": start + timedelta(hours=rng.uniform(7, 10)), "on_leave": False
+                })
+    insert_batched(session, Attendance, attendance)
+    insert_batched(session, LeaveTable, [
+        {"emp_id": emp_id, "start_date": date(YEAR, MONTH, 12), "end_date": date(YEAR, MONTH, 14),
+         "leave_type": "casual", "is_approved": True}
+        for emp_id in emp_ids[::10]
+    ])
+    session.commit()
+    return company_id, len(attendance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a company-wide payroll run")
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            company_id, attendance_rows = seed(session, args.employees)
+            print(f"seeded {args.employees} employees, {attendance_rows} attendance rows in {time.perf_counter() - start:.1f} s")
+
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run = run_payroll(session, company_id, YEAR, MONTH)
+                timings.append(time.perf_counter() - start)
+
+        print(f"payroll run ({run.employee_count} employees, {run.working_days} working days)")
+        print(f"  min {min(timings):.2f} s   avg {sum(timings) / len(timings):.2f} s   "
+              f"{run.employee_count / min(timings):,.0f} employees/s")
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
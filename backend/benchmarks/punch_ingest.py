@@ -0,0 +1,103 @@
+"""
+Punch ingestion benchmark: POST /attendance/punches throughput
+
+Runs the app in-process against a scratch SQLite database with one company
+of N employees and a registered device, then uploads a month of door swipes
+(an "in" and an "out" per employee and working day, plus resent duplicates)
+in batches and reports punches per second for the full request.
+
+Usage (from backend/):
+    python -m benchmarks.punch_ingest [--employees 10000] [--days 5] [--batch 5000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_scratch.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch.name}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["JOB_WORKER_ENABLED"] = "False"
+os.environ["SCHEDULER_ENABLED"] = "False"
+os.environ["ACCESS_LOG_ENABLED"] = "False"
+
+import uuid  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, func, select  # noqa: E402
+from database.database import Base, SessionLocal, get_engine  # noqa: E402
+from database.models import Company, Employee, AttendanceDevice, Attendance  # noqa: E402
+from auth.auth import hash_device_secret  # noqa: E402
+from main import app  # noqa: E402
+
+DUPLICATE_RATE = 0.05
+
+
+def seed(employees: int) -> tuple[list[str], str]:
+    with SessionLocal() as db:
+        company_id = uuid.uuid4()
+        db.add(Company(id=company_id, company_name="Bench", email="bench@example.com", password="x"))
+        db.flush()
+        emp_ids = [f"BEEMP{i:06d}" for i in range(employees)]
+        db.execute(insert(Employee), [
+            {"id": emp_id, "company_id": company_id, "name": emp_id, "password": "x",
+             "email": f"{emp_id}@example.com", "current_status": 0}
+            for emp_id in emp_ids
+        ])
+        db.add(AttendanceDevice(id="bench-door", company_id=company_id, name="Door", key_hash=hash_device_secret("secret")))
+        db.commit()
+    return emp_ids, "bench-door.secret"
+
+
+def generate(emp_ids: list[str], days: int) -> list[dict]:
+    rng = random.Random(7)
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    punches = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for emp_id in emp_ids:
+            arrive = day + timedelta(hours=8, minutes=rng.randrange(120), seconds=rng.randrange(60))
+            leave = arrive + timedelta(hours=8, minutes=rng.randrange(90))
+            punches.append({"emp_id": emp_id, "timestamp": arrive.isoformat(), "direction": "in"})
+            punches.append({"emp_id": emp_id, "timestamp": leave.isoformat(), "direction": "out"})
+    punches += rng.sample(punches, int(len(punches) * DUPLICATE_RATE))
+    # Devices upload in arrival order, not sorted per employee
+    punches.sort(key=lambda punch: punch["timestamp"])
+    return punches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of POST /attendance/punches")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=5000, help="Punches per request")
+    args = parser.parse_args()
+
+    try:
+        Base.metadata.create_all(get_engine())
+        emp_ids, key = seed(args.employees)
+        punches = generate(emp_ids, args.days)
+        batches = [punches[i:i + args.batch] for i in range(0, len(punches), args.batch)]
+
+        with TestClient(app) as client:
+            start = time.perf_counter()
+            for batch in batches:
+                response = client.post("/attendance/punches", json={"punches": batch}, headers={"X-Device-Key": key})
+                assert response.status_code == 200, response.text
+            elapsed = time.perf_counter() - start
+
+        with SessionLocal() as db:
+            rows = db.execute(select(func.count()).select_from(Attendance)).scalar()
+        print(f"punch ingestion ({args.employees} employees x {args.days} days, {len(punches)} punches incl. "
+              f"{DUPLICATE_RATE:.0%} resent, {len(batches)} requests of {args.batch})")
+        print(f"  {elapsed:6.2f} s   {len(punches) / elapsed:8.0f} punches/s   "
+              f"{elapsed / len(batches) * 1000:7.1f} ms/request   {rows} attendance rows")
+    finally:
+        get_engine().dispose()
+        os.unlink(_scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Tenant-scoped query plan benchmark
+
+Seeds a scratch SQLite database (or the database given with --database-url)
+with several companies, then runs the common company-scoped queries through
+a tenant-scoped session, first without and then with the composite indexes
+from migration 0007. Prints each query's plan and timing.
+
+Usage (from backend/):
+    python -m benchmarks.query_plans [--companies 50] [--employees 2000] [--database-url sqlite:///plans_bench.db]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import create_engine, event, func, insert, text
+from sqlalchemy.orm import Session
+from database.database import Base
+from database.models import Company, Employee, LeaveTable
+from database.tenancy import set_tenant
+
+BATCH = 10000
+DEPARTMENTS = ("Engineering", "Sales", "Support", "Finance", "HR", "Legal", "Marketing", "Operations")
+INDEXES = (
+    ("ix_employee_company_department", "employee", "company_id, department"),
+    ("ix_employee_company_status", "employee", "company_id, current_status"),
+    ("ix_leave_table_emp_start", "leave_table", "emp_id, start_date"),
+)
+
+
+def seed(session: Session, companies: int, employees: int) -> tuple[uuid.UUID, str]:
+    """Create companies with employees and leave; returns one company and one of its employees"""
+    rng = random.Random(42)
+    company_ids = [uuid.uuid4() for _ in range(companies)]
+    session.execute(insert(Company), [
+        {"id": company_id, "company_name": f"Company {i}", "email": f"c{i}@example.com", "password": "x"}
+        for i, company_id in enumerate(company_ids)
+    ])
+    employee_rows, leave_rows = [], []
+    for c, company_id in enumerate(company_ids):
+        for e in range(employees):
+            emp_id = f"C{c:04d}E{e:06d}"
+            employee_rows.append({
+                "id": emp_id, "company_id": company_id, "name": emp_id, "password": "x",
+                "email": f"{emp_id}@example.com", "department": rng.choice(DEPARTMENTS),
+                "current_status": rng.choice((0, 0, 1, 2))
+            })
+            for _ in range(2):
+                start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 180))
+                leave_rows.append({"emp_id": emp_id, "start_date": start, "end_date": start, "leave_type": "casual", "is_approved": rng.random() < 0.5})
+    for model, rows in ((Employee, employee_rows), (LeaveTable, leave_rows)):
+        for start in range(0, len(rows), BATCH):
+            session.execute(insert(model), rows[start:start + BATCH])
+    session.commit()
+    return company_ids[0], employee_rows[0]["id"]
+
+
+def queries(company_id: uuid.UUID, emp_id: str):
+    """(label, function running the query on a tenant-scoped session)"""
+    return (
+        ("employees in a department", lambda db: db.query(Employee).filter(
+            Employee.company_id == company_id, Employee.department == "Sales").all()),
+        ("checked-in count", lambda db: db.query(func.count(Employee.id)).filter(
+            Employee.company_id == company_id, Employee.current_status == 1).scalar()),
+        ("all leave requests (admin)", lambda db: db.query(LeaveTable).all()),
+        ("an employee's leave by date", lambda db: db.query(LeaveTable).filter(
+            LeaveTable.emp_id == emp_id).order_by(LeaveTable.start_date).all()),
+    )
+
+
+def explain(session: Session, statement: str, params) -> list[str]:
+    if session.get_bind().dialect.name == "sqlite":
+        return [row[-1] for row in session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)]
+    return [row[0] for row in session.connection().exec_driver_sql(f"EXPLAIN {statement}", params)]
+
+
+def report(engine, company_id: uuid.UUID, emp_id: str, runs: int):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    for label, run in queries(company_id, emp_id):
+        with Session(engine) as db:
+            set_tenant(db, company_id)
+            event.listen(engine, "before_cursor_execute", capture)
+            captured.clear()
+            run(db)
+            event.remove(engine, "before_cursor_execute", capture)
+            statement, params = captured[-1]
+
+            timings = []
+            for _ in range(runs):
+                db.expunge_all()
+                start = time.perf_counter()
+                run(db)
+                timings.append(time.perf_counter() - start)
+
+            print(f"  {label:30} {min(timings) * 1000:8.2f} ms")
+            for line in explain(db, statement, params):
+                print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show plans of tenant-scoped queries with and without composite indexes")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--employees", type=int, default=2000, help="Employees per company")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            company_id, emp_id = seed(session, args.companies, args.employees)
+            print(f"seeded {args.companies} companies x {args.employees} employees in {time.perf_counter() - start:.1f} s")
+
+        with engine.begin() as conn:
+            for name, _, _ in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            conn.execute(text("ANALYZE"))
+        print("without composite indexes")
+        report(engine, company_id, emp_id, args.runs)
+
+        with engine.begin() as conn:
+            for name, table, columns in INDEXES:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+            conn.execute(text("ANALYZE"))
+        print("with composite indexes")
+        report(engine, company_id, emp_id, args.runs)
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Serialization micro-benchmark for the large list endpoints
+
+Compares the per-row cost of the default path (ORM object -> Pydantic model
+-> dict -> stdlib json) with the fast path (row tuple -> dict -> JSON bytes).
+No database is needed; rows are generated in memory.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--rows 5000]
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from database.models import Employee, LeaveTable, Attendance
+from schemas.employee import EmployeesListResponse
+from schemas.leave import LeaveListResponse
+from schemas.attendance import CompanyAttendanceResponse, AttendanceRecord
+from routers.employee import EMPLOYEE_LIST_FIELDS
+from routers.leave import LEAVE_FIELDS
+from routers.attendance import ATTENDANCE_RECORD_FIELDS
+from utils.fast_json import dumps, rows_to_dicts, orjson
+
+
+def employee_rows(n: int) -> list[tuple]:
+    company_id = uuid.uuid4()
+    return [
+        (f"ACEMP2024{i:06d}", company_id, f"Employee {i}", "9999999999", "Engineering",
+         f"emp{i}@example.com", "Manager", "Ahmedabad", "Developer", None, i % 3, 1)
+        for i in range(n)
+    ]
+
+
+def leave_rows(n: int) -> list[tuple]:
+    start = date(2026, 1, 1)
+    return [
+        (i, f"ACEMP2024{i:06d}", start + timedelta(days=i % 28), start + timedelta(days=i % 28 + 1), "sick", i % 2 == 0)
+        for i in range(n)
+    ]
+
+
+def attendance_rows(n: int) -> list[tuple]:
+    day = date(2026, 1, 5)
+    check_in = datetime(2026, 1, 5, 9, 0, 0)
+    return [
+        (f"ACEMP2024{i:06d}", day, check_in, check_in + timedelta(hours=9), check_in, check_in,
+         False, f"Employee {i}", "Engineering")
+        for i in range(n)
+    ]
+
+
+def default_employees(rows):
+    employees = [Employee(**dict(zip(EMPLOYEE_LIST_FIELDS, row))) for row in rows]
+    model = EmployeesListResponse.model_validate({"employees": employees, "count": len(employees)})
+    return json.dumps(model.model_dump(mode="json")).encode("utf-8")
+
+
+def default_leaves(rows):
+    leaves = [LeaveTable(**dict(zip(LEAVE_FIELDS, row))) for row in rows]
+    model = LeaveListResponse.model_validate({"leaves": leaves, "count": len(leaves)})
+    return json.dumps(model.model_dump(mode="json")).encode("utf-8")
+
+
+def default_attendance(rows):
+    records = []
+    for row in rows:
+        values = dict(zip(ATTENDANCE_RECORD_FIELDS, row))
+        name, department = values.pop("employee_name"), values.pop("department")
+        attendance = Attendance(**values)
+        records.append(AttendanceRecord(
+            emp_id=attendance.emp_id, date=attendance.date, start_time=attendance.start_time,
+            end_time=attendance.end_time, work_hours=attendance.work_hours,
+            extra_hours=attendance.extra_hours, on_leave=attendance.on_leave,
+            employee_name=name, department=department
+        ))
+    model = CompanyAttendanceResponse(
+        date=date(2026, 1, 5), total_employees=len(rows), present_count=len(rows),
+        absent_count=0, on_leave_count=0, records=records
+    )
+    return json.dumps(model.model_dump(mode="json")).encode("utf-8")
+
+
+def fast_employees(rows):
+    employees = rows_to_dicts(rows, EMPLOYEE_LIST_FIELDS, {"prof_pic": bytes.decode})
+    return dumps({"employees": employees, "count": len(employees)})
+
+
+def fast_leaves(rows):
+    leaves = rows_to_dicts(rows, LEAVE_FIELDS)
+    return dumps({"leaves": leaves, "count": len(leaves)})
+
+
+def fast_attendance(rows):
+    records = rows_to_dicts(rows, ATTENDANCE_RECORD_FIELDS)
+    return dumps({
+        "date": date(2026, 1, 5), "total_employees": len(rows), "present_count": len(rows),
+        "absent_count": 0, "on_leave_count": 0, "records": records
+    })
+
+
+CASES = [
+    ("GET /employees/", employee_rows, default_employees, fast_employees),
+    ("GET /leaves/admin", leave_rows, default_leaves, fast_leaves),
+    ("GET /attendance/company", attendance_rows, default_attendance, fast_attendance),
+]
+
+
+def best_of(func, rows, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row serialization cost of list endpoints")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"serialization ({args.rows} rows, encoder={'orjson' if orjson else 'json'})")
+    print(f"  {'endpoint':26s} {'default us/row':>15s} {'fast us/row':>12s} {'speedup':>8s}")
+    for name, make_rows, default, fast in CASES:
+        rows = make_rows(args.rows)
+        default_time = best_of(default, rows, args.repeat)
+        fast_time = best_of(fast, rows, args.repeat)
+        print(f"  {name:26s} {default_time / args.rows * 1e6:15.2f} {fast_time / args.rows * 1e6:12.2f} {default_time / fast_time:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
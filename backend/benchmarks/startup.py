@@ -0,0 +1,69 @@
+"""
+Startup benchmark: import time of `main` and time until the first request is served
+
+Usage (from backend/):
+    python -m benchmarks.startup [--runs 5] [--port 8765]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import_time() -> float:
+    """Import `main` in a fresh interpreter and return the import time in seconds"""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_request(port: int, timeout: float = 30.0) -> float:
+    """Start uvicorn and return the seconds until GET /health first succeeds"""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Server did not answer within the timeout")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure application startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import_times = [measure_import_time() for _ in range(args.runs)]
+    first_request_times = [measure_first_request(args.port) for _ in range(args.runs)]
+
+    print(f"startup ({args.runs} runs)")
+    print(f"  import main           min {min(import_times) * 1000:8.1f} ms   avg {sum(import_times) / len(import_times) * 1000:8.1f} ms")
+    print(f"  time to first request min {min(first_request_times) * 1000:8.1f} ms   avg {sum(first_request_times) / len(first_request_times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
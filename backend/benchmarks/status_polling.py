@@ -0,0 +1,120 @@
+"""
+Status polling benchmark: write statements issued while clients poll
+GET /attendance/status
+
+Runs the app in-process against a scratch SQLite database, counts
+INSERT/UPDATE/DELETE statements and COMMITs with engine events, and
+compares with the previous behaviour (recompute, assign and commit on
+every poll).
+
+Usage (from backend/):
+    python -m benchmarks.status_polling [--employees 50] [--polls 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_scratch.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch.name}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["JOB_WORKER_ENABLED"] = "False"
+os.environ["SCHEDULER_ENABLED"] = "False"
+os.environ["ACCESS_LOG_ENABLED"] = "False"
+
+import uuid  # noqa: E402
+from datetime import date, datetime  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from database.database import Base, SessionLocal, get_engine  # noqa: E402
+from database.models import Company, Employee, Attendance  # noqa: E402
+from auth.auth import create_access_token  # noqa: E402
+from services.status import derive_status  # noqa: E402
+from main import app  # noqa: E402
+
+
+class WriteCounter:
+    def __init__(self, engine):
+        self.writes = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            self.writes += 1
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.writes = 0
+        self.commits = 0
+
+
+def seed(employees: int) -> list[str]:
+    """One company; half the employees are checked in today"""
+    with SessionLocal() as db:
+        company = Company(id=uuid.uuid4(), company_name="Bench", email="bench@example.com", password="x")
+        db.add(company)
+        emp_ids = [f"BEEMP{i:06d}" for i in range(employees)]
+        for i, emp_id in enumerate(emp_ids):
+            db.add(Employee(id=emp_id, company_id=company.id, name=emp_id, password="x",
+                            email=f"{emp_id}@example.com", current_status=0))
+            if i % 2 == 0:
+                db.add(Attendance(emp_id=emp_id, date=date.today(), start_time=datetime.now(), on_leave=False))
+        db.commit()
+    return emp_ids
+
+
+def legacy_status(emp_id: str):
+    """The previous /attendance/status: query, assign and always commit"""
+    with SessionLocal() as db:
+        employee = db.get(Employee, emp_id)
+        attendance = db.query(Attendance).filter(Attendance.emp_id == emp_id, Attendance.date == date.today()).first()
+        employee.current_status = derive_status(attendance)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write rate under /attendance/status polling")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=20, help="Polls per employee")
+    args = parser.parse_args()
+
+    try:
+        engine = get_engine()
+        Base.metadata.create_all(engine)
+        emp_ids = seed(args.employees)
+        tokens = {emp_id: create_access_token({"sub": emp_id, "role": "employee"}) for emp_id in emp_ids}
+        counter = WriteCounter(engine)
+        total = args.employees * args.polls
+
+        counter.reset()
+        start = time.perf_counter()
+        for _ in range(args.polls):
+            for emp_id in emp_ids:
+                legacy_status(emp_id)
+        legacy_elapsed = time.perf_counter() - start
+        legacy_writes, legacy_commits = counter.writes, counter.commits
+
+        with TestClient(app) as client:
+            counter.reset()
+            start = time.perf_counter()
+            for _ in range(args.polls):
+                for emp_id in emp_ids:
+                    response = client.get("/attendance/status", headers={"Authorization": f"Bearer {tokens[emp_id]}"})
+                    assert response.status_code == 200, response.text
+            elapsed = time.perf_counter() - start
+
+        print(f"status polling ({args.employees} employees x {args.polls} polls = {total} requests)")
+        print(f"  previous (write per poll)   writes {legacy_writes:6d}   commits {legacy_commits:6d}   {legacy_elapsed / total * 1e6:8.0f} us/poll (handler only)")
+        print(f"  GET /attendance/status      writes {counter.writes:6d}   commits {counter.commits:6d}   {elapsed / total * 1e6:8.0f} us/poll (full request)")
+    finally:
+        get_engine().dispose()
+        os.unlink(_scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Throughput benchmark: dev mode (python main.py style: reload + debug)
+vs production mode (serve.py)
+
+Usage (from backend/):
+    python -m benchmarks.throughput [--requests 5000] [--concurrency 32] [--path /health]
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "dev": lambda port: [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--reload", "--log-level", "warning"],
+    "prod": lambda port: [sys.executable, "serve.py", "--port", str(port), "--log-level", "warning"],
+}
+
+
+def wait_until_ready(port: int, timeout: float = 30.0):
+    """Poll /health until the server answers"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+
+def run_load(port: int, path: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    """Send `total` GET requests over `concurrency` keep-alive connections"""
+    latencies: list[float] = []
+    lock = threading.Lock()
+    per_thread = total // concurrency
+
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        local = []
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            connection.request("GET", path)
+            connection.getresponse().read()
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dev and prod server throughput")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    for mode, command in MODES.items():
+        env = dict(os.environ, DEBUG="True" if mode == "dev" else "False")
+        server = subprocess.Popen(command(args.port), cwd=BACKEND_DIR, env=env)
+        try:
+            wait_until_ready(args.port)
+            run_load(args.port, args.path, args.concurrency * 10, args.concurrency)  # warm-up
+            elapsed, latencies = run_load(args.port, args.path, args.requests, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{mode:5s} {len(latencies) / elapsed:10.0f} req/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,90 @@ from typing import List
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_WARMUP: int = 0  # Connections to open at startup (0 = lazy)
     
     # Application
     APP_NAME: str = "FastAPI App"
-    DEBUG: bool = True
+    DEBUG: bool = False  # Enables debug tracebacks and auto-reload
+    
+    # Server (production entry point, see serve.py)
+    WEB_CONCURRENCY: int = 0  # Worker processes (0 = one per available core)
+    MAX_REQUESTS: int = 0  # Recycle a worker after this many requests (0 = never)
+    
+    # Serve large list endpoints from row tuples without per-row Pydantic models
+    FAST_JSON: bool = False
+    
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    
+    # Background jobs
+    JOB_WORKER_ENABLED: bool = True  # Run the in-process job worker in this process
+    JOB_OUTPUT_DIR: str = "job_output"  # Where job results (e.g. payslip archives) are written
+    PAYSLIP_PROCESSES: int = 0  # Payslip render processes (0 = one per core)
+    SCHEDULER_ENABLED: bool = True  # Run nightly maintenance jobs from this process
+    SCHEDULER_STALE_RUN_HOURS: int = 12  # A run still "running" after this long is marked failed
+    
+    # Attendance storage
+    ATTENDANCE_RETENTION_MONTHS: int = 0  # Months kept in the hot table (0 = keep everything)
+    ATTENDANCE_ARCHIVE_DIR: str = "attendance_archive"  # Where archived months are written
+    ATTENDANCE_PARTITIONS_AHEAD: int = 3  # Future monthly partitions to keep created (Postgres)
+    
+    # Employee deletion
+    SOFT_DELETE_EMPLOYEES: bool = False  # Mark deleted employees and purge them in a nightly batch
+    SOFT_DELETE_RETENTION_DAYS: int = 0  # Days a soft-deleted employee is kept before purging
+    
+    # Login throttling
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_ACCOUNT_BURST: int = 5  # Failed attempts allowed per account before throttling
+    LOGIN_ACCOUNT_PER_MINUTE: float = 5  # Attempts regained per account per minute
+    LOGIN_IP_BURST: int = 20  # Failed attempts allowed per client IP before throttling
+    LOGIN_IP_PER_MINUTE: float = 30  # Attempts regained per client IP per minute
+    LOGIN_RATE_LIMIT_REDIS_URL: str = ""  # Share buckets between workers through Redis (needs `redis`)
+    LOGIN_MAX_CONCURRENT_HASHES: int = 4  # bcrypt checks running at once per worker
+    LOGIN_HASH_WAIT_SECONDS: float = 2.0  # Wait for a bcrypt slot before answering 503
+    
+    # Password hashing (pick BCRYPT_ROUNDS with `python manage.py calibrate-bcrypt`)
+    BCRYPT_ROUNDS: int = 12  # Stored hashes with another cost are rehashed at the next login
+    FAST_INITIAL_PASSWORDS: bool = False  # Hash generated employee passwords cheaply and force a reset at first login
+    INITIAL_PASSWORD_ROUNDS: int = 4  # bcrypt cost of those initial passwords
+    
+    # Check-in group commit (per worker, see services/checkin_buffer.py)
+    CHECKIN_BATCHING: bool = False  # Coalesce concurrent check-ins into one transaction
+    CHECKIN_BATCH_SIZE: int = 200  # Most check-ins written per transaction
+    CHECKIN_BATCH_LATENCY_MS: float = 5.0  # Longest a check-in waits for its batch to fill
+    
+    # Cached read models (see services/read_cache.py)
+    READ_CACHE_ENABLED: bool = False  # With several workers, also set CACHE_REDIS_URL
+    READ_CACHE_LOCAL_SIZE: int = 2000  # Entries kept per worker
+    READ_CACHE_TTL_SECONDS: float = 60.0
+    CACHE_REDIS_URL: str = ""  # Shared tier and tag versions in Redis (needs `redis`)
+    
+    # Coalescing of identical concurrent reads (per worker, see utils/single_flight.py)
+    COALESCE_ENABLED: bool = True
+    COALESCE_WAIT_SECONDS: float = 10.0  # A waiting request runs the read itself after this long
+    
+    # Idempotency-Key replay for retried writes (per worker)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # How long a response is replayed for its key
+    IDEMPOTENCY_MAX_ENTRIES: int = 50000
+    IDEMPOTENCY_MAX_BYTES: int = 32 * 1024 * 1024  # Total size of stored responses
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # Wait for an in-flight duplicate before answering 409
+    
+    # Structured access log with per-request phase timings (see utils/timing.py)
+    ACCESS_LOG_ENABLED: bool = True
+    
+    # On-demand request profiling (see utils/profiler.py)
+    PROFILER_SAMPLE_RATE: float = 0.0  # Share of authenticated requests profiled without a header
+    PROFILER_INTERVAL_MS: float = 5.0  # Stack sampling interval while a profiled request runs
+    PROFILER_TOKEN_MINUTES: int = 15  # Validity of an X-Profile header value from POST /profiles/token
+    PROFILE_DIR: str = "profiles"  # Where request profiles are written
+    PROFILER_MAX_PROFILES: int = 200  # Oldest profiles are deleted beyond this many
     
     # JWT Settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 500
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Short-lived; clients renew with POST /auth/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_DENYLIST_SYNC_SECONDS: float = 5.0  # How often each process pulls new revocations
     
     class Config:
         env_file = ".env"
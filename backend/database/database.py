@@ -1,18 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import time
 from config import settings
+from utils.timing import add_db_time
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The engine is created lazily on first use so importing the app never
+# touches the database
+_engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        add_db_time(time.perf_counter() - started)
+
+
+def get_engine():
+    """
+    Get the database engine, creating it on first use
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+        if _engine.dialect.name == "sqlite":
+            # Deletes rely on ON DELETE CASCADE, which SQLite only enforces when asked
+            event.listen(_engine, "connect", _enable_sqlite_foreign_keys)
+        # SQL time and query count of the current request (Server-Timing, access log)
+        event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def warm_up_pool(size: int):
+    """
+    Open `size` pooled connections up front so the first requests
+    don't pay the connection setup cost
+    """
+    engine = get_engine()
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        # Closing returns the connections to the pool
+        for connection in connections:
+            connection.close()
+
+
+def dispose_engine():
+    """
+    Close all pooled connections and drop the engine
+    """
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+
 def get_db():
     """
     Dependency function to get database session
     """
+    get_engine()
     db = SessionLocal()
     try:
         yield db
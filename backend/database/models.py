@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, LargeBinary, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, LargeBinary, Boolean, Date, DateTime, Float, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database.database import Base
@@ -16,39 +16,53 @@ class Company(Base):
     logo = Column(LargeBinary)
     
     # Relationships
-    employees = relationship("Employee", back_populates="company", cascade="all, delete-orphan")
+    employees = relationship("Employee", back_populates="company", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Employee(Base):
     __tablename__ = "employee"
     
     id = Column(String, primary_key=True, index=True)
-    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id"), nullable=False)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id", ondelete="CASCADE"), nullable=False)
     name = Column(Text, nullable=False)
     password = Column(Text, nullable=False)
     phone = Column(Text)
     department = Column(Text)
     email = Column(String, unique=True, nullable=False)
-    manager = Column(Text)
+    manager = Column(Text)  # Manager's name, kept in sync with manager_id when that is set
+    manager_id = Column(String, ForeignKey("employee.id", ondelete="SET NULL"), index=True)
     location = Column(Text)
     job_position = Column(Text)
     prof_pic = Column(LargeBinary)
     current_status = Column(Integer)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    deleted_at = Column(DateTime, index=True)  # Soft-deleted, waiting for the purge job
+    password_reset_required = Column(Boolean, nullable=False, default=False, server_default="false")  # Initial password, fast hash
+    tokens_valid_after = Column(DateTime)  # Refresh tokens issued before this (a password change) are rejected
+    
+    # Optimistic concurrency: UPDATEs check and bump the version
+    __mapper_args__ = {"version_id_col": version}
+    
+    # Every query is scoped by company_id, so it leads each index
+    __table_args__ = (
+        Index("ix_employee_company_department", "company_id", "department"),
+        Index("ix_employee_company_status", "company_id", "current_status"),
+    )
     
     # Relationships
     company = relationship("Company", back_populates="employees")
-    private_info = relationship("PrivateInfo", back_populates="employee", uselist=False, cascade="all, delete-orphan")
-    leave_records = relationship("LeaveTable", back_populates="employee", cascade="all, delete-orphan")
-    attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
-    salary = relationship("Salary", back_populates="employee", uselist=False, cascade="all, delete-orphan")
-    resume_data = relationship("Resume", back_populates="employee", uselist=False, cascade="all, delete-orphan")
-    summary = relationship("Summary", back_populates="employee", uselist=False, cascade="all, delete-orphan")
+    private_info = relationship("PrivateInfo", back_populates="employee", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    leave_records = relationship("LeaveTable", back_populates="employee", cascade="all, delete-orphan", passive_deletes=True)
+    attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan", passive_deletes=True)
+    salary = relationship("Salary", back_populates="employee", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    resume_data = relationship("Resume", back_populates="employee", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    summary = relationship("Summary", back_populates="employee", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
 
 class PrivateInfo(Base):
     __tablename__ = "private_info"
     
-    emp_id = Column(String, ForeignKey("employee.id"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
     dob = Column(Date)
     address = Column(Text)
     nationality = Column(Text)
@@ -69,12 +83,14 @@ class LeaveTable(Base):
     __tablename__ = "leave_table"
     
     leave_id = Column(Integer, primary_key=True, autoincrement=True)
-    emp_id = Column(String, ForeignKey("employee.id"), nullable=False)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), nullable=False)
     start_date = Column(Date)
     leave_type = Column(Text)
     end_date = Column(Date)
     is_approved = Column(Boolean)
     
+    __table_args__ = (Index("ix_leave_table_emp_start", "emp_id", "start_date"),)
+    
     # Relationships
     employee = relationship("Employee", back_populates="leave_records")
 
@@ -82,7 +98,7 @@ class LeaveTable(Base):
 class Attendance(Base):
     __tablename__ = "attendance"
     
-    emp_id = Column(String, ForeignKey("employee.id"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
     date = Column(Date, primary_key=True)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
@@ -97,10 +113,13 @@ class Attendance(Base):
 class Resume(Base):
     __tablename__ = "resume"
     
-    emp_id = Column(String, ForeignKey("employee.id"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
     about = Column(Text)
     skills = Column(Text)
     certification = Column(Text)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     employee = relationship("Employee", back_populates="resume_data")
@@ -109,7 +128,7 @@ class Resume(Base):
 class Salary(Base):
     __tablename__ = "salary"
     
-    emp_id = Column(String, ForeignKey("employee.id"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
     monthly_wage = Column(BigInteger)
     yearly_wage = Column(BigInteger)
     basic_sal = Column(BigInteger)
@@ -121,6 +140,9 @@ class Salary(Base):
     pf1 = Column(BigInteger)
     pf2 = Column(BigInteger)
     prof_tax = Column(BigInteger)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     employee = relationship("Employee", back_populates="salary")
@@ -129,14 +151,125 @@ class Salary(Base):
 class Summary(Base):
     __tablename__ = "summary"
     
-    emp_id = Column(String, ForeignKey("employee.id"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
     present_days = Column(Integer)
     leave_count = Column(Integer)
     leave_left = Column(Integer)
     tot_work_days = Column(Integer)
+    # Days moved to the attendance archive; recomputes from the hot table add these
+    archived_present_days = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_leave_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     employee = relationship("Employee", back_populates="summary")
 
 
+class PayrollRun(Base):
+    __tablename__ = "payroll_run"
+    
+    run_id = Column(Integer, primary_key=True, autoincrement=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id", ondelete="CASCADE"), nullable=False)
+    month = Column(String, nullable=False)  # YYYY-MM
+    working_days = Column(Integer)
+    employee_count = Column(Integer)
+    total_gross = Column(BigInteger)
+    total_deductions = Column(BigInteger)
+    total_net = Column(BigInteger)
+    created_at = Column(DateTime)
+    
+    __table_args__ = (UniqueConstraint("company_id", "month", name="uq_payroll_run_company_month"),)
+    
+    # Relationships
+    lines = relationship("Payroll", back_populates="run", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class Payroll(Base):
+    __tablename__ = "payroll"
+    
+    run_id = Column(Integer, ForeignKey("payroll_run.run_id", ondelete="CASCADE"), primary_key=True)
+    emp_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
+    present_days = Column(Integer)
+    leave_days = Column(Integer)
+    paid_days = Column(Integer)
+    overtime_hours = Column(Float)
+    gross_pay = Column(BigInteger)  # Prorated earnings components
+    overtime_pay = Column(BigInteger)
+    deductions = Column(BigInteger)
+    net_pay = Column(BigInteger)
+    
+    # Relationships
+    run = relationship("PayrollRun", back_populates="lines")
+
+
+class Job(Base):
+    __tablename__ = "job"
+    
+    job_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    params = Column(Text)  # JSON
+    status = Column(String, nullable=False, index=True)  # queued, running, completed, failed
+    progress_done = Column(Integer, default=0)
+    progress_total = Column(Integer, default=0)
+    result_path = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime)  # Heartbeat while running
+    finished_at = Column(DateTime)
 
+
+class ScheduledJobRun(Base):
+    __tablename__ = "scheduled_job_run"
+    
+    run_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_name = Column(String, nullable=False)
+    scheduled_for = Column(DateTime, nullable=False)  # The cron slot this run belongs to
+    status = Column(String, nullable=False)  # running, completed, failed
+    processed = Column(Integer, default=0)  # Rows touched by the job
+    error = Column(Text)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    # One run per job and slot, even with several worker processes
+    __table_args__ = (UniqueConstraint("job_name", "scheduled_for", name="uq_scheduled_job_run_slot"),)
+
+
+class AttendanceArchive(Base):
+    __tablename__ = "attendance_archive"
+    
+    month = Column(String, primary_key=True)  # YYYY-MM
+    path = Column(Text, nullable=False)  # Gzipped CSV with all companies' rows for the month
+    row_count = Column(Integer)
+    archived_at = Column(DateTime)
+
+
+class EmployeeHierarchy(Base):
+    """Closure table of the reporting tree: one row per (manager, report) pair at any depth, plus (e, e, 0)"""
+    __tablename__ = "employee_hierarchy"
+    
+    ancestor_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(String, ForeignKey("employee.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    
+    __table_args__ = (Index("ix_employee_hierarchy_descendant", "descendant_id", "depth"),)
+
+
+class RevokedToken(Base):
+    """JWTs revoked before their expiry (logout, refresh rotation); rows are purged once expired"""
+    __tablename__ = "revoked_token"
+    
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, index=True)  # Workers sync their denylists on this
+
+
+class AttendanceDevice(Base):
+    """Door terminal or kiosk allowed to upload punches for its company"""
+    __tablename__ = "attendance_device"
+    
+    id = Column(String, primary_key=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(Text, nullable=False)
+    key_hash = Column(String, nullable=False)  # SHA-256 of the secret half of the device key
+    created_at = Column(DateTime)
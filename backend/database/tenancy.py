@@ -0,0 +1,83 @@
+"""
+Session-level tenant scoping
+
+The auth dependencies call set_tenant() on the request's session; from then
+on every ORM SELECT, and every ORM UPDATE or DELETE statement, on that
+session only sees the current company's rows, whether or not the handler
+filters by company itself. Tables keyed by company_id are filtered directly,
+tables keyed by emp_id through the company's employees. Soft-deleted
+employees (deleted_at set) are hidden too.
+
+Not covered: Core statements on a Table (update(Model.__table__)), bulk
+UPDATE by primary key (update(Model) executed with a list of rows) and
+INSERTs. Those run where there is no tenant, or on rows the handler loaded
+through the scoped session.
+
+Sessions without a tenant (login, background jobs, the scheduler) are not
+filtered. A query that must see every tenant, such as the global employee
+ID sequence, opts out with .execution_options(skip_tenant_filter=True).
+"""
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import UUID
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import Session, ORMExecuteState, with_loader_criteria
+from database.database import SessionLocal
+from database.models import (
+    Employee, PrivateInfo, LeaveTable, Attendance, Resume, Salary, Summary,
+    PayrollRun, Payroll, Job, AttendanceDevice
+)
+
+TENANT_KEY = "tenant_id"
+
+COMPANY_SCOPED = (PayrollRun, Job, AttendanceDevice)
+EMPLOYEE_SCOPED = (PrivateInfo, LeaveTable, Attendance, Resume, Salary, Summary, Payroll)
+
+
+def set_tenant(db: Session, company_id: UUID):
+    """Scope all further ORM queries on this session to one company"""
+    db.info[TENANT_KEY] = company_id
+
+
+@contextmanager
+def tenant_session(company_id: UUID) -> Iterator[Session]:
+    """
+    A session of its own scoped to one company, for work that may outlive the
+    request's session (e.g. a coalesced read other requests wait for)
+    """
+    with SessionLocal() as db:
+        set_tenant(db, company_id)
+        yield db
+
+
+def get_tenant(db: Session):
+    return db.info.get(TENANT_KEY)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _add_tenant_criteria(execute_state: ORMExecuteState):
+    writes = (execute_state.is_update or execute_state.is_delete) and execute_state.is_orm_statement
+    if (
+        not (execute_state.is_select or writes)
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("skip_tenant_filter", False)
+    ):
+        return
+    company_id = execute_state.session.info.get(TENANT_KEY)
+    if company_id is None:
+        return
+
+    # Relationship and column loads inherit these options from the parent query
+    active_employee = and_(Employee.company_id == company_id, Employee.deleted_at.is_(None))
+    company_employees = select(Employee.id).where(active_employee)
+    options = [
+        with_loader_criteria(Employee, active_employee, include_aliases=True)
+    ] + [
+        with_loader_criteria(model, model.company_id == company_id, include_aliases=True)
+        for model in COMPANY_SCOPED
+    ] + [
+        with_loader_criteria(model, model.emp_id.in_(company_employees), include_aliases=True)
+        for model in EMPLOYEE_SCOPED
+    ]
+    execute_state.statement = execute_state.statement.options(*options)
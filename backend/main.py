@@ -1,23 +1,107 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database.database import engine, Base
-from database import models
-from routers import employee, auth, leave,attendance
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from database.database import get_engine, warm_up_pool, dispose_engine
+from routers import employee, auth, leave,attendance, payroll, jobs, profiling
+from services.jobs import worker as job_worker
+from auth.revocation import denylist_syncer
+from services.scheduler import scheduler
+from services.checkin_buffer import checkin_buffer
+from services.read_cache import read_cache
+from utils.single_flight import single_flight
+from services import maintenance  # noqa: F401 - registers the scheduled jobs
+from utils.compression import CompressionMiddleware
+from utils.idempotency import IdempotencyMiddleware, IdempotencyStore
+from auth.auth import token_caller, token_company
+from utils.profiler import ProfilerMiddleware
+from utils.timing import TimedRoute, TimingMiddleware, configure_access_log
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown
+    Schema is managed by Alembic migrations (`alembic upgrade head`), not here
+    """
+    get_engine()
+    if settings.DB_POOL_WARMUP > 0:
+        try:
+            await run_in_threadpool(warm_up_pool, settings.DB_POOL_WARMUP)
+        except Exception as e:
+            # A slow or unavailable database should not stop the server from starting
+            logger.warning("Connection pool warm-up failed: %s", e)
+    denylist_syncer.start()
+    if settings.JOB_WORKER_ENABLED:
+        job_worker.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await checkin_buffer.stop()
+    scheduler.stop()
+    job_worker.stop()
+    denylist_syncer.stop()
+    dispose_engine()
+
 
 app = FastAPI(
     title="GCET Employee Management System",
-    debug=True
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
+app.router.route_class = TimedRoute
 
-# CORS Middleware
+# Idempotency-Key replay, inside compression so stored bodies are uncompressed
+IDEMPOTENT_ROUTES = [
+    ("POST", "/attendance/checkin"),
+    ("POST", "/attendance/checkout"),
+    ("POST", "/leaves/request"),
+    ("POST", "/employees/"),
+]
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    max_bytes=settings.IDEMPOTENCY_MAX_BYTES
+)
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    routes=IDEMPOTENT_ROUTES,
+    identify=token_caller,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS
+)
+
+# Compression Middleware (brotli when installed, otherwise gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Server-Timing header and access log, outside compression so sizes are as sent
+if settings.ACCESS_LOG_ENABLED:
+    configure_access_log()
+app.add_middleware(TimingMiddleware, access_log=settings.ACCESS_LOG_ENABLED)
+
+# On-demand profiling, outside the other middlewares so the whole request is sampled
+app.add_middleware(
+    ProfilerMiddleware,
+    store=profiling.profile_store,
+    secret=settings.SECRET_KEY,
+    identify=token_company,
+    sample_rate=settings.PROFILER_SAMPLE_RATE,
+    interval_ms=settings.PROFILER_INTERVAL_MS
+)
+
+# CORS, registered last so it is outermost and also covers responses the
+# other middlewares answer themselves (idempotent replays, 409/422)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed", "X-Profile-Id", "Server-Timing"],
 )
 
 # Include routers
@@ -25,6 +109,9 @@ app.include_router(auth.router)
 app.include_router(employee.router)
 app.include_router(leave.router)
 app.include_router(attendance.router)
+app.include_router(payroll.router)
+app.include_router(jobs.router)
+app.include_router(profiling.router)
 
 @app.get("/")
 async def root():
@@ -36,6 +123,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Read cache lookups of this worker per route"""
+    return read_cache.stats.snapshot()
+
+
+@app.get("/health/coalescing")
+async def coalescing_stats():
+    """Reads of this worker per route: executed, served from another request's result, timed out waiting"""
+    return single_flight.stats.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Development server; use serve.py for production
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG)
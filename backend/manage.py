@@ -0,0 +1,86 @@
+"""
+Maintenance commands
+
+Usage (from backend/):
+    python manage.py create-partitions [--months-ahead N]
+    python manage.py archive-attendance [--retention-months N | --month YYYY-MM]
+    python manage.py calibrate-bcrypt [--target-ms 250]
+"""
+import argparse
+import time
+import bcrypt
+from config import settings
+from database.database import SessionLocal, get_engine
+from services.attendance_archive import ensure_partitions, archive_expired, archive_month
+
+
+def create_partitions(args):
+    with SessionLocal() as db:
+        covered = ensure_partitions(db, args.months_ahead)
+    if covered:
+        print(f"Attendance partitions exist for this month and the next {covered - 1}")
+    else:
+        print("Attendance is not partitioned on this database; nothing to do")
+
+
+def archive_attendance(args):
+    with SessionLocal() as db:
+        if args.month:
+            year, month = map(int, args.month.split("-"))
+            moved = archive_month(db, year, month)
+        else:
+            moved = archive_expired(db, args.retention_months)
+    print(f"Archived {moved} attendance rows to {settings.ATTENDANCE_ARCHIVE_DIR}")
+
+
+def calibrate_bcrypt(args):
+    """Time bcrypt on this machine and recommend the highest cost within the target"""
+    recommended = None
+    for rounds in range(4, 32):
+        salt = bcrypt.gensalt(rounds=rounds)
+        elapsed = min(_time_hash(salt) for _ in range(args.samples))
+        marker = " (current)" if rounds == settings.BCRYPT_ROUNDS else ""
+        print(f"  cost {rounds:2d}: {elapsed * 1000:8.1f} ms{marker}")
+        if elapsed * 1000 > args.target_ms:
+            break
+        recommended = rounds
+    if recommended is None:
+        print(f"Even the minimum cost takes longer than {args.target_ms} ms on this machine")
+        return
+    print(f"Recommended BCRYPT_ROUNDS={recommended} for a {args.target_ms} ms target (current: {settings.BCRYPT_ROUNDS})")
+    print("Existing hashes are upgraded at each account's next login")
+
+
+def _time_hash(salt: bytes) -> float:
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration password", salt)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    partitions = commands.add_parser("create-partitions", help="Pre-create future monthly attendance partitions (Postgres)")
+    partitions.add_argument("--months-ahead", type=int, default=settings.ATTENDANCE_PARTITIONS_AHEAD)
+    partitions.set_defaults(func=create_partitions)
+
+    archive = commands.add_parser("archive-attendance", help="Move old attendance months to compressed archive files")
+    target = archive.add_mutually_exclusive_group()
+    target.add_argument("--retention-months", type=int, default=settings.ATTENDANCE_RETENTION_MONTHS,
+                        help="Archive months older than this (default: ATTENDANCE_RETENTION_MONTHS; 0 = none)")
+    target.add_argument("--month", help="Archive one month (YYYY-MM)")
+    archive.set_defaults(func=archive_attendance)
+
+    calibrate = commands.add_parser("calibrate-bcrypt", help="Recommend a bcrypt cost for a target hashing time")
+    calibrate.add_argument("--target-ms", type=float, default=250, help="Slowest acceptable hash time (default 250 ms)")
+    calibrate.add_argument("--samples", type=int, default=3, help="Timings per cost; the fastest is used")
+    calibrate.set_defaults(func=calibrate_bcrypt)
+
+    args = parser.parse_args()
+    get_engine()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
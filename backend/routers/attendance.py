@@ -1,56 +1,56 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from sqlalchemy import extract, func
+from sqlalchemy import func
 from typing import Optional
+import csv
+import io
+import secrets
+import uuid
 from datetime import date, datetime
-from database.database import get_db
-from database.models import Employee, Attendance, Summary
+from database.database import get_db, SessionLocal
+from database.models import Employee, Attendance, Summary, AttendanceDevice
+from database.tenancy import tenant_session
 from schemas.attendance import (
     AttendanceRecord, CompanyAttendanceResponse, 
     EmployeeAttendanceResponse, SummaryResponse,
-    CheckInResponse, CheckOutResponse, EmployeeStatusResponse
+    CheckInResponse, CheckOutResponse, EmployeeStatusResponse,
+    AttendanceMatrixResponse, PunchBatch, PunchBatchResponse,
+    DeviceCreate, DeviceResponse, DeviceCreateResponse
 )
-from auth.auth import get_current_company, get_current_employee, decode_token
+from auth.auth import get_current_company, get_current_employee, get_current_device, hash_device_secret, decode_token
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from config import settings
+from utils.fast_json import dumps, rows_to_dicts
+from utils.http_cache import conditional_response, json_body, NO_CACHE
+from utils.dates import parse_month, month_bounds
+from services.status import record_status_change, get_today_status, status_cache, STATUS_DESCRIPTIONS
+from services.attendance_archive import export_month
+from services.attendance_matrix import get_matrix_body, invalidate_matrix
+from services.punches import ingest_punches, invalidate_after_ingest
+from services.checkin_buffer import checkin_buffer
+from services.read_cache import invalidate
+from utils.single_flight import single_flight, query_key
+from utils.timing import TimedRoute
 
-router = APIRouter(prefix="/attendance", tags=["Attendance"])
+router = APIRouter(prefix="/attendance", tags=["Attendance"], route_class=TimedRoute)
 token_auth_scheme = HTTPBearer()
 
-
-def update_employee_status(employee: Employee, db: Session):
-    """
-    Update employee current_status based on today's attendance record
-    Status values:
-    - 0: Default/Checked out (complete attendance)
-    - 1: Checked in (incomplete attendance - only check-in)
-    - 2: On leave
-    """
-    today = date.today()
-    
-    # Get today's attendance record
-    attendance = db.query(Attendance).filter(
-        Attendance.emp_id == employee.id,
-        Attendance.date == today
-    ).first()
-    
-    if not attendance:
-        # No record for today
-        employee.current_status = 0
-    elif attendance.on_leave:
-        # On leave
-        employee.current_status = 2
-    elif attendance.end_time is None:
-        # Checked in but not checked out (incomplete)
-        employee.current_status = 1
-    else:
-        # Complete attendance (both check-in and check-out)
-        employee.current_status = 0
-    
-    db.commit()
+# Columns of AttendanceRecord, in order, for the fast JSON path
+ATTENDANCE_RECORD_FIELDS = (
+    "emp_id", "date", "start_time", "end_time", "work_hours", "extra_hours",
+    "on_leave", "employee_name", "department"
+)
+ATTENDANCE_RECORD_COLUMNS = [
+    Attendance.emp_id, Attendance.date, Attendance.start_time, Attendance.end_time,
+    Attendance.work_hours, Attendance.extra_hours, Attendance.on_leave,
+    Employee.name.label("employee_name"), Employee.department
+]
 
 
 @router.get("/company")
 async def get_company_attendance(
+    request: Request,
     date_param: date = Query(..., alias="date", description="Date for attendance (YYYY-MM-DD)"),
     current_company = Depends(get_current_company),
     db: Session = Depends(get_db)
@@ -58,15 +58,38 @@ async def get_company_attendance(
     """
     Get all attendance records for a specific date (Company/Admin only)
     Query param: date (YYYY-MM-DD)
+    Supports If-None-Match (ETag)
     """
+    # Dashboards open on many screens at once; identical requests share one build.
+    # The build may outlive this request, so it uses a session of its own
+    company_id = current_company.id
+    db.close()
+    
+    def build() -> bytes:
+        with tenant_session(company_id) as build_db:
+            return company_attendance_body(date_param, company_id, build_db)
+    
+    body = await single_flight.run(
+        "GET /attendance/company", (company_id, query_key(date=date_param)), build,
+        timeout=settings.COALESCE_WAIT_SECONDS, enabled=settings.COALESCE_ENABLED
+    )
+    # Past days still change (punch uploads, auto checkout), so even they are
+    # revalidated every time; an unchanged day costs a 304
+    return conditional_response(request, body, cache_control=NO_CACHE)
+
+
+def company_attendance_body(date_param: date, company_id, db: Session) -> bytes:
+    """Encoded CompanyAttendanceResponse of a company for one day"""
+    if settings.FAST_JSON:
+        return dumps(company_attendance_fast(date_param, company_id, db))
     
     # Get all employees for this company
-    all_employees = db.query(Employee).filter(Employee.company_id == current_company.id).all()
+    all_employees = db.query(Employee).filter(Employee.company_id == company_id).all()
     total_employees = len(all_employees)
     
     # Get attendance records for the specific date
     attendance_records = db.query(Attendance).join(Employee).filter(
-        Employee.company_id == current_company.id,
+        Employee.company_id == company_id,
         Attendance.date == date_param
     ).all()
     
@@ -91,7 +114,7 @@ async def get_company_attendance(
     on_leave_count = sum(1 for r in records if r.on_leave)
     absent_count = total_employees - len(records)
     
-    return CompanyAttendanceResponse(
+    response = CompanyAttendanceResponse(
         date=date_param,
         total_employees=total_employees,
         present_count=present_count,
@@ -99,6 +122,34 @@ async def get_company_attendance(
         on_leave_count=on_leave_count,
         records=records
     )
+    return json_body(response)
+
+
+def company_attendance_fast(date_param: date, company_id, db: Session) -> dict:
+    """
+    Fast JSON path for get_company_attendance, returns content ready for dumps()
+    One joined query for the records and a COUNT for the total
+    """
+    total_employees = db.query(func.count(Employee.id)).filter(
+        Employee.company_id == company_id
+    ).scalar()
+    
+    rows = db.query(*ATTENDANCE_RECORD_COLUMNS).join(Employee).filter(
+        Employee.company_id == company_id,
+        Attendance.date == date_param
+    ).all()
+    records = rows_to_dicts(rows, ATTENDANCE_RECORD_FIELDS)
+    
+    on_leave_count = sum(1 for r in records if r["on_leave"])
+    
+    return {
+        "date": date_param,
+        "total_employees": total_employees,
+        "present_count": len(records) - on_leave_count,
+        "absent_count": total_employees - len(records),
+        "on_leave_count": on_leave_count,
+        "records": records
+    }
 
 
 @router.get("/employee")
@@ -112,23 +163,19 @@ async def get_employee_attendance(
     Query param: month (YYYY-MM format, e.g., 2026-01)
     """
     
-    try:
-        # Parse month string (YYYY-MM)
-        year, month_num = map(int, month.split('-'))
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid month format. Use YYYY-MM (e.g., 2026-01)"
-        )
+    # Parse month string (YYYY-MM)
+    year, month_num = parse_month(month)
     
     # Get summary data
     summary = db.query(Summary).filter(Summary.emp_id == current_employee.id).first()
     
     # Get attendance records for the specified month
+    # (a date range, so Postgres only scans that month's partition)
+    start_date, end_date = month_bounds(year, month_num)
     attendance_records = db.query(Attendance).filter(
         Attendance.emp_id == current_employee.id,
-        extract('year', Attendance.date) == year,
-        extract('month', Attendance.date) == month_num
+        Attendance.date >= start_date,
+        Attendance.date <= end_date
     ).order_by(Attendance.date).all()
     
     # Build attendance records
@@ -164,6 +211,24 @@ async def get_employee_attendance(
     )
 
 
+@router.get("/matrix")
+async def get_attendance_matrix(
+    request: Request,
+    month: str = Query(..., description="Month for the matrix (YYYY-MM)"),
+    current_company = Depends(get_current_company),
+    db: Session = Depends(get_db)
+) -> AttendanceMatrixResponse:
+    """
+    Get the employees x days attendance grid for a month (Company/Admin only)
+    Sparse columnar payload, see services/attendance_matrix.py
+    Supports If-None-Match (ETag)
+    """
+    year, month_num = parse_month(month)
+    body = get_matrix_body(db, current_company.id, year, month_num)
+    # Past months still change (punch uploads, archiving), so they are revalidated too
+    return conditional_response(request, body, cache_control=NO_CACHE)
+
+
 @router.post("/checkin", response_model=CheckInResponse)
 async def check_in(
     current_employee = Depends(get_current_employee),
@@ -176,21 +241,41 @@ async def check_in(
     """
     today = date.today()
     
+    if settings.CHECKIN_BATCHING:
+        # Written with other check-ins in one transaction; returns after it commits
+        db.close()
+        result = await checkin_buffer.submit(current_employee.id, current_employee.company_id)
+        return CheckInResponse(
+            message="Checked in successfully" if result.created else "Already checked in for today",
+            emp_id=current_employee.id,
+            date=today,
+            check_in_time=result.start_time,
+            current_status=result.status
+        )
+    
     # Check if attendance record already exists for today
     existing_record = db.query(Attendance).filter(
         Attendance.emp_id == current_employee.id,
         Attendance.date == today
     ).first()
     
+    # Read before commit: touching expired attributes afterwards would check out
+    # a pooled connection again and hold it until the request finishes
+    emp_id, company_id = current_employee.id, current_employee.company_id
+    
     if existing_record:
         # Record already exists, check status
-        update_employee_status(current_employee, db)
+        current_status = record_status_change(current_employee, db)
+        check_in_time = existing_record.start_time
+        db.commit()
+        status_cache.invalidate(emp_id, today)
+        invalidate(company_id, [emp_id])
         return CheckInResponse(
             message="Already checked in for today",
-            emp_id=current_employee.id,
+            emp_id=emp_id,
             date=today,
-            check_in_time=existing_record.start_time,
-            current_status=current_employee.current_status
+            check_in_time=check_in_time,
+            current_status=current_status
         )
     
     # Create new attendance record
@@ -206,18 +291,20 @@ async def check_in(
     )
     
     db.add(new_attendance)
-    db.commit()
-    db.refresh(new_attendance)
     
-    # Update employee status based on attendance record
-    update_employee_status(current_employee, db)
+    # Update employee status in the same transaction as the attendance record
+    current_status = record_status_change(current_employee, db)
+    db.commit()
+    status_cache.invalidate(emp_id, today)
+    invalidate_matrix(company_id, today)
+    invalidate(company_id, [emp_id])
     
     return CheckInResponse(
         message="Checked in successfully",
-        emp_id=current_employee.id,
+        emp_id=emp_id,
         date=today,
         check_in_time=now,
-        current_status=current_employee.current_status
+        current_status=current_status
     )
 
 
@@ -276,6 +363,11 @@ async def check_out(
         Attendance.on_leave == True
     ).scalar() or 0
     
+    # Days already moved to the archive aren't in the hot table any more
+    if summary:
+        present_days += summary.archived_present_days or 0
+        leave_count += summary.archived_leave_count or 0
+    
     leave_left = 30 - leave_count
     tot_work_days = present_days + leave_count
     
@@ -295,22 +387,116 @@ async def check_out(
             tot_work_days=tot_work_days
         )
         db.add(new_summary)
-    db.commit()
-    db.refresh(attendance_record)
     
-    # Update employee status based on attendance record
-    update_employee_status(current_employee, db)
+    # Update employee status in the same transaction as the checkout
+    current_status = record_status_change(current_employee, db)
+    emp_id, company_id = current_employee.id, current_employee.company_id
+    check_in_time = attendance_record.start_time
+    db.commit()
+    status_cache.invalidate(emp_id, today)
+    invalidate_matrix(company_id, today)
+    invalidate(company_id, [emp_id])
     
     return CheckOutResponse(
         message="Checked out successfully",
-        emp_id=current_employee.id,
+        emp_id=emp_id,
         date=today,
-        check_in_time=attendance_record.start_time,
+        check_in_time=check_in_time,
         check_out_time=now,
         work_hours=work_hours_float,
         extra_hours=extra_hours_float,
-        current_status=current_employee.current_status
+        current_status=current_status
+    )
+
+
+@router.post("/punches", response_model=PunchBatchResponse)
+async def upload_punches(
+    batch: PunchBatch,
+    device: AttendanceDevice = Depends(get_current_device),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload buffered door/kiosk swipes (device authenticated with X-Device-Key)
+    Each day keeps its first "in" as check-in and the last "out" after it as
+    check-out, merged with check-ins made in the app; resending a batch is harmless
+    """
+    punches = [
+        (
+            punch.emp_id,
+            # Stored like check_in's datetime.now(): naive local time
+            punch.timestamp.astimezone().replace(tzinfo=None) if punch.timestamp.tzinfo else punch.timestamp,
+            punch.direction
+        )
+        for punch in batch.punches
+    ]
+    try:
+        result = ingest_punches(db, device.company_id, punches)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to record punches: {str(e)}"
+        )
+    invalidate_after_ingest(device.company_id, result)
+    
+    return PunchBatchResponse(
+        accepted=result.accepted,
+        duplicates=result.duplicates,
+        days_updated=len(result.days),
+        unknown_employees=list(result.unknown_employees)
+    )
+
+
+@router.post("/devices", response_model=DeviceCreateResponse, status_code=status.HTTP_201_CREATED)
+async def register_device(
+    device_data: DeviceCreate,
+    current_company = Depends(get_current_company),
+    db: Session = Depends(get_db)
+):
+    """
+    Register a door terminal or kiosk (Company/Admin only)
+    The returned key is shown only once
+    """
+    secret = secrets.token_urlsafe(32)
+    device = AttendanceDevice(
+        id=uuid.uuid4().hex,
+        company_id=current_company.id,
+        name=device_data.name,
+        key_hash=hash_device_secret(secret),
+        created_at=datetime.now()
     )
+    db.add(device)
+    db.commit()
+    
+    return DeviceCreateResponse(id=device.id, name=device.name, created_at=device.created_at, key=f"{device.id}.{secret}")
+
+
+@router.get("/devices", response_model=list[DeviceResponse])
+async def list_devices(
+    current_company = Depends(get_current_company),
+    db: Session = Depends(get_db)
+):
+    """List the company's attendance devices (Company/Admin only)"""
+    return db.query(AttendanceDevice).order_by(AttendanceDevice.created_at).all()
+
+
+@router.delete("/devices/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_device(
+    device_id: str,
+    current_company = Depends(get_current_company),
+    db: Session = Depends(get_db)
+):
+    """Revoke a device's key by removing it (Company/Admin only)"""
+    device = db.query(AttendanceDevice).filter(AttendanceDevice.id == device_id).first()
+    if not device:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found"
+        )
+    db.delete(device)
+    db.commit()
+    return None
 
 
 @router.get("/status", response_model=EmployeeStatusResponse)
@@ -324,19 +510,47 @@ async def get_employee_status(
     - 0: Checked out / No attendance record
     - 1: Checked in (working)
     - 2: On leave
+    Pure read: derived from today's attendance (cached per worker), never writes
     """
-    # Update status based on today's attendance
-    update_employee_status(current_employee, db)
-    
-    # Map status to description
-    status_map = {
-        0: "Checked out",
-        1: "Checked in (Working)",
-        2: "On leave"
-    }
+    current_status = get_today_status(current_employee.id, db)
     
     return EmployeeStatusResponse(
         emp_id=current_employee.id,
-        current_status=current_employee.current_status,
-        status_description=status_map.get(current_employee.current_status, "Unknown")
+        current_status=current_status,
+        status_description=STATUS_DESCRIPTIONS.get(current_status, "Unknown")
+    )
+
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+@router.get("/export")
+async def export_attendance(
+    month: str = Query(..., description="Month to export (YYYY-MM)"),
+    current_company = Depends(get_current_company)
+):
+    """
+    Download a month of the company's attendance as CSV (Company/Admin only)
+    Covers archived months as well as the hot table
+    """
+    year, month_num = parse_month(month)
+    company_id = current_company.id
+    
+    def generate():
+        # Streams after the request's session is gone, so use its own
+        with SessionLocal() as db:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for i, row in enumerate(export_month(db, company_id, year, month_num), 1):
+                writer.writerow(row)
+                if i % EXPORT_CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="attendance-{month}.csv"'}
     )
@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import Optional
 import base64
@@ -6,14 +10,65 @@ from database.database import get_db
 from database.models import Company, Employee
 from schemas.auth import (
     CompanySignup, CompanyLogin, CompanyResponse,
-    EmployeeLogin, EmployeeResponse, Token
+    EmployeeLogin, EmployeeResponse, Token, RefreshRequest, LogoutRequest
 )
 from auth.auth import (
-    get_password_hash, verify_password, create_access_token,
-    get_current_company, get_current_employee
+    get_password_hash, needs_rehash, dummy_password_hash, create_access_token, create_refresh_token, decode_token,
+    get_current_company, get_current_employee, token_auth_scheme
 )
+from auth.revocation import revoke_token, claim_token
+from auth.rate_limit import login_guard
+from utils.http_cache import conditional_response, not_modified, version_etag, json_body
+from services.read_cache import read_cache, company_tag
+from utils.timing import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TimedRoute)
+
+
+def issue_tokens(claims: dict) -> dict:
+    """Access and refresh token pair for the given claims"""
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": create_refresh_token(data=claims),
+        "token_type": "bearer",
+        "role": claims["role"],
+        "password_reset_required": bool(claims.get("reset_required"))
+    }
+
+
+def employee_claims(employee: Employee) -> dict:
+    claims = {"sub": employee.id, "role": "employee", "company_id": str(employee.company_id)}
+    if employee.password_reset_required:
+        # Only PUT /employees/{emp_id}/password accepts these tokens
+        claims["reset_required"] = True
+    return claims
+
+
+async def upgrade_password_hash(db: Session, model, account_id, plain_password: str, old_hash: str):
+    """Store a hash with the current BCRYPT_ROUNDS after a successful login with an outdated one"""
+    new_hash = await login_guard.rehash(plain_password)
+    if new_hash is None:
+        return
+    # Skipped if the password changed meanwhile
+    db.execute(
+        update(model)
+        .where(model.id == account_id, model.password == old_hash)
+        .values(password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def logout(db: Session, credentials: HTTPAuthorizationCredentials, logout_data: Optional[LogoutRequest]):
+    """Revoke the caller's access token and, if given, their refresh token"""
+    payload = decode_token(credentials.credentials)
+    revoke_token(db, payload)
+    if logout_data is not None and logout_data.refresh_token:
+        refresh_payload = decode_token(logout_data.refresh_token, token_type="refresh")
+        if refresh_payload.get("sub") == payload.get("sub"):
+            revoke_token(db, refresh_payload)
+    db.commit()
+    return {"message": "Successfully logged out"}
 
 
 @router.post("/company/signup", response_model=CompanyResponse, status_code=status.HTTP_201_CREATED)
@@ -69,35 +124,44 @@ async def company_signup(
 
 @router.post("/company/login", response_model=Token)
 async def company_login(
+    request: Request,
     login_data: CompanyLogin,
     db: Session = Depends(get_db)
 ):
     """Company (Admin) login endpoint"""
+    # Throttled attempts are rejected before any lookup or hashing
+    login_guard.check(request, login_data.email)
     company = db.query(Company).filter(Company.email == login_data.email).first()
+    # Hand the connection back to the pool while bcrypt runs
+    db.close()
     
-    if not company or not verify_password(login_data.password, company.password):
+    # Unknown accounts are checked against a dummy hash, so they take as long as known ones
+    password_ok = await login_guard.verify_password(
+        login_data.password, company.password if company else dummy_password_hash()
+    )
+    if not company or not password_ok:
+        login_guard.failed()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = create_access_token(
-        data={"sub": str(company.id), "role": "admin"}
-    )
+    login_guard.succeeded(request, login_data.email)
+    if needs_rehash(company.password):
+        await upgrade_password_hash(db, Company, company.id, login_data.password, company.password)
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": "admin"
-    }
+    return issue_tokens({"sub": str(company.id), "role": "admin"})
 
 
 @router.post("/company/logout")
-async def company_logout():
-    """Company (Admin) logout endpoint - Client should delete the token"""
-    return {"message": "Successfully logged out"}
+async def company_logout(
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(token_auth_scheme),
+    db: Session = Depends(get_db)
+):
+    """Company (Admin) logout endpoint - revokes the token (and the refresh token if sent)"""
+    return logout(db, credentials, logout_data)
 
 
 @router.get("/company/me", response_model=CompanyResponse)
@@ -105,56 +169,130 @@ async def get_company_profile(
     current_company: Company = Depends(get_current_company)
 ):
     """Get current company profile"""
-    return CompanyResponse(
-        id=str(current_company.id),
-        company_name=current_company.company_name,
-        email=current_company.email,
-        phone=current_company.phone,
-        logo=base64.b64encode(current_company.logo).decode('utf-8') if current_company.logo else None,
-        role="admin"
+    body = read_cache.get_or_build(
+        "GET /auth/company/me", f"company:{current_company.id}", [company_tag(current_company.id)],
+        lambda: json_body(CompanyResponse(
+            id=str(current_company.id),
+            company_name=current_company.company_name,
+            email=current_company.email,
+            phone=current_company.phone,
+            logo=base64.b64encode(current_company.logo).decode('utf-8') if current_company.logo else None,
+            role="admin"
+        ))
     )
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/employee/login", response_model=Token)
 async def employee_login(
+    request: Request,
     login_data: EmployeeLogin,
     db: Session = Depends(get_db)
 ):
     """Employee login endpoint"""
-    employee = db.query(Employee).filter(Employee.id == login_data.id).first()
+    # Throttled attempts are rejected before any lookup or hashing
+    login_guard.check(request, login_data.id)
+    employee = db.query(Employee).filter(Employee.id == login_data.id, Employee.deleted_at.is_(None)).first()
+    # Hand the connection back to the pool while bcrypt runs
+    db.close()
     
-    if not employee or not verify_password(login_data.password, employee.password):
+    # Unknown accounts are checked against a dummy hash, so they take as long as known ones
+    password_ok = await login_guard.verify_password(
+        login_data.password, employee.password if employee else dummy_password_hash()
+    )
+    if not employee or not password_ok:
+        login_guard.failed()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = create_access_token(
-        data={"sub": employee.id, "role": "employee"}
-    )
+    login_guard.succeeded(request, login_data.id)
+    # An initial password keeps its cheap hash until it is replaced
+    if needs_rehash(employee.password) and not employee.password_reset_required:
+        await upgrade_password_hash(db, Employee, employee.id, login_data.password, employee.password)
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": "employee"
-    }
+    return issue_tokens(employee_claims(employee))
 
 
 @router.post("/employee/logout")
-async def employee_logout():
-    """Employee logout endpoint - Client should delete the token"""
-    return {"message": "Successfully logged out"}
+async def employee_logout(
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(token_auth_scheme),
+    db: Session = Depends(get_db)
+):
+    """Employee logout endpoint - revokes the token (and the refresh token if sent)"""
+    return logout(db, credentials, logout_data)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Exchange a refresh token for a new access and refresh token
+    The old refresh token is revoked, so each one works once, and refresh
+    tokens issued before the employee's last password change don't work
+    """
+    payload = decode_token(refresh_data.refresh_token, token_type="refresh")
+    user_id, role = payload.get("sub"), payload.get("role")
+    
+    # The account must still exist
+    if role == "admin":
+        try:
+            account = db.get(Company, uuid.UUID(user_id))
+        except (TypeError, ValueError):
+            account = None
+    else:
+        account = db.query(Employee).filter(Employee.id == user_id, Employee.deleted_at.is_(None)).first()
+        # A password change ends the refresh tokens issued before it
+        if account is not None and account.tokens_valid_after is not None:
+            if datetime.utcfromtimestamp(payload.get("iat", 0)) < account.tokens_valid_after:
+                account = None
+    if account is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Claims are read before the commit in claim_token expires the account
+    claims = {"sub": user_id, "role": "admin"} if role == "admin" else employee_claims(account)
+    # The claim is a unique INSERT, so of two concurrent refreshes with one token only one wins
+    if not claim_token(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return issue_tokens(claims)
 
 
 @router.get("/employee/me", response_model=EmployeeResponse)
 async def get_employee_profile(
+    request: Request,
     current_employee: Employee = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
-    """Get current employee profile with all related data"""
-    return EmployeeResponse(
+    """Get current employee profile with all related data (supports If-None-Match)"""
+    # The ETag comes from the employee and row versions, so a 304 skips building
+    # the response (private info has no update path, so it isn't versioned).
+    # The ID keeps two employees with unedited rows from sharing an ETag
+    salary = current_employee.salary
+    resume = current_employee.resume_data
+    etag = version_etag(
+        current_employee.id,
+        current_employee.version,
+        salary.version if salary else 0,
+        resume.version if resume else 0
+    )
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    profile = EmployeeResponse(
         id=current_employee.id,
         company_id=str(current_employee.company_id),
         name=current_employee.name,
@@ -168,6 +306,8 @@ async def get_employee_profile(
         current_status=current_employee.current_status,
         role="employee",
         private_info=current_employee.private_info,
-        resume_data=current_employee.resume_data,
-        salary=current_employee.salary
+        resume_data=resume,
+        salary=salary
     )
+    
+    return conditional_response(request, profile, etag=etag)
@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import func, update, delete
 from database.database import get_db
 from database.models import Employee, Company, PrivateInfo, Salary, Resume, Summary, Attendance, LeaveTable
 from schemas.employee import (
     EmployeesListResponse, EmployeeCreate, EmployeeCreateResponse, 
     EmployeeDetailResponse, EmployeeUpdate, ResumeUpdate, ResumeResponse,
-    SalaryUpdate, SalaryResponse, EmployeeResponse, PasswordUpdate
+    SalaryUpdate, SalaryResponse, EmployeeResponse, PasswordUpdate,
+    EmployeeSearchResponse, EmployeeReportsResponse, OffboardRequest, OffboardResponse
 )
 from auth.auth import get_current_company, get_password_hash
-from auth.user_dependencies import get_current_user
+from auth.user_dependencies import get_current_user, get_current_user_for_password_change
+from services import hierarchy
+from services.offboarding import offboard_employees
+from services.attendance_matrix import matrix_cache
+from services.read_cache import read_cache, company_tag, employee_tag, invalidate
+from config import settings
+from utils.fast_json import dumps, rows_to_dicts
+from utils.http_cache import conditional_response, check_if_match, version_etag, precondition_failed, json_body
+from services.employee_search import search_employees, search_indexes
 from datetime import datetime
+from typing import Optional
+from utils.timing import TimedRoute
 
-router = APIRouter(prefix="/employees", tags=["Employees"])
+router = APIRouter(prefix="/employees", tags=["Employees"], route_class=TimedRoute)
+
+# Columns of EmployeeResponse, in order, for the fast JSON path
+EMPLOYEE_LIST_FIELDS = (
+    "id", "company_id", "name", "phone", "department", "email", "manager",
+    "manager_id", "location", "job_position", "prof_pic", "current_status", "version"
+)
 
 
 def generate_employee_id(db: Session, company_name: str, full_name: str, year: int) -> tuple[str, int]:
@@ -36,7 +54,10 @@ def generate_employee_id(db: Session, company_name: str, full_name: str, year: i
     year_prefix = f"{company_code}{name_code}{year}"
     
     # Count existing employees with this year prefix
-    count = db.query(Employee).filter(Employee.id.like(f"{year_prefix}%")).count()
+    # IDs are global primary keys, so count across all companies
+    count = db.query(Employee).filter(Employee.id.like(f"{year_prefix}%")).execution_options(
+        skip_tenant_filter=True
+    ).count()
     serial = count + 1
     
     # Generate ID
@@ -45,6 +66,17 @@ def generate_employee_id(db: Session, company_name: str, full_name: str, year: i
     return employee_id, serial
 
 
+def get_manager(db: Session, manager_id: str) -> Employee:
+    """Load a manager by employee ID (only the current company's employees are visible)"""
+    manager = db.query(Employee).filter(Employee.id == manager_id).first()
+    if not manager:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Manager not found"
+        )
+    return manager
+
+
 def generate_password(employee_id: str) -> str:
     """
     Generate password based on employee ID
@@ -55,16 +87,52 @@ def generate_password(employee_id: str) -> str:
 
 @router.get("/", response_model=EmployeesListResponse)
 async def get_employees(
+    request: Request,
     db: Session = Depends(get_db),
     current_company: Company = Depends(get_current_company)
 ):
     """
     Get all employees belonging to the current company
     Admin only
+    Supports If-None-Match (ETag) for conditional requests
     """
-    employees = db.query(Employee).filter(Employee.company_id == current_company.id).all()
-    
-    return {"employees": employees, "count": len(employees)}
+    company_id = current_company.id
+    body = read_cache.get_or_build(
+        "GET /employees/", f"employees:{company_id}", [company_tag(company_id)],
+        lambda: employee_list_body(db, company_id)
+    )
+    return conditional_response(request, body)
+
+
+def employee_list_body(db: Session, company_id) -> bytes:
+    """Encoded EmployeesListResponse of a company"""
+    if settings.FAST_JSON:
+        # Select plain columns and encode the tuples directly
+        rows = db.query(
+            *[getattr(Employee, field) for field in EMPLOYEE_LIST_FIELDS]
+        ).filter(Employee.company_id == company_id).all()
+        employees = rows_to_dicts(rows, EMPLOYEE_LIST_FIELDS, {"prof_pic": bytes.decode})
+        return dumps({"employees": employees, "count": len(employees)})
+    
+    employees = db.query(Employee).filter(Employee.company_id == company_id).all()
+    return json_body(EmployeesListResponse.model_validate({"employees": employees, "count": len(employees)}))
+
+
+@router.get("/search", response_model=EmployeeSearchResponse)
+async def search_company_employees(
+    q: str = Query(..., min_length=1, description="Search text; prefixes and small typos match"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Search employees by name, email, department, job position, location or manager
+    Admin only
+    Results are ranked best match first and paginated with limit/offset
+    """
+    total, results = search_employees(db, current_company.id, q, limit, offset)
+    return {"results": results, "total": total, "limit": limit, "offset": offset}
 
 
 @router.post("/", response_model=EmployeeCreateResponse, status_code=status.HTTP_201_CREATED)
@@ -78,7 +146,10 @@ async def create_employee(
     Admin only
     """
     # Check if email already exists
-    existing_employee = db.query(Employee).filter(Employee.email == employee_data.email).first()
+    # Emails are unique across companies, so look beyond the caller's tenant
+    existing_employee = db.query(Employee).filter(Employee.email == employee_data.email).execution_options(
+        skip_tenant_filter=True
+    ).first()
     if existing_employee:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -96,6 +167,13 @@ async def create_employee(
         year_of_joining
     )
     password = generate_password(employee_id)
+    # Generated passwords can use a cheap hash when they must be replaced at first login
+    password_rounds = settings.INITIAL_PASSWORD_ROUNDS if settings.FAST_INITIAL_PASSWORDS else None
+    
+    manager_name = employee_data.manager
+    if employee_data.manager_id:
+        manager = get_manager(db, employee_data.manager_id)
+        manager_name = manager_name or manager.name
     
     try:
         # Create employee
@@ -103,11 +181,13 @@ async def create_employee(
             id=employee_id,
             company_id=current_company.id,
             name=employee_data.name,
-            password=get_password_hash(password),
+            password=get_password_hash(password, password_rounds),
+            password_reset_required=settings.FAST_INITIAL_PASSWORDS,
             phone=employee_data.phone,
             department=employee_data.department,
             email=employee_data.email,
-            manager=employee_data.manager,
+            manager=manager_name,
+            manager_id=employee_data.manager_id or None,
             location=employee_data.location,
             job_position=employee_data.job_position,
             prof_pic=employee_data.prof_pic,
@@ -116,6 +196,7 @@ async def create_employee(
         
         db.add(new_employee)
         db.flush()  # Flush to make employee available for foreign keys
+        hierarchy.add_employee(db, employee_id, new_employee.manager_id)
         
         # Create private info
         private_info = PrivateInfo(
@@ -152,6 +233,8 @@ async def create_employee(
         # Commit all changes
         db.commit()
         db.refresh(new_employee)
+        search_indexes.upsert(new_employee)
+        invalidate(current_company.id, [employee_id])
         
         return {
             "id": employee_id,
@@ -177,6 +260,17 @@ async def get_employee_details(
     Get complete employee details including all related data
     Admin only
     """
+    company_id = current_company.id
+    body = read_cache.get_or_build(
+        "GET /employees/{emp_id}", f"employee:{company_id}:{emp_id}",
+        [company_tag(company_id), employee_tag(emp_id)],
+        lambda: employee_detail_body(db, emp_id)
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def employee_detail_body(db: Session, emp_id: str) -> bytes:
+    """Encoded EmployeeDetailResponse; 404 if the employee isn't visible to this session"""
     # Fetch employee
     employee = db.query(Employee).filter(Employee.id == emp_id).first()
     
@@ -186,13 +280,6 @@ async def get_employee_details(
             detail="Employee not found"
         )
     
-    # Verify employee belongs to the current company
-    if employee.company_id != current_company.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: Employee belongs to different company"
-        )
-    
     # Fetch all related data
     private_info = db.query(PrivateInfo).filter(PrivateInfo.emp_id == emp_id).first()
     salary = db.query(Salary).filter(Salary.emp_id == emp_id).first()
@@ -201,7 +288,7 @@ async def get_employee_details(
     leave_records = db.query(LeaveTable).filter(LeaveTable.emp_id == emp_id).all()
     summary = db.query(Summary).filter(Summary.emp_id == emp_id).first()
     
-    return {
+    return json_body(EmployeeDetailResponse.model_validate({
         "employee": employee,
         "private_info": private_info,
         "salary": salary,
@@ -209,19 +296,22 @@ async def get_employee_details(
         "attendance_records": attendance_records,
         "leave_records": leave_records,
         "summary": summary
-    }
+    }))
 
 
 @router.put("/{emp_id}", response_model=EmployeeResponse)
 async def update_employee(
     emp_id: str,
     employee_data: EmployeeUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_company: Company = Depends(get_current_company)
 ):
     """
     Update employee basic information only
     Admin only
+    Optional If-Match: "v<version>" rejects the update with 412 if the employee changed
     """
     # Fetch employee
     employee = db.query(Employee).filter(Employee.id == emp_id).first()
@@ -232,25 +322,41 @@ async def update_employee(
             detail="Employee not found"
         )
     
-    # Verify employee belongs to the current company
-    if employee.company_id != current_company.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: Employee belongs to different company"
-        )
+    # Reject the update if the client's copy is stale
+    check_if_match(request, version_etag(employee.version))
     
     # Get update data
     update_data = employee_data.model_dump(exclude_unset=True)
     
     # Check email uniqueness if email is being updated
     if "email" in update_data and update_data["email"] != employee.email:
-        existing = db.query(Employee).filter(Employee.email == update_data["email"]).first()
+        existing = db.query(Employee).filter(Employee.email == update_data["email"]).execution_options(
+            skip_tenant_filter=True
+        ).first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
     
+    # Move the employee (and their reports) in the reporting tree
+    if "manager_id" in update_data and update_data["manager_id"] != employee.manager_id:
+        manager_id = update_data["manager_id"] or None
+        update_data["manager_id"] = manager_id
+        manager = get_manager(db, manager_id) if manager_id else None
+        try:
+            hierarchy.move_employee(db, employee.id, manager_id)
+        except hierarchy.HierarchyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        update_data.setdefault("manager", manager.name if manager else None)
+    
+    if "name" in update_data and update_data["name"] != employee.name:
+        hierarchy.rename_manager(db, employee.id, update_data["name"])
+    
     # Update employee fields
     for key, value in update_data.items():
         setattr(employee, key, value)
@@ -258,6 +364,10 @@ async def update_employee(
     try:
         db.commit()
         db.refresh(employee)
+    except StaleDataError:
+        # Another request updated the row between our read and write
+        db.rollback()
+        raise precondition_failed()
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -265,6 +375,10 @@ async def update_employee(
             detail=f"Failed to update employee: {str(e)}"
         )
     
+    search_indexes.upsert(employee)
+    # Renames and moves also change the manager shown for the reports
+    invalidate(current_company.id, [emp_id])
+    response.headers["ETag"] = version_etag(employee.version)
     return employee
 
 
@@ -272,12 +386,15 @@ async def update_employee(
 async def update_employee_resume(
     emp_id: str,
     resume_data: ResumeUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Update employee resume details
     Accessible by: Admin (company) or the employee themselves
+    Optional If-Match: "v<version>" rejects the update with 412 if the resume changed
     """
     # Fetch employee
     employee = db.query(Employee).filter(Employee.id == emp_id).first()
@@ -289,13 +406,9 @@ async def update_employee_resume(
         )
     
     # Authorization check: user must be either admin or the employee themselves
+    # Admins only find employees of their own company (the session is tenant scoped)
     if current_user["user_type"] == "company":
-        # Admin can update any employee in their company
-        if str(employee.company_id) != current_user["user_id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied: Employee belongs to different company"
-            )
+        pass
     elif current_user["user_type"] == "employee":
         # Employee can only update their own resume
         if employee.id != current_user["user_id"]:
@@ -314,6 +427,7 @@ async def update_employee_resume(
     
     # Fetch or create resume
     resume = db.query(Resume).filter(Resume.emp_id == emp_id).first()
+    check_if_match(request, version_etag(resume.version) if resume else None)
     
     if resume:
         # Update existing resume
@@ -330,6 +444,9 @@ async def update_employee_resume(
     try:
         db.commit()
         db.refresh(resume)
+    except StaleDataError:
+        db.rollback()
+        raise precondition_failed()
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -337,6 +454,8 @@ async def update_employee_resume(
             detail=f"Failed to update resume: {str(e)}"
         )
     
+    invalidate(emp_ids=[emp_id])
+    response.headers["ETag"] = version_etag(resume.version)
     return resume
 
 
@@ -344,12 +463,15 @@ async def update_employee_resume(
 async def update_employee_salary(
     emp_id: str,
     salary_data: SalaryUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_company: Company = Depends(get_current_company)
 ):
     """
     Update employee salary details
     Admin only
+    Optional If-Match: "v<version>" rejects the update with 412 if the salary changed
     """
     # Fetch employee
     employee = db.query(Employee).filter(Employee.id == emp_id).first()
@@ -360,18 +482,12 @@ async def update_employee_salary(
             detail="Employee not found"
         )
     
-    # Verify employee belongs to the current company
-    if employee.company_id != current_company.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: Employee belongs to different company"
-        )
-    
     # Get update data
     update_data = salary_data.model_dump(exclude_unset=True)
     
     # Fetch or create salary
     salary = db.query(Salary).filter(Salary.emp_id == emp_id).first()
+    check_if_match(request, version_etag(salary.version) if salary else None)
     
     if salary:
         # Update existing salary
@@ -388,6 +504,9 @@ async def update_employee_salary(
     try:
         db.commit()
         db.refresh(salary)
+    except StaleDataError:
+        db.rollback()
+        raise precondition_failed()
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -395,9 +514,78 @@ async def update_employee_salary(
             detail=f"Failed to update salary: {str(e)}"
         )
     
+    invalidate(emp_ids=[emp_id])
+    response.headers["ETag"] = version_etag(salary.version)
     return salary
 
 
+@router.get("/{emp_id}/reports", response_model=EmployeeReportsResponse)
+async def get_employee_reports(
+    emp_id: str,
+    depth: Optional[int] = Query(None, ge=1, description="Levels below the employee (default: all)"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get everyone reporting to an employee, directly or indirectly
+    Accessible by: Admin (company) or the employee themselves
+    One query on the hierarchy closure table, nearest levels first
+    """
+    if current_user["user_type"] == "employee" and emp_id != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: You can only view your own reports"
+        )
+    
+    employee = db.query(Employee.id).filter(Employee.id == emp_id).first()
+    if not employee:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Employee not found"
+        )
+    
+    reports = hierarchy.get_reports(db, emp_id, depth)
+    return {
+        "emp_id": emp_id,
+        "reports": [report._asdict() for report in reports],
+        "count": len(reports)
+    }
+
+
+@router.post("/offboard", response_model=OffboardResponse)
+async def offboard_company_employees(
+    offboard_data: OffboardRequest,
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Remove many employees and all their data in one transaction
+    Admin only
+    Their reports move up to the nearest manager who stays
+    """
+    try:
+        removed = offboard_employees(db, current_company.id, offboard_data.emp_ids, settings.SOFT_DELETE_EMPLOYEES)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to offboard employees: {str(e)}"
+        )
+    
+    for emp_id in removed:
+        search_indexes.remove(current_company.id, emp_id)
+    if removed:
+        matrix_cache.clear()
+        invalidate(current_company.id, removed)
+    removed_ids = set(removed)
+    return {
+        "removed": removed,
+        "not_found": [emp_id for emp_id in dict.fromkeys(offboard_data.emp_ids) if emp_id not in removed_ids],
+        "soft_deleted": settings.SOFT_DELETE_EMPLOYEES
+    }
+
+
 @router.delete("/{emp_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_employee(
     emp_id: str,
@@ -417,16 +605,20 @@ async def delete_employee(
             detail="Employee not found"
         )
     
-    # Verify employee belongs to the current company
-    if employee.company_id != current_company.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: Employee belongs to different company"
-        )
-    
-    # Delete employee (cascade will delete all related records)
+    # Their reports move up to their manager; the database cascades to all
+    # related records, or with soft delete the nightly purge does it later
     try:
-        db.delete(employee)
+        hierarchy.remove_employee(db, employee)
+        # Set-based, so a concurrent version bump (e.g. a check-in) can't fail the delete
+        if settings.SOFT_DELETE_EMPLOYEES:
+            db.execute(
+                update(Employee)
+                .where(Employee.id == emp_id)
+                .values(deleted_at=datetime.utcnow(), version=Employee.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            db.execute(delete(Employee).where(Employee.id == emp_id).execution_options(synchronize_session=False))
         db.commit()
     except Exception as e:
         db.rollback()
@@ -435,6 +627,8 @@ async def delete_employee(
             detail=f"Failed to delete employee: {str(e)}"
         )
     
+    search_indexes.remove(current_company.id, emp_id)
+    invalidate(current_company.id, [emp_id])
     return None
 
 
@@ -443,7 +637,7 @@ async def update_employee_password(
     emp_id: str,
     password_data: PasswordUpdate,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user_for_password_change)
 ):
     """
     Update employee password
@@ -459,13 +653,9 @@ async def update_employee_password(
         )
     
     # Authorization check: user must be either admin or the employee themselves
+    # Admins only find employees of their own company (the session is tenant scoped)
     if current_user["user_type"] == "company":
-        # Admin can update any employee in their company
-        if str(employee.company_id) != current_user["user_id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied: Employee belongs to different company"
-            )
+        pass
     elif current_user["user_type"] == "employee":
         # Employee can only update their own password
         if employee.id != current_user["user_id"]:
@@ -479,10 +669,23 @@ async def update_employee_password(
             detail="Access denied"
         )
     
-    # Hash and update password
-    employee.password = get_password_hash(password_data.new_password)
+    # Hash and update password; this also ends the forced reset of an initial password.
+    # Refresh tokens issued so far stop working (JWT iat has whole seconds). The
+    # write is set-based, so it doesn't conflict with a concurrent version bump
+    new_hash = get_password_hash(password_data.new_password)
     
     try:
+        db.execute(
+            update(Employee)
+            .where(Employee.id == emp_id)
+            .values(
+                password=new_hash,
+                password_reset_required=False,
+                tokens_valid_after=datetime.utcnow().replace(microsecond=0),
+                version=Employee.version + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
     except Exception as e:
         db.rollback()
@@ -491,4 +694,5 @@ async def update_employee_password(
             detail=f"Failed to update password: {str(e)}"
         )
     
+    invalidate(emp_ids=[emp_id])
     return {"message": "Password updated successfully"}
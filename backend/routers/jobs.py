@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+import os
+from database.database import get_db
+from database.models import Company, Job
+from schemas.job import JobResponse
+from auth.auth import get_current_company
+from services.jobs import JOB_COMPLETED
+from utils.timing import TimedRoute
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], route_class=TimedRoute)
+
+
+def get_company_job(job_id: str, db: Session, current_company: Company) -> Job:
+    """Fetch a job of the current company or raise 404"""
+    job = db.query(Job).filter(
+        Job.job_id == job_id,
+        Job.company_id == current_company.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Get status and progress of a background job (poll this endpoint)
+    Admin only
+    """
+    return get_company_job(job_id, db, current_company)
+
+
+@router.get("/{job_id}/download")
+async def download_job_result(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Download the result file of a completed job
+    Admin only
+    """
+    job = get_company_job(job_id, db, current_company)
+    
+    if job.status != JOB_COMPLETED or not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job result not available (status: {job.status})"
+        )
+    
+    return FileResponse(job.result_path, filename=os.path.basename(job.result_path))
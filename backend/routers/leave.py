@@ -1,12 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from database.database import get_db
 from database.models import LeaveTable, Employee
+from database.tenancy import tenant_session
 from schemas.leave import LeaveRequest, LeaveResponse, LeaveListResponse
 from auth.user_dependencies import get_current_user
+from config import settings
+from utils.fast_json import dumps, rows_to_dicts
+from utils.http_cache import json_body
+from services.hierarchy import subtree_ids
+from services.read_cache import read_cache, company_tag, employee_tag, invalidate
+from utils.single_flight import single_flight, query_key
+from utils.timing import TimedRoute
 
-router = APIRouter(prefix="/leaves", tags=["Leaves"])
+router = APIRouter(prefix="/leaves", tags=["Leaves"], route_class=TimedRoute)
+
+# Columns of LeaveResponse, in order, for the fast JSON path
+LEAVE_FIELDS = ("leave_id", "emp_id", "start_date", "end_date", "leave_type", "is_approved")
+LEAVE_COLUMNS = [getattr(LeaveTable, field) for field in LEAVE_FIELDS]
+
+
+def leave_list_body(query) -> bytes:
+    """Encoded LeaveListResponse, using the fast JSON path when enabled"""
+    if settings.FAST_JSON:
+        leaves = rows_to_dicts(query.with_entities(*LEAVE_COLUMNS).all(), LEAVE_FIELDS)
+        return dumps({"leaves": leaves, "count": len(leaves)})
+    
+    leaves = query.all()
+    return json_body(LeaveListResponse.model_validate({"leaves": leaves, "count": len(leaves)}))
+
+
+def apply_status_filter(query, status_filter: Optional[str]):
+    """Filter by ?status=pending or ?status=approved (anything else: no filter)"""
+    if status_filter:
+        if status_filter.lower() == "pending":
+            query = query.filter((LeaveTable.is_approved == False) | (LeaveTable.is_approved == None))
+        elif status_filter.lower() == "approved":
+            query = query.filter(LeaveTable.is_approved == True)
+    return query
 
 
 @router.post("/request", response_model=LeaveResponse, status_code=status.HTTP_201_CREATED)
@@ -46,6 +78,7 @@ async def request_leave(
     db.add(new_leave)
     db.commit()
     db.refresh(new_leave)
+    invalidate(current_user["company_id"], [emp_id])
     
     return new_leave
 
@@ -53,6 +86,7 @@ async def request_leave(
 @router.get("/admin", response_model=LeaveListResponse)
 async def get_all_leaves_admin(
     status_filter: Optional[str] = Query(None, description="Filter by status: pending, approved"),
+    manager_id: Optional[str] = Query(None, description="Only leave of employees reporting to this manager"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -60,6 +94,7 @@ async def get_all_leaves_admin(
     Get all leave requests for admin
     Admin only - returns all employees' leave requests
     Optional filter: ?status=pending or ?status=approved
+    Optional filter: ?manager_id=<emp_id> for a manager's whole team
     """
     # Check if user is admin
     if current_user["role"] != "admin":
@@ -68,19 +103,30 @@ async def get_all_leaves_admin(
             detail="Only admin can access all leave requests"
         )
     
-    # Build query
-    query = db.query(LeaveTable)
-    
-    # Apply status filter if provided
-    if status_filter:
-        if status_filter.lower() == "pending":
-            query = query.filter((LeaveTable.is_approved == False) | (LeaveTable.is_approved == None))
-        elif status_filter.lower() == "approved":
-            query = query.filter(LeaveTable.is_approved == True)
-    
-    leaves = query.all()
-    
-    return {"leaves": leaves, "count": len(leaves)}
+    company_id = current_user["company_id"]
+    status_key = (status_filter or "").lower()
+    db.close()
+    
+    def build() -> bytes:
+        # Coalesced builds may outlive this request, so they use a session of their own
+        with tenant_session(company_id) as build_db:
+            # The session's tenant filter limits the query to this company's employees
+            query = build_db.query(LeaveTable)
+            if manager_id:
+                query = query.filter(LeaveTable.emp_id.in_(subtree_ids(manager_id)))
+            query = apply_status_filter(query, status_filter)
+            return read_cache.get_or_build(
+                "GET /leaves/admin", f"leaves:{company_id}:{manager_id}:{status_key}",
+                [company_tag(company_id)],
+                lambda: leave_list_body(query)
+            )
+    
+    # Identical requests arriving together (e.g. on a cache miss) share one build
+    body = await single_flight.run(
+        "GET /leaves/admin", (company_id, query_key(manager_id=manager_id, status=status_key)), build,
+        timeout=settings.COALESCE_WAIT_SECONDS, enabled=settings.COALESCE_ENABLED
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/emp", response_model=LeaveListResponse)
@@ -98,18 +144,14 @@ async def get_employee_leaves(
     emp_id = current_user["user_id"]
     
     # Build query for this employee only
-    query = db.query(LeaveTable).filter(LeaveTable.emp_id == emp_id)
+    query = apply_status_filter(db.query(LeaveTable).filter(LeaveTable.emp_id == emp_id), status_filter)
     
-    # Apply status filter if provided
-    if status_filter:
-        if status_filter.lower() == "pending":
-            query = query.filter((LeaveTable.is_approved == False) | (LeaveTable.is_approved == None))
-        elif status_filter.lower() == "approved":
-            query = query.filter(LeaveTable.is_approved == True)
-    
-    leaves = query.all()
-    
-    return {"leaves": leaves, "count": len(leaves)}
+    body = read_cache.get_or_build(
+        "GET /leaves/emp", f"leaves:{current_user['company_id']}:emp:{emp_id}:{(status_filter or '').lower()}",
+        [employee_tag(emp_id)],
+        lambda: leave_list_body(query)
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.put("/{leave_id}/approve", response_model=LeaveResponse)
@@ -141,6 +183,7 @@ async def approve_leave(
     leave.is_approved = True
     db.commit()
     db.refresh(leave)
+    invalidate(current_user["company_id"], [leave.emp_id])
     
     return leave
 
@@ -171,7 +214,9 @@ async def reject_leave(
         )
     
     # Delete the leave request
+    emp_id = leave.emp_id
     db.delete(leave)
     db.commit()
+    invalidate(current_user["company_id"], [emp_id])
     
     return {"message": "Leave request rejected and deleted successfully"}
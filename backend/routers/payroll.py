@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database.database import get_db
+from database.models import Company, PayrollRun, Payroll
+from schemas.payroll import PayrollRunResponse, PayrollRunListResponse, PayrollRunDetailResponse
+from schemas.job import JobResponse
+from auth.auth import get_current_company
+from services.payroll import run_payroll
+from services.jobs import enqueue_job
+from services import payslips  # noqa: F401 - registers the "payslips" job handler
+from utils.dates import parse_month
+from utils.timing import TimedRoute
+
+router = APIRouter(prefix="/payroll", tags=["Payroll"], route_class=TimedRoute)
+
+
+@router.post("/run", response_model=PayrollRunResponse, status_code=status.HTTP_201_CREATED)
+async def create_payroll_run(
+    month: str = Query(..., description="Month to compute pay for (YYYY-MM)"),
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Compute monthly pay for every employee of the company
+    Admin only
+    Re-running a month replaces the previous run
+    """
+    year, month_num = parse_month(month)
+    
+    # The computation is CPU and DB bound, keep it off the event loop
+    return await run_in_threadpool(run_payroll, db, current_company.id, year, month_num)
+
+
+@router.get("/runs", response_model=PayrollRunListResponse)
+async def get_payroll_runs(
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    List payroll runs of the company, newest month first
+    Admin only
+    """
+    runs = db.query(PayrollRun).filter(
+        PayrollRun.company_id == current_company.id
+    ).order_by(PayrollRun.month.desc()).all()
+    
+    return {"runs": runs, "count": len(runs)}
+
+
+@router.get("/runs/{run_id}", response_model=PayrollRunDetailResponse)
+async def get_payroll_run(
+    run_id: int,
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Get a payroll run with the computed pay of every employee
+    Admin only
+    """
+    run = db.query(PayrollRun).filter(
+        PayrollRun.run_id == run_id,
+        PayrollRun.company_id == current_company.id
+    ).first()
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payroll run not found"
+        )
+    
+    lines = db.query(Payroll).filter(Payroll.run_id == run_id).order_by(Payroll.emp_id).all()
+    
+    return {"run": run, "lines": lines, "count": len(lines)}
+
+
+@router.post("/runs/{run_id}/payslips", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_payslips(
+    run_id: int,
+    db: Session = Depends(get_db),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Start a background job rendering the payslips of a payroll run into a zip archive
+    Admin only
+    Poll GET /jobs/{job_id} for progress and download from GET /jobs/{job_id}/download
+    """
+    run = db.query(PayrollRun).filter(
+        PayrollRun.run_id == run_id,
+        PayrollRun.company_id == current_company.id
+    ).first()
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payroll run not found"
+        )
+    
+    return enqueue_job(db, current_company.id, "payslips", {"run_id": run_id})
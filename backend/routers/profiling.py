@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
+from typing import List
+from config import settings
+from database.models import Company
+from schemas.profile import ProfileTokenResponse, ProfileResponse
+from auth.auth import get_current_company
+from utils.profiler import ProfileStore, sign_profile_token, to_speedscope
+from utils.timing import TimedRoute
+
+router = APIRouter(prefix="/profiles", tags=["Profiling"], route_class=TimedRoute)
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILER_MAX_PROFILES)
+
+
+@router.post("/token", response_model=ProfileTokenResponse)
+async def create_profile_token(current_company: Company = Depends(get_current_company)):
+    """
+    Get an X-Profile header value; requests of this company sending it are profiled until it expires
+    Admin only
+    """
+    expires_at = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=settings.PROFILER_TOKEN_MINUTES)
+    timestamp = int((expires_at - datetime(1970, 1, 1)).total_seconds())
+    return {
+        "header": sign_profile_token(settings.SECRET_KEY, str(current_company.id), timestamp),
+        "expires_at": expires_at
+    }
+
+
+@router.get("/", response_model=List[ProfileResponse])
+async def list_profiles(current_company: Company = Depends(get_current_company)):
+    """
+    Profiles of this company's requests, newest first
+    Admin only
+    """
+    return await run_in_threadpool(profile_store.for_owner, str(current_company.id))
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Download a profile as collapsed stacks (flamegraph.pl, inferno) or speedscope JSON
+    Admin only
+    """
+    profile = await run_in_threadpool(profile_store.load, profile_id, str(current_company.id))
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    metadata, collapsed = profile
+    if format == "speedscope":
+        return to_speedscope(metadata, collapsed)
+    return PlainTextResponse(collapsed)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import date, datetime
 
 
@@ -49,6 +49,21 @@ class EmployeeAttendanceResponse(BaseModel):
     attendance_records: List[AttendanceRecord]
 
 
+# Company Attendance Matrix (employees x days of a month)
+# One entry per attendance row across emp_index/day_index/status_codes/hours;
+# status_codes packs one character per entry (P present, W working, L leave)
+class AttendanceMatrixResponse(BaseModel):
+    month: str
+    days_in_month: int
+    employee_ids: List[str]
+    employee_names: List[Optional[str]]
+    departments: List[Optional[str]]
+    emp_index: List[int]
+    day_index: List[int]  # 0-based day of month
+    status_codes: str
+    hours: List[Optional[float]]
+
+
 # Check-in/Check-out Response
 class CheckInResponse(BaseModel):
     message: str
@@ -74,3 +89,38 @@ class EmployeeStatusResponse(BaseModel):
     emp_id: str
     current_status: int
     status_description: str
+
+
+# Punch uploads from attendance devices
+class Punch(BaseModel):
+    emp_id: str
+    timestamp: datetime  # Local time of the swipe
+    direction: Literal["in", "out"]
+
+
+class PunchBatch(BaseModel):
+    punches: List[Punch] = Field(..., min_length=1, max_length=50000)
+
+
+class PunchBatchResponse(BaseModel):
+    accepted: int
+    duplicates: int
+    days_updated: int
+    unknown_employees: List[str]
+
+
+class DeviceCreate(BaseModel):
+    name: str
+
+
+class DeviceResponse(BaseModel):
+    id: str
+    name: str
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class DeviceCreateResponse(DeviceResponse):
+    key: str  # Shown once; send as X-Device-Key
@@ -107,8 +107,18 @@ class EmployeeResponse(BaseModel):
 # Token Schemas
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None  # Exchange at POST /auth/refresh when the access token expires
     token_type: str
     role: str
+    password_reset_required: bool = False  # Change the password before using other endpoints
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None  # Revoked along with the access token
 
 
 class TokenData(BaseModel):
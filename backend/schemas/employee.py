@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from uuid import UUID
 from datetime import date, datetime
@@ -12,10 +12,12 @@ class EmployeeResponse(BaseModel):
     department: Optional[str] = None
     email: EmailStr
     manager: Optional[str] = None
+    manager_id: Optional[str] = None
     location: Optional[str] = None
     job_position: Optional[str] = None
     prof_pic: Optional[str] = None  # Base64 encoded
     current_status: Optional[int] = None
+    version: Optional[int] = None  # Send as If-Match: "v<version>" when updating
     
     class Config:
         from_attributes = True
@@ -26,6 +28,49 @@ class EmployeesListResponse(BaseModel):
     count: int
 
 
+class EmployeeSearchResult(BaseModel):
+    id: str
+    name: str
+    email: str
+    department: Optional[str] = None
+    job_position: Optional[str] = None
+    location: Optional[str] = None
+    manager: Optional[str] = None
+    score: float
+
+
+class EmployeeSearchResponse(BaseModel):
+    results: list[EmployeeSearchResult]
+    total: int  # Matches across all pages
+    limit: int
+    offset: int
+
+
+class ReportNode(BaseModel):
+    id: str
+    name: str
+    department: Optional[str] = None
+    job_position: Optional[str] = None
+    manager_id: Optional[str] = None
+    depth: int  # 1 = direct report
+
+
+class EmployeeReportsResponse(BaseModel):
+    emp_id: str
+    reports: list[ReportNode]
+    count: int
+
+
+class OffboardRequest(BaseModel):
+    emp_ids: list[str] = Field(..., min_length=1)
+
+
+class OffboardResponse(BaseModel):
+    removed: list[str]
+    not_found: list[str]
+    soft_deleted: bool  # True when rows are only marked and purged later
+
+
 # Detailed response schemas
 class PrivateInfoResponse(BaseModel):
     emp_id: str
@@ -58,6 +103,7 @@ class SalaryResponse(BaseModel):
     pf1: Optional[int] = None
     pf2: Optional[int] = None
     prof_tax: Optional[int] = None
+    version: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -68,6 +114,7 @@ class ResumeResponse(BaseModel):
     about: Optional[str] = None
     skills: Optional[str] = None
     certification: Optional[str] = None
+    version: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -159,7 +206,8 @@ class EmployeeCreate(BaseModel):
     phone: str
     department: str
     email: EmailStr
-    manager: str
+    manager: Optional[str] = None  # Defaults to the name of manager_id's employee
+    manager_id: Optional[str] = None  # Employee ID of the manager, builds the reporting tree
     location: str
     job_position: str
     prof_pic: Optional[bytes] = None
@@ -185,6 +233,7 @@ class EmployeeUpdate(BaseModel):
     department: Optional[str] = None
     email: Optional[EmailStr] = None
     manager: Optional[str] = None
+    manager_id: Optional[str] = None  # null moves the employee to the top of the tree
     location: Optional[str] = None
     job_position: Optional[str] = None
     prof_pic: Optional[bytes] = None
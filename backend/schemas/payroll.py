@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+from datetime import datetime
+
+
+class PayrollRunResponse(BaseModel):
+    run_id: int
+    company_id: UUID
+    month: str
+    working_days: int
+    employee_count: int
+    total_gross: int
+    total_deductions: int
+    total_net: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PayrollRunListResponse(BaseModel):
+    runs: List[PayrollRunResponse]
+    count: int
+
+
+class PayrollLineResponse(BaseModel):
+    emp_id: str
+    present_days: int
+    leave_days: int
+    paid_days: int
+    overtime_hours: float
+    gross_pay: int
+    overtime_pay: int
+    deductions: int
+    net_pay: int
+    
+    class Config:
+        from_attributes = True
+
+
+class PayrollRunDetailResponse(BaseModel):
+    run: PayrollRunResponse
+    lines: List[PayrollLineResponse]
+    count: int
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ProfileTokenResponse(BaseModel):
+    header: str  # Send as the X-Profile request header
+    expires_at: datetime
+
+
+class ProfileResponse(BaseModel):
+    profile_id: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    started_at: datetime
+    duration_ms: float
+    samples: int
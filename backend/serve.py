@@ -0,0 +1,86 @@
+"""
+Production entry point
+
+Runs uvicorn with multiple worker processes, uvloop/httptools when they are
+installed, and optional worker recycling after a number of requests.
+
+Usage (from backend/):
+    python serve.py [--workers N] [--max-requests N] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import importlib.util
+import os
+import uvicorn
+from config import settings
+
+
+def available_cores() -> int:
+    """Number of CPU cores this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """Worker count from settings, or one per available core"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return available_cores()
+
+
+def pick_loop() -> str:
+    """Use uvloop if installed, otherwise the stdlib asyncio loop"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def pick_http() -> str:
+    """Use the httptools parser if installed, otherwise h11"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API server in production mode")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY or one per core)")
+    parser.add_argument("--max-requests", type=int, default=settings.MAX_REQUESTS,
+                        help="Gracefully restart a worker after this many requests (0 = never)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.max_requests and args.workers == 1:
+        # A single worker is not supervised by uvicorn, so recycling it would stop the server
+        print("Note: with one worker, --max-requests exits the server; run it under a process manager")
+
+    if args.workers > 1 and settings.READ_CACHE_ENABLED and not settings.CACHE_REDIS_URL:
+        # Invalidations would only reach the worker that made the write
+        print("Note: READ_CACHE_ENABLED with several workers needs CACHE_REDIS_URL; without it reads may be stale")
+
+    if args.workers > 1:
+        # Each worker has its own idempotency store and in-flight set
+        print("Note: Idempotency-Key replay is per worker; a retry that reaches another worker runs again")
+
+    loop = pick_loop()
+    http = pick_http()
+    print(f"Starting {args.workers} worker(s) on {args.host}:{args.port} (loop={loop}, http={http})")
+
+    # When a worker reaches limit_max_requests it finishes in-flight requests
+    # and exits; the uvicorn supervisor then starts a replacement
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        limit_max_requests=args.max_requests or None,
+        log_level=args.log_level,
+        access_log=settings.DEBUG,
+        reload=False,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
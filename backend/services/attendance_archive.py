@@ -0,0 +1,247 @@
+"""
+Attendance storage lifecycle: monthly partitions and archival of old months
+
+On Postgres `attendance` is range-partitioned by month on `date` (migration
+0006), so date-filtered queries only touch the months they need. Future
+partitions are created ahead of time by `ensure_partitions`.
+
+Months older than the retention window are written to a gzipped CSV under
+ATTENDANCE_ARCHIVE_DIR (all companies, one file per month), indexed in
+`attendance_archive`, and removed from the hot table; on Postgres that is a
+partition drop rather than a row-by-row delete. The export endpoint reads
+the hot table and the archive alike. The archived days are added to each
+employee's Summary.archived_* counts in the same transaction, so summary
+recomputes from the hot table keep lifetime totals.
+"""
+import csv
+import gzip
+import os
+from datetime import date, datetime
+from typing import Iterator, Optional
+from sqlalchemy import select, update, insert, delete, case, func, text, bindparam
+from sqlalchemy.orm import Session
+from config import settings
+from database.models import Attendance, AttendanceArchive, Employee, Summary
+from utils.dates import add_months, month_bounds
+
+ARCHIVE_COLUMNS = (
+    "company_id", "emp_id", "date", "start_time", "end_time",
+    "work_hours", "extra_hours", "on_leave"
+)
+EXPORT_COLUMNS = ARCHIVE_COLUMNS[1:]
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"attendance_y{year:04d}m{month:02d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """Whether attendance is a partitioned table (Postgres after migration 0006)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'attendance')"
+    )).scalar())
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None) -> int:
+    """
+    Create the partitions for this month and the next `months_ahead` months
+    Returns how many months are covered; 0 when the table is not partitioned
+    """
+    if months_ahead is None:
+        months_ahead = settings.ATTENDANCE_PARTITIONS_AHEAD
+    if not is_partitioned(db):
+        return 0
+
+    this_month = date.today().replace(day=1)
+    for offset in range(months_ahead + 1):
+        first = add_months(this_month, offset)
+        following = add_months(first, 1)
+        # DDL takes no bind parameters; the bounds are generated dates
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(first.year, first.month)} "
+            f"PARTITION OF attendance FOR VALUES FROM ('{first.isoformat()}') TO ('{following.isoformat()}')"
+        ))
+    db.commit()
+    return months_ahead + 1
+
+
+def _format(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_path(year: int, month: int) -> str:
+    return os.path.join(settings.ATTENDANCE_ARCHIVE_DIR, f"attendance-{year:04d}-{month:02d}.csv.gz")
+
+
+def _month_key(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+def _carry_summary_counts(db: Session, start: date, end: date):
+    """Add the present and leave days about to leave the hot table to the summaries"""
+    present_days = func.sum(case((Attendance.on_leave == False, 1), else_=0))
+    leave_count = func.sum(case((Attendance.on_leave == True, 1), else_=0))
+    counts = db.execute(
+        select(Attendance.emp_id, present_days, leave_count)
+        .where(Attendance.date >= start, Attendance.date <= end)
+        .group_by(Attendance.emp_id)
+    ).all()
+    if not counts:
+        return
+    existing = set(db.execute(
+        select(Summary.emp_id).where(Summary.emp_id.in_([emp_id for emp_id, _, _ in counts]))
+    ).scalars())
+    to_update = [
+        {"b_emp_id": emp_id, "b_present": present, "b_leave": leave}
+        for emp_id, present, leave in counts if emp_id in existing
+    ]
+    to_insert = [
+        {
+            "emp_id": emp_id, "present_days": present, "leave_count": leave, "tot_work_days": present + leave,
+            "archived_present_days": present, "archived_leave_count": leave
+        }
+        for emp_id, present, leave in counts if emp_id not in existing
+    ]
+    if to_update:
+        db.execute(
+            update(Summary.__table__)
+            .where(Summary.emp_id == bindparam("b_emp_id"))
+            .values(
+                archived_present_days=Summary.archived_present_days + bindparam("b_present"),
+                archived_leave_count=Summary.archived_leave_count + bindparam("b_leave")
+            ),
+            to_update
+        )
+    if to_insert:
+        db.execute(insert(Summary), to_insert)
+
+
+def archive_month(db: Session, year: int, month: int) -> int:
+    """
+    Move one month of attendance from the hot table into its archive file
+    Rows already archived for the month are kept; returns the rows moved
+    """
+    start, end = month_bounds(year, month)
+    key = _month_key(year, month)
+    path = _archive_path(year, month)
+    archive = db.get(AttendanceArchive, key)
+
+    os.makedirs(settings.ATTENDANCE_ARCHIVE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    moved = 0
+    with gzip.open(tmp_path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ARCHIVE_COLUMNS)
+        previous = 0
+        if archive is not None:
+            # Late rows for an archived month: carry the earlier ones over
+            for row in read_archive(archive.path):
+                writer.writerow(row)
+                previous += 1
+
+        rows = db.execute(
+            select(
+                Employee.company_id, Attendance.emp_id, Attendance.date,
+                Attendance.start_time, Attendance.end_time, Attendance.work_hours,
+                Attendance.extra_hours, Attendance.on_leave
+            )
+            .join(Employee, Employee.id == Attendance.emp_id)
+            .where(Attendance.date >= start, Attendance.date <= end)
+            .order_by(Attendance.emp_id, Attendance.date)
+            .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+        )
+        for row in rows:
+            writer.writerow([_format(value) for value in row])
+            moved += 1
+
+    if moved == 0:
+        os.remove(tmp_path)
+        return 0
+
+    if archive is None:
+        archive = AttendanceArchive(month=key)
+        db.add(archive)
+    archive.path = path
+    archive.row_count = previous + moved
+    archive.archived_at = datetime.now()
+    _carry_summary_counts(db, start, end)
+
+    # Dropping the month's partition is instant; the DELETE covers plain
+    # tables and rows that landed in the default partition
+    if is_partitioned(db):
+        name = partition_name(year, month)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            db.execute(text(f"ALTER TABLE attendance DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+    db.execute(delete(Attendance).where(Attendance.date >= start, Attendance.date <= end))
+
+    # The file is in place before the rows go away; if the commit fails the
+    # hot rows stay and the next run rewrites the file
+    os.replace(tmp_path, path)
+    db.commit()
+    return moved
+
+
+def archive_expired(db: Session, retention_months: Optional[int] = None) -> int:
+    """Archive every month that started before the retention window; returns rows moved"""
+    if retention_months is None:
+        retention_months = settings.ATTENDANCE_RETENTION_MONTHS
+    if retention_months <= 0:
+        return 0
+
+    cutoff = add_months(date.today(), -retention_months)
+    oldest = db.execute(select(func.min(Attendance.date)).where(Attendance.date < cutoff)).scalar()
+    if oldest is None:
+        return 0
+
+    moved = 0
+    month = oldest.replace(day=1)
+    while month < cutoff:
+        moved += archive_month(db, month.year, month.month)
+        month = add_months(month, 1)
+    return moved
+
+
+def read_archive(path: str) -> Iterator[list[str]]:
+    """Rows of an archive file, without the header"""
+    with gzip.open(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+
+def export_month(db: Session, company_id, year: int, month: int) -> Iterator[list[str]]:
+    """
+    CSV rows (header first) of one company's attendance for a month,
+    from the archive file and the hot table
+    """
+    yield list(EXPORT_COLUMNS)
+
+    archive = db.get(AttendanceArchive, _month_key(year, month))
+    if archive is not None and os.path.exists(archive.path):
+        company_key = str(company_id)
+        for row in read_archive(archive.path):
+            if row[0] == company_key:
+                yield row[1:]
+
+    start, end = month_bounds(year, month)
+    rows = db.execute(
+        select(
+            Attendance.emp_id, Attendance.date, Attendance.start_time, Attendance.end_time,
+            Attendance.work_hours, Attendance.extra_hours, Attendance.on_leave
+        )
+        .join(Employee, Employee.id == Attendance.emp_id)
+        .where(Employee.company_id == company_id, Attendance.date >= start, Attendance.date <= end)
+        .order_by(Attendance.emp_id, Attendance.date)
+        .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+    )
+    for row in rows:
+        yield [_format(value) for value in row]
@@ -0,0 +1,100 @@
+"""
+Company-wide monthly attendance matrix (employees x days)
+
+Built from one query (employees left-joined to the month's attendance)
+and pivoted in memory into a sparse columnar payload: parallel arrays of
+employee index, day index, status code and hours, one entry per attendance
+row. Days without a row are absent.
+
+Status codes, packed into one string:
+- P: Present (checked in and out)
+- W: Working (checked in, not yet out)
+- L: On leave
+
+Encoded payloads are cached per (company, year, month); check-in/checkout
+invalidate the current month, and the TTL bounds staleness across worker
+processes.
+"""
+from datetime import date
+from uuid import UUID
+from sqlalchemy import select, and_
+from sqlalchemy.orm import Session
+from database.models import Attendance, Employee
+from utils.dates import month_bounds
+from utils.fast_json import dumps
+from utils.ttl_cache import TTLCache
+
+STATUS_PRESENT = "P"
+STATUS_WORKING = "W"
+STATUS_LEAVE = "L"
+
+matrix_cache = TTLCache(max_size=256, ttl=60.0)
+
+
+def build_matrix(db: Session, company_id: UUID, year: int, month: int) -> dict:
+    """Matrix payload for one company and month"""
+    first_day, last_day = month_bounds(year, month)
+    rows = db.execute(
+        select(
+            Employee.id, Employee.name, Employee.department,
+            Attendance.date, Attendance.on_leave, Attendance.start_time, Attendance.end_time
+        )
+        .outerjoin(Attendance, and_(
+            Attendance.emp_id == Employee.id,
+            Attendance.date >= first_day,
+            Attendance.date <= last_day
+        ))
+        .where(Employee.company_id == company_id)
+        .order_by(Employee.id, Attendance.date)
+    ).all()
+
+    employee_ids, employee_names, departments = [], [], []
+    emp_index, day_index, status_codes, hours = [], [], [], []
+    last_emp_id = None
+    for emp_id, name, department, day, on_leave, start_time, end_time in rows:
+        if emp_id != last_emp_id:
+            employee_ids.append(emp_id)
+            employee_names.append(name)
+            departments.append(department)
+            last_emp_id = emp_id
+        if day is None:
+            continue
+
+        emp_index.append(len(employee_ids) - 1)
+        day_index.append(day.day - 1)
+        if on_leave:
+            status_codes.append(STATUS_LEAVE)
+            hours.append(None)
+        elif end_time is None or start_time is None:
+            status_codes.append(STATUS_WORKING)
+            hours.append(None)
+        else:
+            status_codes.append(STATUS_PRESENT)
+            hours.append(round((end_time - start_time).total_seconds() / 3600, 2))
+
+    return {
+        "month": f"{year:04d}-{month:02d}",
+        "days_in_month": last_day.day,
+        "employee_ids": employee_ids,
+        "employee_names": employee_names,
+        "departments": departments,
+        "emp_index": emp_index,
+        "day_index": day_index,
+        "status_codes": "".join(status_codes),
+        "hours": hours
+    }
+
+
+def get_matrix_body(db: Session, company_id: UUID, year: int, month: int) -> bytes:
+    """Encoded matrix from the cache, or built and cached on a miss"""
+    key = (company_id, year, month)
+    body = matrix_cache.get(key)
+    if body is None:
+        body = dumps(build_matrix(db, company_id, year, month))
+        matrix_cache.set(key, body)
+    return body
+
+
+def invalidate_matrix(company_id: UUID, day: date):
+    """Drop the cached matrix of the month containing `day`"""
+    matrix_cache.invalidate((company_id, day.year, day.month))
@@ -0,0 +1,183 @@
+"""
+Group commit for check-in
+
+With CHECKIN_BATCHING on, check_in hands its write to a per-worker buffer
+instead of running its own transaction. One flusher task per event loop
+takes up to CHECKIN_BATCH_SIZE queued check-ins, waiting at most
+CHECKIN_BATCH_LATENCY_MS after the oldest one arrived, and writes them in a
+single transaction: a multi-row INSERT ... ON CONFLICT DO NOTHING for the
+attendance rows and one set-based current_status update. Every request
+resolves only after its batch has committed, so a response still means the
+check-in is durable. While one batch is being written the next one fills.
+
+If a batch fails, its check-ins are retried one per transaction so a single
+bad row (e.g. an employee deleted meanwhile) only fails its own request.
+"""
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from database.database import SessionLocal
+from database.models import Attendance
+from services.status import derive_status, refresh_current_status, status_cache
+from services.attendance_matrix import invalidate_matrix
+from services.read_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckIn:
+    emp_id: str
+    company_id: UUID
+    at: datetime
+
+
+@dataclass
+class CheckInResult:
+    created: bool  # False if the employee already had a row for the day
+    start_time: Optional[datetime]
+    status: int
+
+
+def write_checkins(checkins: list[CheckIn], day: date) -> list[CheckInResult]:
+    """Write a batch of check-ins for `day` in one transaction; results in input order"""
+    first = {}
+    for checkin in checkins:
+        first.setdefault(checkin.emp_id, checkin)
+    with SessionLocal() as db:
+        table = Attendance.__table__
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        inserted = set(db.execute(
+            insert(table).on_conflict_do_nothing(index_elements=[table.c.emp_id, table.c.date])
+            .returning(table.c.emp_id),
+            [
+                {"emp_id": emp_id, "date": day, "start_time": checkin.at, "end_time": None,
+                 "work_hours": None, "extra_hours": None, "on_leave": False}
+                for emp_id, checkin in first.items()
+            ]
+        ).scalars())
+        refresh_current_status(db, list(first), day)
+        rows = {
+            row.emp_id: row for row in db.execute(
+                select(Attendance.emp_id, Attendance.start_time, Attendance.end_time, Attendance.on_leave)
+                .where(Attendance.emp_id.in_(list(first)), Attendance.date == day)
+            )
+        }
+        db.commit()
+
+    for emp_id in first:
+        status_cache.invalidate(emp_id, day)
+    for company_id in {checkin.company_id for checkin in checkins}:
+        invalidate_matrix(company_id, day)
+        invalidate(company_id, [checkin.emp_id for checkin in checkins if checkin.company_id == company_id])
+
+    results = []
+    for checkin in checkins:
+        row = rows.get(checkin.emp_id)
+        created = checkin.emp_id in inserted and first[checkin.emp_id] is checkin
+        results.append(CheckInResult(
+            created=created,
+            start_time=row.start_time if row else None,
+            status=derive_status(row)
+        ))
+    return results
+
+
+class CheckInBuffer:
+    """Per-worker queue of pending check-ins, flushed in batches by one task per event loop"""
+
+    def __init__(self):
+        self._loop = None
+        self._pending: list[tuple[CheckIn, float, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._wakeup = asyncio.Event()
+            self._full = asyncio.Event()
+            # Own context: not the submitting request's (its timings, profile)
+            self._flusher = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def submit(self, emp_id: str, company_id: UUID) -> CheckInResult:
+        """Queue a check-in and wait until its batch has committed"""
+        self._start()
+        future = self._loop.create_future()
+        self._pending.append((CheckIn(emp_id, company_id, datetime.now()), self._loop.time(), future))
+        self._wakeup.set()
+        if len(self._pending) >= settings.CHECKIN_BATCH_SIZE:
+            self._full.set()
+        return await future
+
+    async def stop(self):
+        if self._flusher is not None and self._loop is asyncio.get_running_loop():
+            self._flusher.cancel()
+        self._loop = None
+        self._flusher = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Let the batch fill until it is full or the oldest check-in has waited long enough
+            deadline = self._pending[0][1] + settings.CHECKIN_BATCH_LATENCY_MS / 1000
+            remaining = deadline - self._loop.time()
+            if remaining > 0 and len(self._pending) < settings.CHECKIN_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._pending[:settings.CHECKIN_BATCH_SIZE]
+            del self._pending[:settings.CHECKIN_BATCH_SIZE]
+            if len(self._pending) < settings.CHECKIN_BATCH_SIZE:
+                self._full.clear()
+            if not self._pending:
+                self._wakeup.clear()
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        day = batch[0][0].at.date()
+        if any(checkin.at.date() != day for checkin, _, _ in batch):
+            # Straddles midnight: each day in its own transaction
+            for other in sorted({checkin.at.date() for checkin, _, _ in batch}):
+                await self._flush([entry for entry in batch if entry[0].at.date() == other])
+            return
+        checkins = [checkin for checkin, _, _ in batch]
+        try:
+            results = await run_in_threadpool(write_checkins, checkins, day)
+        except Exception as error:
+            if len(batch) == 1:
+                # Raised in the waiting request, like a failed commit in the unbuffered path
+                _resolve(batch[0][2], exception=error)
+                return
+            logger.warning("Check-in batch of %d failed, retrying one by one", len(batch))
+            for entry in batch:
+                await self._flush([entry])
+            return
+        for (_, _, future), result in zip(batch, results):
+            _resolve(future, result)
+
+
+def _resolve(future: asyncio.Future, result=None, exception: Optional[Exception] = None):
+    # The request may have been cancelled (client gone) while its batch was written
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+checkin_buffer = CheckInBuffer()
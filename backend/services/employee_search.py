@@ -0,0 +1,260 @@
+"""
+Employee search over name, email, department, job_position, location and
+manager, with prefix and typo-tolerant matching
+
+On Postgres the search runs in the database against the GIN indexes from
+migration 0008: a prefix tsquery on a 'simple' tsvector of the fields, OR
+pg_trgm word similarity for typos, ranked by both.
+
+Other databases use an in-process index per company, built on the first
+search and kept up to date by create/update/delete in this worker; it is
+rebuilt after INDEX_TTL seconds to pick up changes made by other workers.
+Each query word matches indexed tokens exactly, by prefix, or within a small
+edit distance (candidates come from shared trigrams); all words must match.
+"""
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, func, literal, literal_column
+from sqlalchemy.orm import Session
+from database.models import Employee
+
+SEARCH_FIELDS = ("name", "email", "department", "job_position", "location", "manager")
+FIELD_WEIGHTS = (1.0, 0.9, 0.8, 0.8, 0.6, 0.6)
+RESULT_FIELDS = ("id",) + SEARCH_FIELDS
+
+# Must match the index expressions in migration 0008 for Postgres to use them
+SEARCH_DOCUMENT = (
+    "lower(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(department, '') || ' ' || "
+    "coalesce(job_position, '') || ' ' || coalesce(location, '') || ' ' || coalesce(manager, ''))"
+)
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+TYPO_SCORES = {1: 0.6, 2: 0.4}
+MIN_FUZZY_LENGTH = 3
+INDEX_TTL = 300.0  # Seconds before a company's in-process index is rebuilt
+
+_TOKEN = re.compile(r"[a-z]+|[0-9]+")  # Letter and digit runs, so "panchal12" indexes "panchal"
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(word: str) -> int:
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class CompanySearchIndex:
+    """Token index of one company's employees"""
+
+    def __init__(self):
+        self.docs: dict[str, tuple] = {}  # emp_id -> RESULT_FIELDS values
+        self.emp_tokens: dict[str, dict[str, float]] = {}
+        self.postings: dict[str, dict[str, float]] = defaultdict(dict)  # token -> {emp_id: field weight}
+        self.gram_tokens: dict[str, set[str]] = defaultdict(set)
+        self.vocab: list[str] = []  # Sorted, for prefix lookups
+        self.built_at = time.monotonic()
+
+    def add(self, row: tuple, keep_sorted: bool = True):
+        emp_id = row[0]
+        self.remove(emp_id)
+        self.docs[emp_id] = tuple(row)
+
+        weights: dict[str, float] = {}
+        for value, weight in zip(row[1:], FIELD_WEIGHTS):
+            for token in tokenize(value):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        self.emp_tokens[emp_id] = weights
+
+        for token, weight in weights.items():
+            if token not in self.postings:
+                for gram in trigrams(token):
+                    self.gram_tokens[gram].add(token)
+                if keep_sorted:
+                    self.vocab.insert(bisect_left(self.vocab, token), token)
+                else:
+                    self.vocab.append(token)
+            self.postings[token][emp_id] = weight
+
+    def remove(self, emp_id: str):
+        # Tokens left without postings stay in the vocabulary and match nothing
+        self.docs.pop(emp_id, None)
+        for token in self.emp_tokens.pop(emp_id, {}):
+            self.postings[token].pop(emp_id, None)
+
+    def match_word(self, word: str) -> dict[str, float]:
+        """emp_id -> best score of any token matching this query word"""
+        scores: dict[str, float] = {}
+
+        best = scores.get
+
+        def collect(token: str, score: float):
+            for emp_id, weight in self.postings[token].items():
+                value = score * weight
+                if value > best(emp_id, 0.0):
+                    scores[emp_id] = value
+
+        position = bisect_left(self.vocab, word)
+        while position < len(self.vocab) and self.vocab[position].startswith(word):
+            token = self.vocab[position]
+            collect(token, EXACT_SCORE if token == word else PREFIX_SCORE)
+            position += 1
+
+        limit = max_typos(word)
+        if limit:
+            grams = trigrams(word)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.gram_tokens.get(gram, ()))
+            # q-gram lemma: each edit destroys at most 3 trigrams
+            min_shared = len(grams) - 3 * limit
+            for token, count in shared.items():
+                if count < min_shared or token.startswith(word):
+                    continue
+                distance = edit_distance(word, token, limit)
+                if distance <= limit:
+                    collect(token, TYPO_SCORES[distance])
+        return scores
+
+    def search(self, words: list[str], top: int) -> tuple[int, list[tuple[float, str]]]:
+        """Number of employees matching every word and the best `top` as (score, emp_id)"""
+        totals: Optional[dict[str, float]] = None
+        for word in words:
+            scores = self.match_word(word)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {emp_id: total + scores[emp_id] for emp_id, total in totals.items() if emp_id in scores}
+            if not totals:
+                return 0, []
+        # Equal scores keep index order, which is by name (see SearchIndexRegistry.get)
+        best = heapq.nlargest(top, totals.items(), key=itemgetter(1))
+        return len(totals), [(score, emp_id) for emp_id, score in best]
+
+
+class SearchIndexRegistry:
+    """In-process indexes per company, for databases without text search indexes"""
+
+    def __init__(self, ttl: float = INDEX_TTL):
+        self.ttl = ttl
+        self._indexes: dict[UUID, CompanySearchIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, company_id: UUID) -> CompanySearchIndex:
+        with self._lock:
+            index = self._indexes.get(company_id)
+            if index is not None and time.monotonic() - index.built_at < self.ttl:
+                return index
+        index = CompanySearchIndex()
+        rows = db.execute(
+            select(*[getattr(Employee, field) for field in RESULT_FIELDS])
+            .where(Employee.company_id == company_id)
+            .order_by(Employee.name, Employee.id)
+        ).all()
+        for row in rows:
+            index.add(row, keep_sorted=False)
+        index.vocab.sort()
+        with self._lock:
+            self._indexes[company_id] = index
+        return index
+
+    def search(self, db: Session, company_id: UUID, words: list[str], limit: int, offset: int):
+        """Total matches and one page of (score, row), searched under the lock so updates can't interleave"""
+        index = self.get(db, company_id)
+        with self._lock:
+            total, ranked = index.search(words, offset + limit)
+            return total, [(score, index.docs[emp_id]) for score, emp_id in ranked[offset:]]
+
+    def upsert(self, employee: Employee):
+        """Reindex an employee after create/update, if the company's index is loaded"""
+        with self._lock:
+            index = self._indexes.get(employee.company_id)
+            if index is not None:
+                index.add(tuple(getattr(employee, field) for field in RESULT_FIELDS))
+
+    def remove(self, company_id: UUID, emp_id: str):
+        with self._lock:
+            index = self._indexes.get(company_id)
+            if index is not None:
+                index.remove(emp_id)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+search_indexes = SearchIndexRegistry()
+
+
+def _search_postgres(db: Session, company_id: UUID, words: list[str], limit: int, offset: int):
+    document = literal_column(SEARCH_DOCUMENT)
+    vector = func.to_tsvector(literal_column("'simple'"), document)
+    prefix_query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+    text = literal(" ".join(words))
+    matches = vector.op("@@")(prefix_query) | text.op("<%")(document)
+    score = func.ts_rank(vector, prefix_query) + func.word_similarity(text, document)
+
+    total = db.execute(
+        select(func.count()).select_from(Employee).where(Employee.company_id == company_id, matches)
+    ).scalar()
+    rows = db.execute(
+        select(*[getattr(Employee, field) for field in RESULT_FIELDS], score.label("score"))
+        .where(Employee.company_id == company_id, matches)
+        .order_by(score.desc(), Employee.name)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    return total, [(row[-1], tuple(row[:-1])) for row in rows]
+
+
+def search_employees(db: Session, company_id: UUID, q: str, limit: int, offset: int) -> tuple[int, list[dict]]:
+    """Total number of matches and one page of ranked results as dicts"""
+    words = tokenize(q)
+    if not words:
+        return 0, []
+
+    if db.get_bind().dialect.name == "postgresql":
+        total, page = _search_postgres(db, company_id, words, limit, offset)
+    else:
+        total, page = search_indexes.search(db, company_id, words, limit, offset)
+
+    results = []
+    for score, row in page:
+        result = dict(zip(RESULT_FIELDS, row))
+        result["score"] = round(float(score), 3)
+        results.append(result)
+    return total, results
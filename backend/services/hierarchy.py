@@ -0,0 +1,138 @@
+"""
+Reporting tree
+
+Employee.manager_id is the tree; `employee_hierarchy` is its closure table
+with a row (ancestor, descendant, depth) for every manager above an employee
+plus (employee, employee, 0). A whole subtree is then one indexed query on
+ancestor_id. The employee create, update and delete paths keep the closure
+table in sync with set-based statements; callers commit.
+"""
+from typing import Optional
+from sqlalchemy import select, insert, update, delete, literal, or_
+from sqlalchemy.orm import Session, aliased
+from database.models import Employee, EmployeeHierarchy
+
+HIERARCHY_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+class HierarchyError(ValueError):
+    """The requested manager change would break the tree"""
+
+
+def subtree_ids(emp_id: str, depth: Optional[int] = None):
+    """SELECT of the IDs of everyone reporting to emp_id, directly or up to `depth` levels down"""
+    query = select(EmployeeHierarchy.descendant_id).where(
+        EmployeeHierarchy.ancestor_id == emp_id,
+        EmployeeHierarchy.depth >= 1
+    )
+    if depth is not None:
+        query = query.where(EmployeeHierarchy.depth <= depth)
+    return query
+
+
+def get_reports(db: Session, emp_id: str, depth: Optional[int] = None) -> list:
+    """Rows of (id, name, department, job_position, manager_id, depth), nearest levels first"""
+    query = (
+        select(
+            Employee.id, Employee.name, Employee.department, Employee.job_position,
+            Employee.manager_id, EmployeeHierarchy.depth
+        )
+        .join(EmployeeHierarchy, EmployeeHierarchy.descendant_id == Employee.id)
+        .where(EmployeeHierarchy.ancestor_id == emp_id, EmployeeHierarchy.depth >= 1)
+        .order_by(EmployeeHierarchy.depth, Employee.name)
+    )
+    if depth is not None:
+        query = query.where(EmployeeHierarchy.depth <= depth)
+    return db.execute(query).all()
+
+
+def add_employee(db: Session, emp_id: str, manager_id: Optional[str]):
+    """Link a new employee (no reports yet) under manager_id"""
+    db.execute(insert(EmployeeHierarchy).values(ancestor_id=emp_id, descendant_id=emp_id, depth=0))
+    if manager_id is not None:
+        db.execute(insert(EmployeeHierarchy).from_select(
+            HIERARCHY_COLUMNS,
+            select(EmployeeHierarchy.ancestor_id, literal(emp_id), EmployeeHierarchy.depth + 1)
+            .where(EmployeeHierarchy.descendant_id == manager_id)
+        ))
+
+
+def move_employee(db: Session, emp_id: str, manager_id: Optional[str]):
+    """
+    Move an employee and everyone below them under a new manager (or to the top)
+    Raises HierarchyError if the new manager is the employee or one of their reports
+    """
+    if manager_id is not None:
+        in_subtree = db.execute(
+            select(EmployeeHierarchy.depth).where(
+                EmployeeHierarchy.ancestor_id == emp_id,
+                EmployeeHierarchy.descendant_id == manager_id
+            )
+        ).first()
+        if in_subtree is not None:
+            raise HierarchyError("An employee cannot report to themselves or to one of their reports")
+
+    # Cut the subtree loose from its old ancestors
+    subtree = select(EmployeeHierarchy.descendant_id).where(EmployeeHierarchy.ancestor_id == emp_id)
+    old_ancestors = select(EmployeeHierarchy.ancestor_id).where(
+        EmployeeHierarchy.descendant_id == emp_id,
+        EmployeeHierarchy.depth >= 1
+    )
+    db.execute(delete(EmployeeHierarchy).where(
+        EmployeeHierarchy.descendant_id.in_(subtree),
+        EmployeeHierarchy.ancestor_id.in_(old_ancestors)
+    ))
+
+    # Every ancestor of the new manager is an ancestor of every node in the subtree
+    if manager_id is not None:
+        above = aliased(EmployeeHierarchy)
+        below = aliased(EmployeeHierarchy)
+        db.execute(insert(EmployeeHierarchy).from_select(
+            HIERARCHY_COLUMNS,
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .select_from(above)
+            .join(below, below.ancestor_id == emp_id)
+            .where(above.descendant_id == manager_id)
+        ))
+
+
+def remove_employee(db: Session, employee: Employee):
+    """
+    Take an employee out of the tree before deleting them
+    Their direct reports move up to the employee's own manager
+    """
+    strict_subtree = subtree_ids(employee.id)
+    strict_ancestors = select(EmployeeHierarchy.ancestor_id).where(
+        EmployeeHierarchy.descendant_id == employee.id,
+        EmployeeHierarchy.depth >= 1
+    )
+    db.execute(
+        update(EmployeeHierarchy)
+        .where(EmployeeHierarchy.descendant_id.in_(strict_subtree), EmployeeHierarchy.ancestor_id.in_(strict_ancestors))
+        .values(depth=EmployeeHierarchy.depth - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(delete(EmployeeHierarchy).where(or_(
+        EmployeeHierarchy.ancestor_id == employee.id,
+        EmployeeHierarchy.descendant_id == employee.id
+    )))
+
+    new_manager_name = None
+    if employee.manager_id is not None:
+        new_manager_name = db.execute(select(Employee.name).where(Employee.id == employee.manager_id)).scalar()
+    db.execute(
+        update(Employee)
+        .where(Employee.manager_id == employee.id)
+        .values(manager_id=employee.manager_id, manager=new_manager_name, version=Employee.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rename_manager(db: Session, emp_id: str, name: str):
+    """Keep the reports' manager name in sync after a manager is renamed"""
+    db.execute(
+        update(Employee)
+        .where(Employee.manager_id == emp_id)
+        .values(manager=name, version=Employee.version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,197 @@
+"""
+In-process background job queue backed by the `job` table
+
+Jobs are enqueued as rows with status "queued". Every app process runs one
+worker thread that claims queued jobs with a conditional UPDATE, so a job
+runs exactly once even with several worker processes, and no external
+broker is needed. Handlers are registered per job kind with @job_handler
+and report progress through the JobContext they are given.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from database.database import SessionLocal, get_engine
+from database.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+POLL_INTERVAL = 2.0  # Seconds between checks for jobs enqueued by other processes
+PROGRESS_INTERVAL = 0.5  # Minimum seconds between progress writes
+STALE_AFTER = timedelta(minutes=10)  # Running jobs without a heartbeat for this long are requeued
+
+_handlers: dict[str, Callable[["JobContext"], Optional[str]]] = {}
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for a job kind; it returns the result path"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """What a handler gets: the job parameters and a progress reporter"""
+
+    def __init__(self, job: Job):
+        self.job_id = job.job_id
+        self.company_id = job.company_id
+        self.params: dict[str, Any] = json.loads(job.params) if job.params else {}
+        self._last_report = 0.0
+
+    def progress(self, done: int, total: int, force: bool = False):
+        """Record progress (throttled); also serves as the job heartbeat"""
+        now = time.monotonic()
+        if not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        with SessionLocal() as db:
+            db.execute(
+                update(Job).where(Job.job_id == self.job_id).values(
+                    progress_done=done, progress_total=total, updated_at=datetime.now()
+                )
+            )
+            db.commit()
+
+
+class JobWorker:
+    """Background thread that claims and runs queued jobs one at a time"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self):
+        """Wake the worker after a job was enqueued in this process"""
+        self._wake.set()
+
+    def _run(self):
+        get_engine()
+        while not self._stop.is_set():
+            try:
+                self._requeue_stale()
+                job_id = self._claim_next()
+            except Exception:
+                logger.exception("Job worker failed to claim a job")
+                job_id = None
+            if job_id is not None:
+                try:
+                    self._execute(job_id)
+                except Exception:
+                    # A stale job is requeued by _requeue_stale; the thread must keep going
+                    logger.exception("Job worker failed to run job %s", job_id)
+                continue
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def _requeue_stale(self):
+        """Put back jobs whose process died while running them"""
+        with SessionLocal() as db:
+            db.execute(
+                update(Job).where(
+                    Job.status == JOB_RUNNING,
+                    Job.updated_at < datetime.now() - STALE_AFTER
+                ).values(status=JOB_QUEUED)
+            )
+            db.commit()
+
+    def _claim_next(self) -> Optional[str]:
+        """Atomically move the oldest queued job to running; None if there is none"""
+        with SessionLocal() as db:
+            candidates = db.execute(
+                select(Job.job_id).where(Job.status == JOB_QUEUED).order_by(Job.created_at).limit(5)
+            ).scalars().all()
+            for job_id in candidates:
+                now = datetime.now()
+                claimed = db.execute(
+                    update(Job).where(Job.job_id == job_id, Job.status == JOB_QUEUED).values(
+                        status=JOB_RUNNING, started_at=now, updated_at=now
+                    )
+                )
+                db.commit()
+                # Another process may have claimed it first
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    def _execute(self, job_id: str):
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return  # Deleted since it was claimed
+            context = JobContext(job)
+            handler = _handlers.get(job.kind)
+
+        values: dict[str, Any]
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind '{job.kind}'")
+            result_path = handler(context)
+            values = {"status": JOB_COMPLETED, "result_path": result_path}
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            values = {"status": JOB_FAILED, "error": str(e)}
+
+        self._finish(job_id, values)
+
+    def _finish(self, job_id: str, values: dict[str, Any], attempts: int = 3):
+        """Record a job's outcome, retrying briefly; left running (and later requeued) if that fails"""
+        for attempt in range(1, attempts + 1):
+            try:
+                with SessionLocal() as db:
+                    now = datetime.now()
+                    db.execute(update(Job).where(Job.job_id == job_id).values(finished_at=now, updated_at=now, **values))
+                    db.commit()
+                return
+            except Exception:
+                if attempt == attempts:
+                    logger.exception("Could not record the outcome of job %s", job_id)
+                    return
+                time.sleep(attempt)
+
+
+worker = JobWorker()
+
+
+def enqueue_job(db: Session, company_id, kind: str, params: Optional[dict] = None) -> Job:
+    """Create a queued job and wake the local worker"""
+    job = Job(
+        company_id=company_id,
+        kind=kind,
+        params=json.dumps(params or {}),
+        status=JOB_QUEUED,
+        progress_done=0,
+        progress_total=0,
+        created_at=datetime.now()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    worker.notify()
+    return job
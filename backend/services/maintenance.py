@@ -0,0 +1,191 @@
+"""
+Nightly maintenance jobs run by the scheduler
+
+Every job walks companies in batches of COMPANY_BATCH_SIZE and commits once
+per batch, so transactions stay small no matter how many tenants exist.
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, func, case, update, insert
+from sqlalchemy.orm import Session
+from database.models import Company, Employee, Attendance, LeaveTable, Summary
+from services.scheduler import scheduled
+from services.status import status_cache
+from services.attendance_matrix import matrix_cache
+from services.read_cache import read_cache
+from services.attendance_archive import ensure_partitions, archive_expired
+from services.offboarding import purge_deleted
+from auth.revocation import purge_expired
+
+COMPANY_BATCH_SIZE = 50
+AUTO_CHECKOUT_HOURS = 8
+LEAVE_ALLOWANCE = 30  # Same allowance check_out uses for leave_left
+
+
+def company_batches(db: Session):
+    """Yield lists of company IDs, paginating on the primary key"""
+    last_id = None
+    while True:
+        query = select(Company.id).order_by(Company.id).limit(COMPANY_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(Company.id > last_id)
+        company_ids = db.execute(query).scalars().all()
+        if not company_ids:
+            return
+        yield company_ids
+        last_id = company_ids[-1]
+
+
+@scheduled("day_rollover", "0 0 * * *")
+def day_rollover(db: Session) -> int:
+    """
+    Start a new day: record today's approved leave as on-leave attendance rows
+    and reset every employee's current_status (2 if on leave today, else 0)
+    """
+    today = date.today()
+    processed = 0
+    for company_ids in company_batches(db):
+        on_leave_today = (
+            select(LeaveTable.emp_id)
+            .join(Employee, Employee.id == LeaveTable.emp_id)
+            .where(
+                Employee.company_id.in_(company_ids),
+                LeaveTable.is_approved == True,
+                LeaveTable.start_date <= today,
+                func.coalesce(LeaveTable.end_date, LeaveTable.start_date) >= today
+            )
+            .distinct()
+        )
+        already_recorded = select(Attendance.emp_id).where(Attendance.date == today)
+        leave_emp_ids = db.execute(on_leave_today.where(LeaveTable.emp_id.not_in(already_recorded))).scalars().all()
+        if leave_emp_ids:
+            db.execute(insert(Attendance), [
+                {"emp_id": emp_id, "date": today, "on_leave": True} for emp_id in leave_emp_ids
+            ])
+        
+        # Only touch rows whose status changes, and bump their version so
+        # version-based ETags see the change
+        new_status = case((Employee.id.in_(on_leave_today), 2), else_=0)
+        result = db.execute(
+            update(Employee)
+            .where(Employee.company_id.in_(company_ids), Employee.current_status.is_distinct_from(new_status))
+            .values(current_status=new_status, version=Employee.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        processed += result.rowcount
+    
+    # Cached statuses and matrices of this worker may predate the new leave rows
+    status_cache.clear()
+    matrix_cache.clear()
+    read_cache.invalidate_all()
+    return processed
+
+
+@scheduled("auto_checkout", "5 0 * * *")
+def auto_checkout(db: Session) -> int:
+    """
+    Close check-ins left open on previous days
+    Check-out is set to AUTO_CHECKOUT_HOURS after check-in, capped at the end of that day
+    """
+    today = date.today()
+    processed = 0
+    for company_ids in company_batches(db):
+        open_records = db.execute(
+            select(Attendance.emp_id, Attendance.date, Attendance.start_time)
+            .join(Employee, Employee.id == Attendance.emp_id)
+            .where(
+                Employee.company_id.in_(company_ids),
+                Attendance.date < today,
+                Attendance.start_time.isnot(None),
+                Attendance.end_time.is_(None)
+            )
+        ).all()
+        if not open_records:
+            continue
+        
+        updates = []
+        for emp_id, day, start_time in open_records:
+            end_time = min(start_time + timedelta(hours=AUTO_CHECKOUT_HOURS), datetime.combine(day, time.max))
+            # work_hours/extra_hours hold the checkout timestamp, as in check_out
+            updates.append({"emp_id": emp_id, "date": day, "end_time": end_time, "work_hours": end_time, "extra_hours": end_time})
+        db.execute(update(Attendance), updates)
+        db.commit()
+        processed += len(updates)
+    matrix_cache.clear()
+    read_cache.invalidate_all()
+    return processed
+
+
+@scheduled("reconcile_summaries", "30 1 * * *")
+def reconcile_summaries(db: Session) -> int:
+    """Recompute every Summary row from the attendance table plus its archived counts"""
+    processed = 0
+    for company_ids in company_batches(db):
+        present_days = func.sum(case((Attendance.on_leave == False, 1), else_=0))
+        leave_count = func.sum(case((Attendance.on_leave == True, 1), else_=0))
+        archived_present = func.coalesce(Summary.archived_present_days, 0)
+        archived_leave = func.coalesce(Summary.archived_leave_count, 0)
+        rows = db.execute(
+            select(
+                Employee.id,
+                func.coalesce(present_days, 0) + archived_present,
+                func.coalesce(leave_count, 0) + archived_leave
+            )
+            .outerjoin(Attendance, Attendance.emp_id == Employee.id)
+            .outerjoin(Summary, Summary.emp_id == Employee.id)
+            .where(Employee.company_id.in_(company_ids))
+            .group_by(Employee.id, Summary.archived_present_days, Summary.archived_leave_count)
+        ).all()
+        if not rows:
+            continue
+        
+        existing = set(db.execute(
+            select(Summary.emp_id).join(Employee, Employee.id == Summary.emp_id).where(Employee.company_id.in_(company_ids))
+        ).scalars())
+        summaries = [
+            {
+                "emp_id": emp_id,
+                "present_days": present,
+                "leave_count": leave,
+                "leave_left": LEAVE_ALLOWANCE - leave,
+                "tot_work_days": present + leave
+            }
+            for emp_id, present, leave in rows
+        ]
+        to_update = [summary for summary in summaries if summary["emp_id"] in existing]
+        to_insert = [summary for summary in summaries if summary["emp_id"] not in existing]
+        if to_update:
+            db.execute(update(Summary), to_update)
+        if to_insert:
+            db.execute(insert(Summary), to_insert)
+        db.commit()
+        processed += len(summaries)
+    read_cache.invalidate_all()
+    return processed
+
+
+@scheduled("attendance_partitions", "15 2 * * *")
+def attendance_partitions(db: Session) -> int:
+    """Keep ATTENDANCE_PARTITIONS_AHEAD future monthly partitions created (Postgres)"""
+    return ensure_partitions(db)
+
+
+@scheduled("archive_attendance", "45 2 1 * *")
+def archive_attendance(db: Session) -> int:
+    """Move months older than ATTENDANCE_RETENTION_MONTHS to the archive"""
+    moved = archive_expired(db)
+    matrix_cache.clear()
+    read_cache.invalidate_all()
+    return moved
+
+
+@scheduled("purge_deleted_employees", "0 3 * * *")
+def purge_deleted_employees(db: Session) -> int:
+    """Hard-delete employees soft-deleted more than SOFT_DELETE_RETENTION_DAYS ago"""
+    return purge_deleted(db)
+
+
+@scheduled("purge_revoked_tokens", "20 * * * *")
+def purge_revoked_tokens(db: Session) -> int:
+    """Drop revocations of tokens that have expired anyway"""
+    return purge_expired(db)
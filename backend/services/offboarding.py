@@ -0,0 +1,125 @@
+"""
+Employee offboarding
+
+Removing employees is set-based: their reports are repointed to the nearest
+manager who stays, the rows are deleted (the database cascades to
+attendance, leave, payroll and the rest through ON DELETE CASCADE) and the
+company's closure table is rebuilt with one recursive query.
+
+With SOFT_DELETE_EMPLOYEES the employees are only marked with deleted_at and
+taken out of the reporting tree; tenant-scoped queries stop seeing them at
+once and purge_deleted removes the rows later in batches. Callers commit.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable
+from uuid import UUID
+from sqlalchemy import select, insert, update, delete, literal
+from sqlalchemy.orm import Session, aliased
+from config import settings
+from database.models import Employee, EmployeeHierarchy
+from services.hierarchy import HIERARCHY_COLUMNS
+
+PURGE_BATCH_SIZE = 500
+
+
+def _repoint_reports(db: Session, company_id: UUID, removed: list):
+    """Point every remaining employee whose manager is removed at their nearest remaining ancestor"""
+    new_manager_id = (
+        select(EmployeeHierarchy.ancestor_id)
+        .where(
+            EmployeeHierarchy.descendant_id == Employee.id,
+            EmployeeHierarchy.depth >= 1,
+            EmployeeHierarchy.ancestor_id.not_in(removed)
+        )
+        .order_by(EmployeeHierarchy.depth)
+        .limit(1)
+        .scalar_subquery()
+    )
+    manager = aliased(Employee)
+    new_manager_name = select(manager.name).where(manager.id == new_manager_id).scalar_subquery()
+    db.execute(
+        update(Employee)
+        .where(
+            Employee.company_id == company_id,
+            Employee.manager_id.in_(removed),
+            Employee.id.not_in(removed)
+        )
+        .values(manager_id=new_manager_id, manager=new_manager_name, version=Employee.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_hierarchy(db: Session, company_id: UUID):
+    """Recompute a company's closure table from manager_id"""
+    company_employees = select(Employee.id).where(Employee.company_id == company_id)
+    db.execute(delete(EmployeeHierarchy).where(EmployeeHierarchy.descendant_id.in_(company_employees)))
+
+    tree = (
+        select(Employee.id.label("ancestor_id"), Employee.id.label("descendant_id"), literal(0).label("depth"))
+        .where(Employee.company_id == company_id, Employee.deleted_at.is_(None))
+        .cte("tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, Employee.id, tree.c.depth + 1)
+        .join(Employee, Employee.manager_id == tree.c.descendant_id)
+        .where(Employee.deleted_at.is_(None))
+    )
+    db.execute(insert(EmployeeHierarchy).from_select(
+        HIERARCHY_COLUMNS,
+        select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+    ))
+
+
+def offboard_employees(db: Session, company_id: UUID, emp_ids: Iterable[str], soft: bool) -> list:
+    """
+    Remove (or soft-delete) a set of the company's employees
+    Returns the IDs that were removed; unknown IDs are ignored
+    """
+    found = db.execute(
+        select(Employee.id).where(
+            Employee.company_id == company_id,
+            Employee.deleted_at.is_(None),
+            Employee.id.in_(set(emp_ids))
+        )
+    ).scalars().all()
+    if not found:
+        return []
+
+    _repoint_reports(db, company_id, found)
+    if soft:
+        db.execute(
+            update(Employee)
+            .where(Employee.id.in_(found))
+            .values(deleted_at=datetime.utcnow(), version=Employee.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        db.execute(
+            delete(Employee)
+            .where(Employee.id.in_(found))
+            .execution_options(synchronize_session=False)
+        )
+    rebuild_hierarchy(db, company_id)
+    return found
+
+
+def purge_deleted(db: Session) -> int:
+    """Hard-delete employees soft-deleted more than SOFT_DELETE_RETENTION_DAYS ago, committing per batch"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.SOFT_DELETE_RETENTION_DAYS)
+    purged = 0
+    while True:
+        batch = db.execute(
+            select(Employee.id)
+            .where(Employee.deleted_at.isnot(None), Employee.deleted_at <= cutoff)
+            .limit(PURGE_BATCH_SIZE)
+        ).scalars().all()
+        if not batch:
+            return purged
+        # Soft-deleted employees are already out of the tree; the rest cascades
+        db.execute(
+            delete(Employee)
+            .where(Employee.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        purged += len(batch)
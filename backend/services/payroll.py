@@ -0,0 +1,213 @@
+"""
+Batch payroll engine
+
+Computes monthly pay for every employee of a company in one pass. Salary
+components, attendance and approved leave are loaded with a handful of
+set-based queries, pay is computed with NumPy array arithmetic over all
+employees at once, and the results are bulk inserted into `payroll`.
+
+Pay rules:
+- Earnings (basic_sal + hra + sa + perf_bonus + ita + fa) are prorated by
+  paid days / working days (Mon-Fri of the month)
+- Paid days = present days + approved leave days, capped at working days
+- Overtime = hours beyond 8 per day, paid at 1.5x the hourly basic rate
+- Deductions = employee PF (pf1) + professional tax
+"""
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select, func, case, delete, insert
+from sqlalchemy.orm import Session
+from database.models import Employee, Salary, Attendance, LeaveTable, PayrollRun, Payroll
+from utils.dates import month_bounds
+
+STANDARD_DAY_SECONDS = 8 * 3600
+OVERTIME_MULTIPLIER = 1.5
+EARNING_COLUMNS = ("basic_sal", "hra", "sa", "perf_bonus", "ita", "fa")
+DEDUCTION_COLUMNS = ("pf1", "prof_tax")
+
+
+def working_days_in_month(year: int, month: int) -> int:
+    """Number of weekdays (Mon-Fri) in the month"""
+    first_day, last_day = month_bounds(year, month)
+    return int(np.busday_count(first_day, last_day + timedelta(days=1)))
+
+
+def _seconds_between(start, end, dialect_name: str):
+    """SQL expression for the number of seconds between two timestamps"""
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+
+def _load_salaries(db: Session, company_id) -> tuple[list[str], np.ndarray]:
+    """Employee IDs and a (n_employees, n_components) matrix of salary components"""
+    columns = EARNING_COLUMNS + DEDUCTION_COLUMNS
+    rows = db.execute(
+        select(Employee.id, *[func.coalesce(getattr(Salary, name), 0) for name in columns])
+        .join(Salary, Salary.emp_id == Employee.id)
+        .where(Employee.company_id == company_id)
+        .order_by(Employee.id)
+    ).all()
+    emp_ids = [row[0] for row in rows]
+    matrix = np.array([row[1:] for row in rows], dtype=np.int64).reshape(len(rows), len(columns))
+    return emp_ids, matrix
+
+
+def _load_attendance(db: Session, company_id, first_day, last_day, index: dict[str, int]):
+    """Per-employee present days, attendance leave days and overtime hours"""
+    n = len(index)
+    present = np.zeros(n, dtype=np.int64)
+    on_leave = np.zeros(n, dtype=np.int64)
+    overtime_hours = np.zeros(n, dtype=np.float64)
+    
+    duration = _seconds_between(Attendance.start_time, Attendance.end_time, db.get_bind().dialect.name)
+    rows = db.execute(
+        select(
+            Attendance.emp_id,
+            func.sum(case((Attendance.on_leave == False, 1), else_=0)),
+            func.sum(case((Attendance.on_leave == True, 1), else_=0)),
+            func.sum(case(
+                (Attendance.end_time.isnot(None) & (duration > STANDARD_DAY_SECONDS), duration - STANDARD_DAY_SECONDS),
+                else_=0
+            )),
+        )
+        .join(Employee, Employee.id == Attendance.emp_id)
+        .where(
+            Employee.company_id == company_id,
+            Attendance.date >= first_day,
+            Attendance.date <= last_day
+        )
+        .group_by(Attendance.emp_id)
+    ).all()
+    if not rows:
+        return present, on_leave, overtime_hours
+    
+    positions = np.array([index.get(row[0], -1) for row in rows])
+    values = np.array([row[1:] for row in rows], dtype=np.float64)
+    known = positions >= 0
+    present[positions[known]] = values[known, 0]
+    on_leave[positions[known]] = values[known, 1]
+    overtime_hours[positions[known]] = values[known, 2] / 3600
+    return present, on_leave, overtime_hours
+
+
+def _load_approved_leave_days(db: Session, company_id, first_day, last_day, index: dict[str, int]) -> np.ndarray:
+    """Per-employee weekdays of approved leave that fall inside the month"""
+    leave_days = np.zeros(len(index), dtype=np.int64)
+    leave_end = func.coalesce(LeaveTable.end_date, LeaveTable.start_date)
+    rows = db.execute(
+        select(LeaveTable.emp_id, LeaveTable.start_date, leave_end)
+        .join(Employee, Employee.id == LeaveTable.emp_id)
+        .where(
+            Employee.company_id == company_id,
+            LeaveTable.is_approved == True,
+            LeaveTable.start_date <= last_day,
+            leave_end >= first_day
+        )
+    ).all()
+    if not rows:
+        return leave_days
+    
+    positions = np.array([index.get(row[0], -1) for row in rows])
+    starts = np.array([row[1] for row in rows], dtype="datetime64[D]")
+    ends = np.array([row[2] for row in rows], dtype="datetime64[D]")
+    # Clip each leave to the month, then count weekdays (end is exclusive)
+    starts = np.maximum(starts, np.datetime64(first_day))
+    ends = np.minimum(ends, np.datetime64(last_day)) + np.timedelta64(1, "D")
+    days = np.busday_count(starts, ends)
+    known = positions >= 0
+    np.add.at(leave_days, positions[known], days[known])
+    return leave_days
+
+
+def compute_pay(
+    salaries: np.ndarray,
+    present: np.ndarray,
+    leave_days: np.ndarray,
+    overtime_hours: np.ndarray,
+    working_days: int
+) -> dict[str, np.ndarray]:
+    """Vectorized pay computation over all employees"""
+    earn = len(EARNING_COLUMNS)
+    earnings = salaries[:, :earn].sum(axis=1)
+    basic = salaries[:, EARNING_COLUMNS.index("basic_sal")]
+    deductions = salaries[:, earn:].sum(axis=1)
+    
+    paid_days = np.minimum(present + leave_days, working_days)
+    gross_pay = np.rint(earnings * paid_days / max(working_days, 1)).astype(np.int64)
+    hourly_rate = basic / max(working_days * STANDARD_DAY_SECONDS / 3600, 1)
+    overtime_pay = np.rint(hourly_rate * overtime_hours * OVERTIME_MULTIPLIER).astype(np.int64)
+    net_pay = np.maximum(gross_pay + overtime_pay - deductions, 0)
+    
+    return {
+        "paid_days": paid_days,
+        "gross_pay": gross_pay,
+        "overtime_pay": overtime_pay,
+        "deductions": deductions,
+        "net_pay": net_pay,
+    }
+
+
+def run_payroll(db: Session, company_id, year: int, month: int) -> PayrollRun:
+    """
+    Compute and store pay for every employee of a company for one month
+    Re-running a month replaces the previous run
+    """
+    first_day, last_day = month_bounds(year, month)
+    month_key = f"{year:04d}-{month:02d}"
+    working_days = working_days_in_month(year, month)
+    
+    emp_ids, salaries = _load_salaries(db, company_id)
+    index = {emp_id: i for i, emp_id in enumerate(emp_ids)}
+    present, attendance_leave, overtime_hours = _load_attendance(db, company_id, first_day, last_day, index)
+    approved_leave = _load_approved_leave_days(db, company_id, first_day, last_day, index)
+    # Leave can show up both as an approved request and as an on-leave
+    # attendance row, so take the larger of the two rather than adding them
+    leave_days = np.maximum(attendance_leave, approved_leave)
+    
+    pay = compute_pay(salaries, present, leave_days, overtime_hours, working_days)
+    
+    # Replace any previous run for this month
+    previous = db.execute(
+        select(PayrollRun.run_id).where(PayrollRun.company_id == company_id, PayrollRun.month == month_key)
+    ).scalar()
+    if previous is not None:
+        db.execute(delete(Payroll).where(Payroll.run_id == previous))
+        db.execute(delete(PayrollRun).where(PayrollRun.run_id == previous))
+    
+    run = PayrollRun(
+        company_id=company_id,
+        month=month_key,
+        working_days=working_days,
+        employee_count=len(emp_ids),
+        total_gross=int(pay["gross_pay"].sum() + pay["overtime_pay"].sum()),
+        total_deductions=int(pay["deductions"].sum()),
+        total_net=int(pay["net_pay"].sum()),
+        created_at=datetime.now()
+    )
+    db.add(run)
+    db.flush()
+    
+    if emp_ids:
+        columns = {
+            "present_days": present.tolist(),
+            "leave_days": leave_days.tolist(),
+            "paid_days": pay["paid_days"].tolist(),
+            "overtime_hours": np.round(overtime_hours, 2).tolist(),
+            "gross_pay": pay["gross_pay"].tolist(),
+            "overtime_pay": pay["overtime_pay"].tolist(),
+            "deductions": pay["deductions"].tolist(),
+            "net_pay": pay["net_pay"].tolist(),
+        }
+        names = list(columns)
+        db.execute(
+            insert(Payroll),
+            [
+                {"run_id": run.run_id, "emp_id": emp_id, **dict(zip(names, values))}
+                for emp_id, *values in zip(emp_ids, *columns.values())
+            ]
+        )
+    
+    db.commit()
+    db.refresh(run)
+    return run
@@ -0,0 +1,55 @@
+"""
+Payslip rendering
+
+Kept free of database and app imports so it loads quickly in the render
+worker processes.
+"""
+from html import escape
+
+PAYSLIP_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Payslip {month} - {emp_id}</title></head>
+<body>
+<h1>Payslip for {month}</h1>
+<p><strong>{name}</strong> ({emp_id})<br>{job_position} - {department}</p>
+<table>
+<tr><th colspan="2">Attendance</th></tr>
+<tr><td>Working days</td><td>{working_days}</td></tr>
+<tr><td>Present days</td><td>{present_days}</td></tr>
+<tr><td>Leave days</td><td>{leave_days}</td></tr>
+<tr><td>Paid days</td><td>{paid_days}</td></tr>
+<tr><td>Overtime hours</td><td>{overtime_hours:.2f}</td></tr>
+<tr><th colspan="2">Earnings (monthly)</th></tr>
+<tr><td>Basic salary</td><td>{basic_sal}</td></tr>
+<tr><td>HRA</td><td>{hra}</td></tr>
+<tr><td>Special allowance</td><td>{sa}</td></tr>
+<tr><td>Performance bonus</td><td>{perf_bonus}</td></tr>
+<tr><td>ITA</td><td>{ita}</td></tr>
+<tr><td>Fixed allowance</td><td>{fa}</td></tr>
+<tr><td>Prorated earnings</td><td>{gross_pay}</td></tr>
+<tr><td>Overtime pay</td><td>{overtime_pay}</td></tr>
+<tr><th colspan="2">Deductions</th></tr>
+<tr><td>Provident fund</td><td>{pf1}</td></tr>
+<tr><td>Professional tax</td><td>{prof_tax}</td></tr>
+<tr><td>Total deductions</td><td>{deductions}</td></tr>
+<tr><th>Net pay</th><th>{net_pay}</th></tr>
+</table>
+</body>
+</html>
+"""
+
+
+def render_payslip(month: str, working_days: int, line: dict) -> str:
+    """Render one payslip as HTML"""
+    values = {key: escape(value) if isinstance(value, str) else value for key, value in line.items()}
+    values = {key: "" if value is None else value for key, value in values.items()}
+    values["overtime_hours"] = line.get("overtime_hours") or 0.0
+    return PAYSLIP_TEMPLATE.format(month=month, working_days=working_days, **values)
+
+
+def render_payslips(month: str, working_days: int, lines: list[dict]) -> list[tuple[str, str]]:
+    """Render a batch of payslips, returning (file name, html) pairs"""
+    return [
+        (f"payslip-{month}-{line['emp_id']}.html", render_payslip(month, working_days, line))
+        for line in lines
+    ]
@@ -0,0 +1,104 @@
+"""
+Payslip generation job
+
+Streams the lines of a payroll run in keyset-paginated batches, renders each
+batch to HTML in a process pool and appends the results to a zip archive on
+disk. At most a few batches are in flight at any time, so memory use does
+not grow with company size.
+"""
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from sqlalchemy import select, func
+from config import settings
+from database.database import SessionLocal
+from database.models import Employee, Salary, Payroll, PayrollRun
+from services.jobs import JobContext, job_handler
+from services.payslip_render import render_payslips
+
+BATCH_SIZE = 500
+
+PAYSLIP_COLUMNS = [
+    Payroll.emp_id, Employee.name, Employee.department, Employee.job_position,
+    Payroll.present_days, Payroll.leave_days, Payroll.paid_days, Payroll.overtime_hours,
+    Salary.basic_sal, Salary.hra, Salary.sa, Salary.perf_bonus, Salary.ita, Salary.fa,
+    Salary.pf1, Salary.prof_tax,
+    Payroll.gross_pay, Payroll.overtime_pay, Payroll.deductions, Payroll.net_pay
+]
+
+
+def _render_processes() -> int:
+    return settings.PAYSLIP_PROCESSES or os.cpu_count() or 1
+
+
+def _iter_batches(db, run_id: int):
+    """Yield lists of payslip dicts, paginating on emp_id"""
+    last_emp_id = ""
+    while True:
+        rows = db.execute(
+            select(*PAYSLIP_COLUMNS)
+            .join(Employee, Employee.id == Payroll.emp_id)
+            .outerjoin(Salary, Salary.emp_id == Payroll.emp_id)
+            .where(Payroll.run_id == run_id, Payroll.emp_id > last_emp_id)
+            .order_by(Payroll.emp_id)
+            .limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            return
+        yield [dict(row) for row in rows]
+        last_emp_id = rows[-1]["emp_id"]
+
+
+def _write(future: Future, archive: zipfile.ZipFile) -> int:
+    """Write a rendered batch into the archive, returning the number of payslips"""
+    payslips = future.result()
+    for name, html in payslips:
+        archive.writestr(name, html)
+    return len(payslips)
+
+
+@job_handler("payslips")
+def generate_payslips(context: JobContext) -> str:
+    """Render every payslip of a payroll run into a zip archive"""
+    run_id = context.params["run_id"]
+    processes = _render_processes()
+    max_in_flight = processes * 2
+    
+    with SessionLocal() as db:
+        run = db.get(PayrollRun, run_id)
+        if run is None or run.company_id != context.company_id:
+            raise ValueError(f"Payroll run {run_id} not found")
+        total = db.execute(select(func.count()).where(Payroll.run_id == run_id)).scalar()
+        context.progress(0, total, force=True)
+        
+        os.makedirs(settings.JOB_OUTPUT_DIR, exist_ok=True)
+        path = os.path.join(settings.JOB_OUTPUT_DIR, f"payslips-{run.month}-{context.job_id}.zip")
+        partial_path = path + ".part"
+        done = 0
+        
+        # spawn keeps the render processes independent of this process's threads and DB connections
+        pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            with zipfile.ZipFile(partial_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                pending: deque[Future] = deque()
+                for batch in _iter_batches(db, run_id):
+                    pending.append(pool.submit(render_payslips, run.month, run.working_days, batch))
+                    # Bound the work in flight; batches are written in order
+                    if len(pending) >= max_in_flight:
+                        done += _write(pending.popleft(), archive)
+                        context.progress(done, total)
+                while pending:
+                    done += _write(pending.popleft(), archive)
+                    context.progress(done, total)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            pool.shutdown(cancel_futures=True)
+    
+    os.replace(partial_path, path)
+    context.progress(done, total, force=True)
+    return path
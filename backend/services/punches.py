@@ -0,0 +1,205 @@
+"""
+Punch-log ingestion for door terminals and kiosks
+
+Devices upload buffered (emp_id, timestamp, direction) events in batches.
+A batch is sorted and deduplicated in memory and folded into one attendance
+row per employee and day: the first "in" is the check-in and the last "out"
+after it the check-out, merged with any row that already exists (earliest
+check-in, latest check-out wins). Writes are set-based: multi-row upserts
+for attendance, one INSERT ... SELECT upsert for the affected summaries and
+one UPDATE for current_status. Callers commit.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import select, update, case, func, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from database.models import Attendance, Employee, Summary
+from services.status import status_cache, refresh_current_status
+from services.attendance_matrix import invalidate_matrix
+from services.read_cache import invalidate
+
+LEAVE_ALLOWANCE = 30  # Same allowance check_out uses for leave_left
+
+DIRECTION_IN = "in"
+DIRECTION_OUT = "out"
+
+
+@dataclass
+class PunchResult:
+    accepted: int = 0
+    duplicates: int = 0
+    unknown_employees: tuple = ()
+    days: list = field(default_factory=list)  # (emp_id, date) pairs written
+
+
+def _insert_for(db: Session):
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def fold_punches(punches: Iterable[tuple]) -> dict:
+    """
+    Fold unique (emp_id, timestamp, direction) tuples per day, in time order
+    Returns {(emp_id, day): [first_in, last_out after it]}; a day without an
+    "in" keeps its last "out" to close a check-in made elsewhere
+    """
+    days: dict = {}
+    for emp_id, timestamp, direction in sorted(punches):
+        key = (emp_id, timestamp.date())
+        span = days.get(key)
+        if span is None:
+            span = days[key] = [None, None]
+        if direction == DIRECTION_IN:
+            if span[0] is None:
+                span[0] = timestamp
+                # Outs before the first in don't close it
+                if span[1] is not None and span[1] <= timestamp:
+                    span[1] = None
+        elif span[0] is None or timestamp > span[0]:
+            span[1] = timestamp
+    return days
+
+
+def _upsert_days(db: Session, rows: list):
+    """
+    Insert or merge attendance rows that have a check-in
+    One statement executed with many rows; SQLAlchemy sends it as multi-row
+    VALUES pages on Postgres and through the driver's executemany on SQLite
+    """
+    table = Attendance.__table__
+    statement = _insert_for(db)(table)
+    new = statement.excluded
+    end_time = case(
+        (new.end_time.is_(None), table.c.end_time),
+        (table.c.end_time.is_(None), new.end_time),
+        (new.end_time > table.c.end_time, new.end_time),
+        else_=table.c.end_time
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.emp_id, table.c.date],
+        set_={
+            "start_time": case(
+                (table.c.start_time.is_(None), new.start_time),
+                (new.start_time < table.c.start_time, new.start_time),
+                else_=table.c.start_time
+            ),
+            # work_hours/extra_hours hold the checkout timestamp, as in check_out
+            "end_time": end_time,
+            "work_hours": end_time,
+            "extra_hours": end_time,
+        }
+    ), rows)
+
+
+def _close_days(db: Session, rows: list):
+    """Apply check-outs to days checked in earlier; an "out" without a check-in carries nothing"""
+    new_end = bindparam("b_end_time")
+    db.execute(
+        update(Attendance.__table__)
+        .where(
+            Attendance.emp_id == bindparam("b_emp_id"),
+            Attendance.date == bindparam("b_date"),
+            Attendance.start_time.isnot(None),
+            Attendance.start_time < new_end,
+            (Attendance.end_time.is_(None)) | (Attendance.end_time < new_end)
+        )
+        .values(end_time=new_end, work_hours=new_end, extra_hours=new_end),
+        rows
+    )
+
+
+def _refresh_summaries(db: Session, emp_ids: list):
+    """Recompute the summary rows of the given employees (hot rows plus archived counts) in one statement"""
+    present_days = (
+        func.sum(case((Attendance.on_leave == False, 1), else_=0))
+        + func.coalesce(Summary.archived_present_days, 0)
+    )
+    leave_count = (
+        func.sum(case((Attendance.on_leave == True, 1), else_=0))
+        + func.coalesce(Summary.archived_leave_count, 0)
+    )
+    counts = (
+        select(
+            Attendance.emp_id, present_days, leave_count,
+            LEAVE_ALLOWANCE - leave_count, present_days + leave_count
+        )
+        .outerjoin(Summary, Summary.emp_id == Attendance.emp_id)
+        .where(Attendance.emp_id.in_(emp_ids))
+        .group_by(Attendance.emp_id, Summary.archived_present_days, Summary.archived_leave_count)
+    )
+    statement = _insert_for(db)(Summary).from_select(
+        ["emp_id", "present_days", "leave_count", "leave_left", "tot_work_days"], counts
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[Summary.emp_id],
+        set_={
+            "present_days": statement.excluded.present_days,
+            "leave_count": statement.excluded.leave_count,
+            "leave_left": statement.excluded.leave_left,
+            "tot_work_days": statement.excluded.tot_work_days,
+        }
+    ))
+
+
+def ingest_punches(db: Session, company_id: UUID, punches: list, today: Optional[date] = None) -> PunchResult:
+    """
+    Fold a batch of (emp_id, timestamp, direction) punches into attendance
+    Punches of employees outside the company are skipped and reported
+    """
+    today = today or date.today()
+    unique = set(punches)
+    emp_ids = {emp_id for emp_id, _, _ in unique}
+    known = set(db.execute(
+        select(Employee.id).where(
+            Employee.company_id == company_id,
+            Employee.deleted_at.is_(None),
+            Employee.id.in_(emp_ids)
+        )
+    ).scalars())
+    unknown = emp_ids - known
+
+    accepted = [punch for punch in unique if punch[0] in known]
+    days = fold_punches(accepted)
+    checked_in = []
+    checked_out = []
+    for (emp_id, day), (first_in, last_out) in days.items():
+        if first_in is not None:
+            checked_in.append({
+                "emp_id": emp_id, "date": day, "start_time": first_in, "end_time": last_out,
+                "work_hours": last_out, "extra_hours": last_out, "on_leave": False
+            })
+        elif last_out is not None:
+            checked_out.append({"b_emp_id": emp_id, "b_date": day, "b_end_time": last_out})
+
+    if checked_in:
+        _upsert_days(db, checked_in)
+    if checked_out:
+        _close_days(db, checked_out)
+
+    touched = sorted({emp_id for emp_id, _ in days})
+    if touched:
+        _refresh_summaries(db, touched)
+        if any(day == today for _, day in days):
+            refresh_current_status(db, touched, today)
+
+    return PunchResult(
+        accepted=len(accepted),
+        duplicates=len(punches) - len(unique),
+        unknown_employees=tuple(sorted(unknown)),
+        days=list(days)
+    )
+
+
+def invalidate_after_ingest(company_id: UUID, result: PunchResult):
+    """Drop cached statuses, matrices and read models the batch may have changed; call after commit"""
+    months = set()
+    for emp_id, day in result.days:
+        status_cache.invalidate(emp_id, day)
+        months.add((day.year, day.month))
+    for year, month in months:
+        invalidate_matrix(company_id, date(year, month, 1))
+    if result.days:
+        invalidate(company_id, {emp_id for emp_id, _ in result.days})
@@ -0,0 +1,33 @@
+"""
+Cached tenant read models
+
+Company profile, employee list, employee details and leave lists are cached
+as encoded JSON in a TaggedCache (utils/tagged_cache.py). Entries are tagged
+with their company and, where they belong to one employee, with that
+employee. Handlers that change employees, leave or attendance call
+invalidate() after committing; nightly jobs that rewrite many companies call
+read_cache.invalidate_all().
+
+Keys always include the company, so one tenant never gets another's entry.
+"""
+from typing import Iterable, Optional
+from uuid import UUID
+from utils.tagged_cache import TaggedCache
+
+read_cache = TaggedCache()
+
+
+def company_tag(company_id) -> str:
+    return f"company:{company_id}"
+
+
+def employee_tag(emp_id: str) -> str:
+    return f"employee:{emp_id}"
+
+
+def invalidate(company_id: Optional[UUID] = None, emp_ids: Iterable[str] = ()):
+    """Drop cached read models of a company and/or some of its employees"""
+    tags = [employee_tag(emp_id) for emp_id in emp_ids]
+    if company_id is not None:
+        tags.append(company_tag(company_id))
+    read_cache.invalidate(*tags)
@@ -0,0 +1,218 @@
+"""
+In-app scheduler for periodic batch jobs
+
+Jobs are registered with a cron spec (minute hour day-of-month month
+day-of-week; supports *, */n, a-b and lists). Every app process runs a
+scheduler thread, and each due job is claimed by inserting its
+(job_name, slot) row into `scheduled_job_run`: the unique constraint lets
+exactly one process win, and on Postgres an advisory lock additionally keeps
+a slow run from overlapping with the next slot. The same rows are the run
+history.
+"""
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from database.database import SessionLocal, get_engine
+from database.models import ScheduledJobRun
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+
+
+class CronSpec:
+    """A parsed five-field cron expression"""
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields: '{spec}'")
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/")
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = map(int, part.split("-"))
+            else:
+                start = end = int(part)
+            if start < low or end > high or step < 1:
+                raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def matches(self, moment: datetime) -> bool:
+        # Cron numbers weekdays from Sunday = 0, Python from Monday = 0
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.day in self.days
+            and moment.month in self.months
+            and (moment.weekday() + 1) % 7 in self.weekdays
+        )
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    cron: CronSpec
+    func: Callable[[Session], int]  # Returns the number of rows processed
+
+
+_jobs: dict[str, ScheduledJob] = {}
+
+
+def scheduled(name: str, spec: str):
+    """Register a function as a scheduled job; it gets a Session and returns rows processed"""
+    def decorator(func):
+        _jobs[name] = ScheduledJob(name, CronSpec(spec), func)
+        return func
+    return decorator
+
+
+def _advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg advisory locks"""
+    return zlib.crc32(f"scheduler:{name}".encode()) - 2**31
+
+
+def _claim_slot(name: str, slot: datetime) -> Optional[int]:
+    """Insert the run row for this slot; None if another process already has it"""
+    with SessionLocal() as db:
+        run = ScheduledJobRun(job_name=name, scheduled_for=slot, status=RUN_RUNNING, processed=0, started_at=datetime.now())
+        db.add(run)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+        return run.run_id
+
+
+def _finish_run(name: str, run_id: int, values: dict, attempts: int = 3):
+    """Record a run's outcome, retrying briefly so a DB blip doesn't leave it "running" """
+    for attempt in range(1, attempts + 1):
+        try:
+            with SessionLocal() as db:
+                db.execute(
+                    update(ScheduledJobRun).where(ScheduledJobRun.run_id == run_id)
+                    .values(finished_at=datetime.now(), **values)
+                )
+                db.commit()
+            return
+        except Exception:
+            if attempt == attempts:
+                logger.exception("Could not record the outcome of scheduled job %s (run %s)", name, run_id)
+                return
+            time.sleep(attempt)
+
+
+def fail_abandoned_runs(max_age: timedelta) -> int:
+    """Mark runs still "running" after max_age as failed (their process died or lost the database)"""
+    with SessionLocal() as db:
+        result = db.execute(
+            update(ScheduledJobRun)
+            .where(ScheduledJobRun.status == RUN_RUNNING, ScheduledJobRun.started_at < datetime.now() - max_age)
+            .values(status=RUN_FAILED, finished_at=datetime.now(), error="Abandoned: no outcome was recorded")
+        )
+        db.commit()
+        return result.rowcount
+
+
+def run_job(job: ScheduledJob, slot: datetime) -> Optional[int]:
+    """Run a job for a slot unless another process already did; returns the run ID"""
+    run_id = _claim_slot(job.name, slot)
+    if run_id is None:
+        return None
+
+    values: dict = {}
+    engine = get_engine()
+    use_advisory_lock = engine.dialect.name == "postgresql"
+    key = _advisory_lock_key(job.name)
+    # The advisory lock belongs to a database session, so it is taken and
+    # released on one pinned connection; the job commits on its own session
+    try:
+        with engine.connect() as lock_connection:
+            if use_advisory_lock:
+                locked = lock_connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+                lock_connection.commit()
+                if not locked:
+                    raise RuntimeError("Previous run of this job is still in progress")
+            try:
+                with SessionLocal() as db:
+                    processed = job.func(db)
+                values = {"status": RUN_COMPLETED, "processed": processed}
+            finally:
+                if use_advisory_lock:
+                    lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                    lock_connection.commit()
+    except Exception as e:
+        logger.exception("Scheduled job %s failed", job.name)
+        values = {"status": RUN_FAILED, "error": str(e)}
+
+    _finish_run(job.name, run_id, values)
+    return run_id
+
+
+class Scheduler:
+    """Background thread that wakes every minute and runs due jobs"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        get_engine()
+        slot = datetime.now().replace(second=0, microsecond=0)
+        while not self._stop.is_set():
+            try:
+                fail_abandoned_runs(timedelta(hours=settings.SCHEDULER_STALE_RUN_HOURS))
+            except Exception:
+                logger.exception("Could not check for abandoned scheduled runs")
+            for job in list(_jobs.values()):
+                if job.cron.matches(slot):
+                    # A failure (e.g. the database is down) must not end the thread
+                    try:
+                        run_job(job, slot)
+                    except Exception:
+                        logger.exception("Scheduled job %s could not be run for %s", job.name, slot)
+            slot += timedelta(minutes=1)
+            # Sleep until the next minute starts
+            self._stop.wait(max((slot - datetime.now()).total_seconds(), 0))
+
+
+scheduler = Scheduler()
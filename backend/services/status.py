@@ -0,0 +1,120 @@
+"""
+Employee attendance status
+
+Status is derived from today's attendance row on read and kept in a small
+per-worker cache keyed by (emp_id, date). check_in, check_out and the day
+rollover job invalidate the cache; the short TTL bounds how long another
+worker process can serve a stale value. Employee.current_status is only
+written when the status actually changes.
+
+Status values:
+- 0: Checked out / No attendance record
+- 1: Checked in (working)
+- 2: On leave
+"""
+from datetime import date
+from typing import Optional
+from sqlalchemy import select, update, case, func, and_
+from sqlalchemy.orm import Session
+from database.models import Attendance, Employee
+from utils.ttl_cache import TTLCache
+
+STATUS_CHECKED_OUT = 0
+STATUS_CHECKED_IN = 1
+STATUS_ON_LEAVE = 2
+
+STATUS_DESCRIPTIONS = {
+    STATUS_CHECKED_OUT: "Checked out",
+    STATUS_CHECKED_IN: "Checked in (Working)",
+    STATUS_ON_LEAVE: "On leave"
+}
+
+CACHE_SIZE = 50000
+CACHE_TTL = 5.0  # Seconds; bounds staleness across worker processes
+
+
+class StatusCache(TTLCache):
+    """TTLCache keyed by (emp_id, date)"""
+
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        super().__init__(max_size, ttl)
+
+    def get(self, emp_id: str, day: date) -> Optional[int]:
+        return super().get((emp_id, day))
+
+    def set(self, emp_id: str, day: date, status: int):
+        super().set((emp_id, day), status)
+
+    def invalidate(self, emp_id: str, day: Optional[date] = None):
+        super().invalidate((emp_id, day or date.today()))
+
+
+status_cache = StatusCache()
+
+
+def derive_status(attendance: Optional[Attendance]) -> int:
+    """Status implied by an attendance row for the day"""
+    if not attendance:
+        return STATUS_CHECKED_OUT
+    if attendance.on_leave:
+        return STATUS_ON_LEAVE
+    if attendance.end_time is None:
+        return STATUS_CHECKED_IN
+    return STATUS_CHECKED_OUT
+
+
+def get_today_status(emp_id: str, db: Session) -> int:
+    """Today's status from the cache, or from a read-only query on a miss"""
+    today = date.today()
+    status = status_cache.get(emp_id, today)
+    if status is None:
+        attendance = db.query(Attendance).filter(
+            Attendance.emp_id == emp_id,
+            Attendance.date == today
+        ).first()
+        status = derive_status(attendance)
+        status_cache.set(emp_id, today, status)
+    return status
+
+
+def record_status_change(employee: Employee, db: Session) -> int:
+    """
+    Recompute today's status after an attendance change
+    Sets Employee.current_status only if it changed; the caller commits and
+    then invalidates status_cache
+    The write is set-based rather than through the ORM: punch uploads, batched
+    check-ins and admin edits bump Employee.version concurrently, and a
+    versioned ORM UPDATE would fail with StaleDataError
+    """
+    db.flush()
+    today = date.today()
+    # Read from the flushed row, not through the cache: the status isn't
+    # committed yet, so callers invalidate status_cache after db.commit()
+    attendance = db.query(Attendance).filter(
+        Attendance.emp_id == employee.id,
+        Attendance.date == today
+    ).first()
+    refresh_current_status(db, [employee.id], today)
+    return derive_status(attendance)
+
+
+def refresh_current_status(db: Session, emp_ids: list, today: date):
+    """
+    Set-based record_status_change for many employees: current_status from the
+    day's attendance row, written only where it changes; the caller commits
+    """
+    today_row = and_(Attendance.emp_id == Employee.id, Attendance.date == today)
+    new_status = func.coalesce(
+        select(case(
+            (Attendance.on_leave == True, STATUS_ON_LEAVE),
+            (and_(Attendance.start_time.isnot(None), Attendance.end_time.is_(None)), STATUS_CHECKED_IN),
+            else_=STATUS_CHECKED_OUT
+        )).where(today_row).scalar_subquery(),
+        STATUS_CHECKED_OUT
+    )
+    db.execute(
+        update(Employee)
+        .where(Employee.id.in_(emp_ids), Employee.current_status.is_distinct_from(new_status))
+        .values(current_status=new_status, version=Employee.version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,50 @@
+import os
+import sys
+import uuid
+
+# Settings require these; tests that need a database use the `db` fixture
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event
+import database.database as database
+from database.database import Base, SessionLocal
+from database.models import Company, Employee
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Session on a fresh SQLite file with every table; SessionLocal and get_engine() use it too"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    event.listen(engine, "connect", database._enable_sqlite_foreign_keys)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "_engine", engine)
+    SessionLocal.configure(bind=engine)
+    with SessionLocal() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def make_company(db):
+    def make(name: str = "Acme") -> Company:
+        company = Company(id=uuid.uuid4(), company_name=name, email=f"{uuid.uuid4().hex}@example.com", password="x")
+        db.add(company)
+        db.commit()
+        return company
+    return make
+
+
+@pytest.fixture
+def make_employee(db):
+    def make(company: Company, emp_id: str, name: str = None, manager_id: str = None) -> Employee:
+        employee = Employee(
+            id=emp_id, company_id=company.id, name=name or emp_id, password="x",
+            email=f"{emp_id.lower()}@example.com", manager_id=manager_id
+        )
+        db.add(employee)
+        db.commit()
+        return employee
+    return make
@@ -0,0 +1,58 @@
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from utils.compression import CompressionMiddleware, accepts_encoding
+from utils.http_cache import etag_matches
+
+
+def test_listed_coding_is_accepted():
+    assert accepts_encoding("gzip, deflate, br", "br")
+    assert accepts_encoding("br;q=0.5, gzip", "br")
+
+
+def test_zero_quality_refuses_coding():
+    assert not accepts_encoding("gzip, br;q=0", "br")
+    assert not accepts_encoding("br; q=0.000", "br")
+
+
+def test_token_containing_coding_is_not_a_match():
+    assert not accepts_encoding("gzip, x-brotli-custom", "br")
+    assert not accepts_encoding("", "br")
+
+
+def test_wildcard_applies_to_unlisted_coding():
+    assert accepts_encoding("gzip, *", "br")
+    assert not accepts_encoding("gzip, *;q=0", "br")
+    assert not accepts_encoding("*, br;q=0", "br")
+
+
+def make_client():
+    async def report(request):
+        if etag_matches(request, '"abc"'):
+            return Response(status_code=304, headers={"ETag": '"abc"'})
+        return Response(b"x" * 2000, media_type="application/json", headers={"ETag": '"abc"'})
+
+    app = CompressionMiddleware(Starlette(routes=[Route("/report", report)]), minimum_size=1000)
+    return TestClient(app)
+
+
+def test_gzip_needs_a_nonzero_quality():
+    client = make_client()
+    gzipped = client.get("/report", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    refused = client.get("/report", headers={"Accept-Encoding": "gzip;q=0, deflate"})
+    assert "content-encoding" not in refused.headers
+    assert refused.content == b"x" * 2000
+
+
+def test_each_encoding_has_its_own_etag():
+    client = make_client()
+    etags = {
+        coding: client.get("/report", headers={"Accept-Encoding": coding}).headers["etag"]
+        for coding in ("br", "gzip", "identity")
+    }
+    assert etags == {"br": '"abc-br"', "gzip": '"abc-gzip"', "identity": '"abc"'}
+    # Any of them revalidates the resource
+    for etag in etags.values():
+        assert client.get("/report", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
@@ -0,0 +1,91 @@
+import pytest
+from services.employee_search import CompanySearchIndex, edit_distance, max_typos, search_employees, search_indexes, tokenize
+
+
+def test_tokenize_splits_letters_and_digits():
+    assert tokenize("Panchal12 O'Brien, QA-Lead") == ["panchal", "12", "o", "brien", "qa", "lead"]
+    assert tokenize(None) == []
+    assert tokenize("") == []
+
+
+@pytest.mark.parametrize("a, b, limit, expected", [
+    ("kitten", "sitting", 3, 3),
+    ("nisarg", "nisarg", 2, 0),
+    ("nisarg", "nsiarg", 2, 1),  # A transposition is one edit
+    ("nisarg", "nisar", 2, 1),
+    ("kitten", "sitting", 2, 3),  # Over the limit: limit + 1
+    ("ab", "abcdef", 2, 3),
+])
+def test_edit_distance(a, b, limit, expected):
+    assert edit_distance(a, b, limit) == expected
+
+
+def test_typo_budget_grows_with_word_length():
+    assert [max_typos(word) for word in ("ab", "abc", "abcde", "abcdef")] == [0, 1, 1, 2]
+
+
+def make_index(*rows) -> CompanySearchIndex:
+    index = CompanySearchIndex()
+    for row in rows:
+        index.add(row)
+    return index
+
+
+def row(emp_id, name, email="", department="", job_position="", location="", manager=""):
+    return (emp_id, name, email, department, job_position, location, manager)
+
+
+def test_exact_beats_prefix_beats_typo():
+    index = make_index(
+        row("E1", "Patel"),
+        row("E2", "Patelia"),
+        row("E3", "Pateel"),
+    )
+    total, ranked = index.search(["patel"], 10)
+    assert total == 3
+    assert [emp_id for _, emp_id in ranked] == ["E1", "E2", "E3"]
+    assert [score for score, _ in ranked] == [1.0, 0.8, 0.6]
+
+
+def test_field_weight_scales_score():
+    index = make_index(row("E1", "Ana", location="Surat"), row("E2", "Surat Shah"))
+    _, ranked = index.search(["surat"], 10)
+    assert ranked == [(1.0, "E2"), (0.6, "E1")]
+
+
+def test_every_word_must_match():
+    index = make_index(row("E1", "Jane Doe", department="Sales"), row("E2", "Jane Roe", department="Engineering"))
+    total, ranked = index.search(["jane", "eng"], 10)
+    assert total == 1
+    assert [emp_id for _, emp_id in ranked] == ["E2"]
+    assert index.search(["jane", "xyz"], 10) == (0, [])
+
+
+def test_short_words_get_no_typos():
+    index = make_index(row("E1", "Al"))
+    assert index.search(["ak"], 10) == (0, [])
+
+
+def test_removed_and_reindexed_employees():
+    index = make_index(row("E1", "Jane"), row("E2", "Janet"))
+    index.remove("E1")
+    index.add(row("E2", "Priya"))
+    assert index.search(["jane"], 10) == (0, [])
+    assert index.search(["priya"], 10) == (1, [(1.0, "E2")])
+
+
+def test_search_employees_pages_by_rank(db, make_company, make_employee):
+    acme, other = make_company("Acme"), make_company("Other")
+    make_employee(acme, "E1", name="Riya Shah")
+    make_employee(acme, "E2", name="Riyan Mehta")
+    make_employee(acme, "E3", name="Arjun Rao")
+    make_employee(other, "X1", name="Riya Other")
+    search_indexes.clear()
+
+    total, page = search_employees(db, acme.id, "riya", limit=1, offset=0)
+    assert total == 2
+    assert [(result["id"], result["score"]) for result in page] == [("E1", 1.0)]
+    _, page = search_employees(db, acme.id, "riya", limit=1, offset=1)
+    assert [(result["id"], result["score"]) for result in page] == [("E2", 0.8)]
+    assert search_employees(db, acme.id, "  ", limit=10, offset=0) == (0, [])
+    search_indexes.clear()
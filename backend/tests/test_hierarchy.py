@@ -0,0 +1,88 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import select, delete
+from database.models import Employee, EmployeeHierarchy
+from services import hierarchy
+from services.offboarding import rebuild_hierarchy
+
+
+@pytest.fixture
+def tree(db, make_company, make_employee):
+    """A -> B -> D -> E and A -> C"""
+    company = make_company()
+    for emp_id, manager_id in (("A", None), ("B", "A"), ("C", "A"), ("D", "B"), ("E", "D")):
+        make_employee(company, emp_id, manager_id=manager_id)
+        hierarchy.add_employee(db, emp_id, manager_id)
+    db.commit()
+    return company
+
+
+def closure(db) -> set:
+    return set(db.execute(select(EmployeeHierarchy.ancestor_id, EmployeeHierarchy.descendant_id, EmployeeHierarchy.depth)).all())
+
+
+def expected_closure(db) -> set:
+    """The closure table manager_id implies, walked in Python"""
+    managers = dict(db.execute(select(Employee.id, Employee.manager_id).where(Employee.deleted_at.is_(None))).all())
+    rows = set()
+    for emp_id in managers:
+        node, depth = emp_id, 0
+        while node is not None:
+            rows.add((node, emp_id, depth))
+            node, depth = managers[node], depth + 1
+    return rows
+
+
+def set_manager(db, emp_id, manager_id):
+    db.get(Employee, emp_id).manager_id = manager_id
+    hierarchy.move_employee(db, emp_id, manager_id)
+    db.commit()
+
+
+def test_add_builds_the_closure(db, tree):
+    assert closure(db) == expected_closure(db)
+    assert ("A", "E", 3) in closure(db)
+    assert [row.id for row in hierarchy.get_reports(db, "B")] == ["D", "E"]
+    assert [row.id for row in hierarchy.get_reports(db, "A", depth=1)] == ["B", "C"]
+
+
+def test_move_takes_the_subtree_along(db, tree):
+    set_manager(db, "B", "C")
+    assert closure(db) == expected_closure(db)
+    assert ("C", "E", 3) in closure(db)
+
+    set_manager(db, "D", None)
+    assert closure(db) == expected_closure(db)
+    assert not any(ancestor == "A" and descendant in ("D", "E") for ancestor, descendant, _ in closure(db))
+
+
+@pytest.mark.parametrize("emp_id, manager_id", [("B", "B"), ("B", "D"), ("A", "E")])
+def test_move_rejects_cycles(db, tree, emp_id, manager_id):
+    before = closure(db)
+    with pytest.raises(hierarchy.HierarchyError):
+        hierarchy.move_employee(db, emp_id, manager_id)
+    assert closure(db) == before
+
+
+def test_remove_moves_reports_up(db, tree):
+    hierarchy.remove_employee(db, db.get(Employee, "D"))
+    db.execute(delete(Employee).where(Employee.id == "D"))
+    db.commit()
+    db.expire_all()
+
+    assert db.get(Employee, "E").manager_id == "B"
+    assert closure(db) == expected_closure(db)
+
+
+def test_rebuild_recomputes_from_manager_ids(db, tree):
+    db.execute(delete(EmployeeHierarchy))
+    db.get(Employee, "C").deleted_at = datetime.utcnow()
+    # Changed without touching the closure table
+    db.get(Employee, "E").manager_id = "B"
+    db.commit()
+
+    rebuild_hierarchy(db, tree.id)
+    db.commit()
+
+    assert closure(db) == expected_closure(db)
+    assert not any("C" in (ancestor, descendant) for ancestor, descendant, _ in closure(db))
@@ -0,0 +1,126 @@
+import asyncio
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from utils.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+def make_client(wait_seconds: float = 5.0):
+    """Client for an app whose POST /orders counts its runs; POST /slow waits for `gate`"""
+    runs = {"orders": 0, "slow": 0}
+    gate = asyncio.Event()
+
+    async def orders(request: Request):
+        runs["orders"] += 1
+        body = await request.json()
+        status_code = 500 if body.get("fail") else 201
+        return JSONResponse({"run": runs["orders"], **body}, status_code=status_code)
+
+    async def slow(request: Request):
+        runs["slow"] += 1
+        await gate.wait()
+        return JSONResponse({"run": runs["slow"]})
+
+    app = Starlette(routes=[Route("/orders", orders, methods=["POST"]), Route("/slow", slow, methods=["POST"])])
+    store = IdempotencyStore(ttl=60, max_entries=100, max_bytes=1 << 20)
+    app = IdempotencyMiddleware(
+        app, store, routes=[("POST", "/orders"), ("POST", "/slow")],
+        identify=lambda headers: headers.get("x-user"), wait_seconds=wait_seconds
+    )
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    return client, runs, gate, store
+
+
+def post(client, path="/orders", key="k1", user="alice", json=None):
+    return client.post(path, json=json or {"item": 1}, headers={"Idempotency-Key": key, "X-User": user})
+
+
+def test_retry_replays_the_first_response():
+    async def scenario():
+        client, runs, _, _ = make_client()
+        first = await post(client)
+        again = await post(client)
+        return first, again, runs
+
+    first, again, runs = asyncio.run(scenario())
+    assert runs["orders"] == 1
+    assert (again.status_code, again.json()) == (201, first.json())
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+
+def test_key_is_scoped_to_caller_and_requires_same_body():
+    async def scenario():
+        client, runs, _, _ = make_client()
+        await post(client)
+        mismatch = await post(client, json={"item": 2})
+        other_caller = await post(client, user="bob")
+        no_key = await client.post("/orders", json={"item": 1}, headers={"X-User": "alice"})
+        return mismatch, other_caller, no_key, runs
+
+    mismatch, other_caller, no_key, runs = asyncio.run(scenario())
+    assert mismatch.status_code == 422
+    assert other_caller.status_code == 201 and "Idempotent-Replayed" not in other_caller.headers
+    assert no_key.status_code == 201
+    assert runs["orders"] == 3
+
+
+def test_server_errors_are_not_replayed():
+    async def scenario():
+        client, runs, _, _ = make_client()
+        await post(client, json={"fail": True})
+        await post(client, json={"fail": True})
+        return runs
+
+    assert asyncio.run(scenario())["orders"] == 2
+
+
+def test_duplicate_in_flight_waits_for_the_original():
+    async def scenario():
+        client, runs, gate, _ = make_client()
+        original = asyncio.ensure_future(post(client, "/slow"))
+        duplicate = asyncio.ensure_future(post(client, "/slow"))
+        await asyncio.sleep(0.05)
+        assert runs["slow"] == 1
+        gate.set()
+        return await original, await duplicate, runs
+
+    original, duplicate, runs = asyncio.run(scenario())
+    assert runs["slow"] == 1
+    assert duplicate.json() == original.json()
+    assert duplicate.headers["Idempotent-Replayed"] == "true"
+
+
+def test_duplicate_gives_up_with_409():
+    async def scenario():
+        client, runs, gate, store = make_client(wait_seconds=0.05)
+        original = asyncio.ensure_future(post(client, "/slow"))
+        await asyncio.sleep(0.01)
+        duplicate = await post(client, "/slow")
+        gate.set()
+        await original
+        return duplicate, runs, store
+
+    duplicate, runs, store = asyncio.run(scenario())
+    assert duplicate.status_code == 409
+    assert runs["slow"] == 1
+    assert len(store) == 1
+
+
+def test_store_evicts_least_recently_used():
+    store = IdempotencyStore(ttl=60, max_entries=2, max_bytes=1 << 20)
+    for key in ("a", "b"):
+        store.put((key,), b"f", 200, [], b"{}")
+    store.get(("a",))
+    store.put(("c",), b"f", 200, [], b"{}")
+    assert store.get(("b",)) is None
+    assert store.get(("a",)) is not None and store.get(("c",)) is not None
+
+
+def test_store_expires_entries():
+    store = IdempotencyStore(ttl=-1, max_entries=10, max_bytes=1 << 20)
+    store.put(("a",), b"f", 200, [], b"{}")
+    assert store.get(("a",)) is None
+    assert len(store) == 0 and store.bytes == 0
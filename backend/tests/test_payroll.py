@@ -0,0 +1,83 @@
+from datetime import date, datetime
+import numpy as np
+from sqlalchemy import select, func
+from database.models import Attendance, LeaveTable, Payroll, PayrollRun, Salary
+from services.payroll import compute_pay, run_payroll, working_days_in_month
+
+
+def salary_row(basic=0, hra=0, pf1=0, prof_tax=0):
+    # EARNING_COLUMNS then DEDUCTION_COLUMNS
+    return [basic, hra, 0, 0, 0, 0, pf1, prof_tax]
+
+
+def test_working_days_are_weekdays():
+    assert working_days_in_month(2025, 3) == 21
+    assert working_days_in_month(2024, 2) == 21
+
+
+def test_paid_days_are_capped_at_working_days():
+    pay = compute_pay(
+        np.array([salary_row(basic=2100)]), np.array([20]), np.array([5]), np.array([0.0]), working_days=21
+    )
+    assert pay["paid_days"].tolist() == [21]
+    assert pay["gross_pay"].tolist() == [2100]
+
+
+def test_gross_and_overtime_round_to_whole_units():
+    pay = compute_pay(
+        np.array([salary_row(basic=5), salary_row(basic=7)]),
+        np.array([1, 1]), np.array([0, 0]), np.array([0.0, 1.0]), working_days=2
+    )
+    # 2.5 and 3.5 round half to even
+    assert pay["gross_pay"].tolist() == [2, 4]
+    # 7 / (2 days * 8 h) * 1 h * 1.5 = 0.656...
+    assert pay["overtime_pay"].tolist() == [0, 1]
+
+
+def test_net_pay_never_goes_negative():
+    pay = compute_pay(np.array([salary_row(basic=1000, pf1=300)]), np.array([0]), np.array([0]), np.array([0.0]), 21)
+    assert pay["deductions"].tolist() == [300]
+    assert pay["net_pay"].tolist() == [0]
+
+
+def test_run_payroll(db, make_company, make_employee):
+    acme, other = make_company("Acme"), make_company("Other")
+    for emp_id in ("E1", "E2", "E3"):
+        make_employee(acme, emp_id)
+    make_employee(other, "X1")
+    db.add_all([
+        Salary(emp_id="E1", basic_sal=21000, hra=4200, pf1=1800, prof_tax=200),
+        Salary(emp_id="E2", basic_sal=21000, pf1=1800),
+        Salary(emp_id="X1", basic_sal=99000),
+        # 2 hours of overtime, a normal day, a day still open and a day on leave
+        Attendance(emp_id="E1", date=date(2025, 3, 3), start_time=datetime(2025, 3, 3, 9), end_time=datetime(2025, 3, 3, 19), on_leave=False),
+        Attendance(emp_id="E1", date=date(2025, 3, 4), start_time=datetime(2025, 3, 4, 9), end_time=datetime(2025, 3, 4, 17), on_leave=False),
+        Attendance(emp_id="E1", date=date(2025, 3, 5), start_time=datetime(2025, 3, 5, 9), on_leave=False),
+        Attendance(emp_id="E1", date=date(2025, 3, 6), on_leave=True),
+        # Outside the month
+        Attendance(emp_id="E1", date=date(2025, 4, 1), start_time=datetime(2025, 4, 1, 9), on_leave=False),
+        # Clipped to Mar 1-11: seven weekdays
+        LeaveTable(emp_id="E1", start_date=date(2025, 2, 24), end_date=date(2025, 3, 11), is_approved=True),
+        LeaveTable(emp_id="E2", start_date=date(2025, 3, 3), end_date=date(2025, 3, 7), is_approved=False),
+    ])
+    db.commit()
+
+    run_payroll(db, acme.id, 2025, 3)
+    run = run_payroll(db, acme.id, 2025, 3)
+
+    assert db.execute(select(func.count()).select_from(PayrollRun)).scalar() == 1
+    lines = {line.emp_id: line for line in db.execute(select(Payroll).where(Payroll.run_id == run.run_id)).scalars()}
+    assert set(lines) == {"E1", "E2"}
+
+    e1 = lines["E1"]
+    # Approved leave (7) wins over the one on-leave attendance row
+    assert (e1.present_days, e1.leave_days, e1.paid_days) == (3, 7, 10)
+    assert e1.overtime_hours == 2.0
+    # 25200 * 10 / 21, plus 2 h at 1.5 x 21000 / 168, minus 2000
+    assert (e1.gross_pay, e1.overtime_pay, e1.deductions, e1.net_pay) == (12000, 375, 2000, 10375)
+
+    e2 = lines["E2"]
+    assert (e2.paid_days, e2.gross_pay, e2.net_pay) == (0, 0, 0)
+
+    assert (run.working_days, run.employee_count) == (21, 2)
+    assert (run.total_gross, run.total_deductions, run.total_net) == (12375, 3800, 10375)
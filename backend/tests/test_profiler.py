@@ -0,0 +1,41 @@
+from utils.profiler import Profile, ProfileStore
+
+
+def saved_profile(store: ProfileStore, owner: str = "acme") -> Profile:
+    profile = Profile(owner, "GET", "/employees/")
+    profile.samples["loop;handler (x.py:1)"] += 3
+    store.save(profile)
+    return profile
+
+
+def test_saved_profiles_are_listed_and_loaded(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    mine = saved_profile(store)
+    saved_profile(store, owner="other")
+
+    assert [metadata["profile_id"] for metadata in store.for_owner("acme")] == [mine.id]
+    metadata, collapsed = store.load(mine.id, "acme")
+    assert metadata["samples"] == 3
+    assert collapsed == "loop;handler (x.py:1) 3\n"
+    assert store.load(mine.id, "other") is None
+    assert store.load("../etc", "acme") is None
+
+
+def test_oldest_profiles_are_pruned(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    first = saved_profile(store)
+    later = [saved_profile(store) for _ in range(2)]
+
+    listed = {metadata["profile_id"] for metadata in store.for_owner("acme")}
+    assert listed == {profile.id for profile in later}
+    assert not (tmp_path / f"{first.id}.json").exists()
+    assert not (tmp_path / f"{first.id}.collapsed").exists()
+
+
+def test_profiles_saved_by_another_worker_show_up(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    assert store.for_owner("acme") == []
+    other_worker = ProfileStore(str(tmp_path), max_profiles=10)
+    profile = saved_profile(other_worker)
+
+    assert [metadata["profile_id"] for metadata in store.for_owner("acme")] == [profile.id]
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+from services.punches import fold_punches
+
+DAY = date(2025, 3, 3)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2025, 3, 3, hour, minute)
+
+
+def test_first_in_and_last_out():
+    punches = [("E1", at(9), "in"), ("E1", at(12), "out"), ("E1", at(13), "in"), ("E1", at(18), "out")]
+    assert fold_punches(punches) == {("E1", DAY): [at(9), at(18)]}
+
+
+def test_out_before_first_in_is_dropped():
+    punches = [("E1", at(8), "out"), ("E1", at(9), "in")]
+    assert fold_punches(punches) == {("E1", DAY): [at(9), None]}
+
+
+def test_out_before_first_in_then_later_out():
+    punches = [("E1", at(8), "out"), ("E1", at(9), "in"), ("E1", at(17), "out")]
+    assert fold_punches(punches) == {("E1", DAY): [at(9), at(17)]}
+
+
+def test_out_without_in_is_kept_for_existing_check_in():
+    assert fold_punches([("E1", at(17), "out")]) == {("E1", DAY): [None, at(17)]}
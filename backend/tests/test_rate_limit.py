@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from auth import rate_limit
+from auth.rate_limit import BucketRule, LoginGuard, MemoryBucketBackend
+from config import settings
+
+RULE = BucketRule(capacity=3, per_second=0.5)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_burst_then_wait_for_refill(clock):
+    buckets = MemoryBucketBackend()
+    assert [buckets.take("k", RULE) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("k", RULE) == 2.0  # One token at 0.5 per second
+
+    clock.now += 1
+    assert buckets.take("k", RULE) == 1.0
+    clock.now += 1
+    assert buckets.take("k", RULE) == 0.0
+    assert buckets.take("k", RULE) == 2.0
+
+
+def test_refill_and_refunds_stop_at_capacity(clock):
+    buckets = MemoryBucketBackend()
+    buckets.take("k", RULE)
+    clock.now += 60
+    buckets.take("k", RULE, cost=-5)
+    assert [buckets.take("k", RULE) for _ in range(4)] == [0.0, 0.0, 0.0, 2.0]
+
+
+def test_keys_are_independent_and_bounded(clock):
+    buckets = MemoryBucketBackend(max_keys=2)
+    for _ in range(3):
+        buckets.take("a", RULE)
+    assert buckets.take("b", RULE) == 0.0
+    buckets.take("c", RULE)
+    # "a" was least recently used and got evicted, so it starts full again
+    assert buckets.take("a", RULE) == 0.0
+
+
+@pytest.fixture
+def guard(clock, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_ACCOUNT_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_ACCOUNT_PER_MINUTE", 6)
+    monkeypatch.setattr(settings, "LOGIN_IP_BURST", 3)
+    monkeypatch.setattr(settings, "LOGIN_IP_PER_MINUTE", 6)
+    guard = LoginGuard()
+    guard._backend = MemoryBucketBackend()
+    return guard
+
+
+def request(ip: str = "10.0.0.1"):
+    return SimpleNamespace(client=SimpleNamespace(host=ip))
+
+
+def test_account_is_throttled_after_its_burst(guard):
+    guard.check(request(), "a@acme.com")
+    guard.check(request(), " A@acme.com")  # Same account
+    with pytest.raises(HTTPException) as rejected:
+        guard.check(request(), "a@acme.com")
+    assert rejected.value.status_code == 429
+    assert rejected.value.headers["Retry-After"] == "10"
+    assert guard.counters.snapshot()["rejected_account"] == 1
+    # The rejected attempt gave its IP token back, so another account still gets in
+    guard.check(request(), "b@acme.com")
+
+
+def test_ip_is_throttled_across_accounts(guard):
+    for account in ("a", "b", "c"):
+        guard.check(request(), account)
+    with pytest.raises(HTTPException):
+        guard.check(request(), "d")
+    assert guard.counters.snapshot()["rejected_ip"] == 1
+    guard.check(request("10.0.0.2"), "d")
+
+
+def test_successful_logins_use_no_budget(guard):
+    for _ in range(5):
+        guard.check(request(), "a@acme.com")
+        guard.succeeded(request(), "a@acme.com")
+    assert guard.counters.snapshot()["succeeded"] == 5
+
+
+def test_disabled_limiter_lets_everything_through(guard, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", False)
+    for _ in range(10):
+        guard.check(request(), "a@acme.com")
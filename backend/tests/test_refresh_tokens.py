@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, func
+from auth.auth import create_access_token, create_refresh_token, decode_token
+from auth.revocation import denylist
+from database.models import Employee, RevokedToken
+from routers.auth import refresh_tokens
+from schemas.auth import RefreshRequest
+
+
+@pytest.fixture
+def employee(db, make_company, make_employee):
+    denylist.clear()
+    yield make_employee(make_company(), "E1")
+    denylist.clear()
+
+
+def refresh(db, token: str):
+    return asyncio.run(refresh_tokens(RefreshRequest(refresh_token=token), db))
+
+
+def refresh_token_for(emp_id: str = "E1") -> str:
+    return create_refresh_token({"sub": emp_id, "role": "employee"})
+
+
+def assert_rejected(db, token: str):
+    with pytest.raises(HTTPException) as rejected:
+        refresh(db, token)
+    assert rejected.value.status_code == 401
+
+
+def test_refresh_rotates_the_pair(db, employee):
+    token = refresh_token_for()
+    pair = refresh(db, token)
+
+    assert decode_token(pair["access_token"])["sub"] == "E1"
+    assert decode_token(pair["refresh_token"], token_type="refresh")["sub"] == "E1"
+    assert_rejected(db, token)
+    # The new refresh token works once too
+    refresh(db, pair["refresh_token"])
+
+
+def test_reuse_is_rejected_by_another_worker(db, employee):
+    token = refresh_token_for()
+    refresh(db, token)
+    # A worker whose denylist hasn't synced yet still loses on the INSERT
+    denylist.clear()
+    assert_rejected(db, token)
+    assert db.execute(select(func.count()).select_from(RevokedToken)).scalar() == 1
+
+
+def test_only_refresh_tokens_are_accepted(db, employee):
+    assert_rejected(db, create_access_token({"sub": "E1", "role": "employee"}))
+    assert_rejected(db, "not-a-token")
+
+
+def test_password_change_ends_older_refresh_tokens(db, employee):
+    token = refresh_token_for()
+    employee.tokens_valid_after = datetime.utcnow() + timedelta(seconds=5)
+    db.commit()
+    assert_rejected(db, token)
+
+    employee.tokens_valid_after = datetime.utcnow() - timedelta(seconds=5)
+    db.commit()
+    refresh(db, refresh_token_for())
+
+
+def test_deleted_employee_cannot_refresh(db, employee):
+    token = refresh_token_for()
+    db.get(Employee, "E1").deleted_at = datetime.utcnow()
+    db.commit()
+    assert_rejected(db, token)
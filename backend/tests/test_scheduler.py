@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from database.models import ScheduledJobRun
+from services.scheduler import (
+    CronSpec, ScheduledJob, RUN_COMPLETED, RUN_FAILED, RUN_RUNNING, _claim_slot, fail_abandoned_runs, run_job
+)
+
+SLOT = datetime(2025, 3, 2, 1, 30)  # A Sunday
+
+
+def test_cron_fields():
+    spec = CronSpec("*/15 9-17 1,15 * *")
+    assert spec.minutes == {0, 15, 30, 45}
+    assert spec.hours == set(range(9, 18))
+    assert spec.days == {1, 15}
+    assert spec.months == set(range(1, 13))
+
+
+def test_cron_matches():
+    nightly = CronSpec("30 1 * * *")
+    assert nightly.matches(SLOT)
+    assert not nightly.matches(SLOT + timedelta(minutes=1))
+    assert not nightly.matches(SLOT + timedelta(hours=1))
+    # Cron weekdays count from Sunday = 0
+    assert CronSpec("30 1 * * 0").matches(SLOT)
+    assert not CronSpec("30 1 * * 1-6").matches(SLOT)
+    assert CronSpec("30 1 * * 1").matches(SLOT + timedelta(days=1))
+    assert CronSpec("45 2 1 * *").matches(datetime(2025, 4, 1, 2, 45))
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "*/0 * * * *", "* * * * 7"])
+def test_cron_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        CronSpec(spec)
+
+
+def test_slot_is_claimed_once(db):
+    first = _claim_slot("nightly", SLOT)
+    assert first is not None
+    assert _claim_slot("nightly", SLOT) is None
+    # Another slot or another job is a separate run
+    assert _claim_slot("nightly", SLOT + timedelta(days=1)) is not None
+    assert _claim_slot("other", SLOT) is not None
+
+
+def runs(db):
+    db.expire_all()
+    return {run.job_name: run for run in db.execute(select(ScheduledJobRun)).scalars()}
+
+
+def test_run_job_records_outcome(db):
+    def fails(session):
+        raise RuntimeError("boom")
+
+    assert run_job(ScheduledJob("ok", CronSpec("* * * * *"), lambda session: 7), SLOT) is not None
+    assert run_job(ScheduledJob("ok", CronSpec("* * * * *"), lambda session: 7), SLOT) is None
+    run_job(ScheduledJob("broken", CronSpec("* * * * *"), fails), SLOT)
+
+    recorded = runs(db)
+    assert (recorded["ok"].status, recorded["ok"].processed) == (RUN_COMPLETED, 7)
+    assert (recorded["broken"].status, recorded["broken"].error) == (RUN_FAILED, "boom")
+    assert recorded["ok"].finished_at is not None
+
+
+def test_abandoned_runs_are_failed(db):
+    now = datetime.now()
+    db.add_all([
+        ScheduledJobRun(job_name="stuck", scheduled_for=SLOT, status=RUN_RUNNING, started_at=now - timedelta(hours=13)),
+        ScheduledJobRun(job_name="busy", scheduled_for=SLOT, status=RUN_RUNNING, started_at=now - timedelta(minutes=5)),
+    ])
+    db.commit()
+
+    assert fail_abandoned_runs(timedelta(hours=12)) == 1
+    recorded = runs(db)
+    assert recorded["stuck"].status == RUN_FAILED
+    assert recorded["busy"].status == RUN_RUNNING
@@ -0,0 +1,34 @@
+from sqlalchemy import select, update, delete
+from database.models import Employee, Summary
+from database.tenancy import set_tenant
+
+
+def test_update_and_delete_cannot_reach_another_company(db, make_company, make_employee):
+    acme, other = make_company("Acme"), make_company("Other")
+    make_employee(other, "E1", name="Theirs")
+    db.add(Summary(emp_id="E1", present_days=3))
+    db.commit()
+
+    set_tenant(db, acme.id)
+    renamed = db.execute(update(Employee).where(Employee.id == "E1").values(name="Hacked"))
+    wiped = db.execute(update(Summary).where(Summary.emp_id == "E1").values(present_days=0))
+    deleted = db.execute(delete(Summary).where(Summary.emp_id == "E1"))
+    db.commit()
+
+    assert (renamed.rowcount, wiped.rowcount, deleted.rowcount) == (0, 0, 0)
+    unscoped = {"skip_tenant_filter": True}
+    assert db.execute(select(Employee.name).where(Employee.id == "E1").execution_options(**unscoped)).scalar() == "Theirs"
+    assert db.execute(select(Summary.present_days).where(Summary.emp_id == "E1").execution_options(**unscoped)).scalar() == 3
+
+
+def test_update_reaches_own_company(db, make_company, make_employee):
+    acme = make_company()
+    make_employee(acme, "E1")
+
+    set_tenant(db, acme.id)
+    result = db.execute(
+        update(Employee).where(Employee.id == "E1").values(name="Renamed").execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    assert result.rowcount == 1
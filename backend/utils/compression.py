@@ -0,0 +1,100 @@
+"""
+Response compression middleware
+
+Brotli is used when the client accepts it and the `brotli` package is
+installed, otherwise gzip if accepted, otherwise the body goes out as is.
+Responses smaller than `minimum_size` bytes are sent uncompressed. An ETag
+on a compressed response gets the coding appended ("abc" -> "abc-br"), so
+each encoding has its own strong validator; utils/http_cache.py strips the
+suffix again when comparing.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.http_cache import coded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """
+    True if an Accept-Encoding header allows `coding` (its own q-value, else
+    the "*" one, must be above 0)
+    """
+    wildcard = None
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if name not in (coding, "*"):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == coding:
+            return quality > 0
+        wildcard = quality
+    return wildcard is not None and wildcard > 0
+
+
+class CodedETagMixin:
+    """Appends the responder's coding to the ETag of a response it compressed"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_with_etag(message: Message):
+            # content_encoding_set: the app encoded the body itself, so it's not ours to tag
+            if message["type"] == "http.response.start" and not self.content_encoding_set:
+                headers = MutableHeaders(raw=message["headers"])
+                if headers.get("content-encoding") == self.content_encoding and "etag" in headers:
+                    headers["ETag"] = coded_etag(headers["etag"], self.content_encoding)
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_etag)
+
+
+class GZipETagResponder(CodedETagMixin, GZipResponder):
+    pass
+
+
+class BrotliResponder(CodedETagMixin, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        if more_body:
+            return compressed + self.compressor.flush()
+        return compressed + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers brotli when available"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, compresslevel: int = 6, brotli_quality: int = 4) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        responder: ASGIApp
+        if brotli is not None and accepts_encoding(accept_encoding, "br"):
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif accepts_encoding(accept_encoding, "gzip"):
+            responder = GZipETagResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
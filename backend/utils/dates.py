@@ -0,0 +1,35 @@
+"""
+Date helpers shared by the month-based endpoints
+"""
+import calendar
+from datetime import date
+from fastapi import HTTPException, status
+
+
+def parse_month(month: str) -> tuple[int, int]:
+    """
+    Parse a YYYY-MM string into (year, month)
+    Raises 400 on a malformed value
+    """
+    try:
+        year, month_num = map(int, month.split('-'))
+        if not 1 <= month_num <= 12:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month format. Use YYYY-MM (e.g., 2026-01)"
+        )
+    return year, month_num
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """First and last day of a month"""
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
@@ -0,0 +1,66 @@
+"""
+Fast JSON serialization for large list responses
+
+Row tuples are turned into dicts and encoded straight to JSON bytes, skipping
+per-row Pydantic model construction. Only use this where the row shape is
+already known to match the response schema.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Optional, Sequence
+from uuid import UUID
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any):
+    """Encode the types stdlib json doesn't know about"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def rows_to_dicts(
+    rows: Iterable[Sequence[Any]],
+    fields: Sequence[str],
+    converters: Optional[dict[str, Callable[[Any], Any]]] = None
+) -> list[dict]:
+    """
+    Zip row tuples with field names
+    converters maps a field name to a function applied to non-null values
+    """
+    if not converters:
+        return [dict(zip(fields, row)) for row in rows]
+
+    positions = [(fields.index(name), func) for name, func in converters.items()]
+    result = []
+    for row in rows:
+        values = list(row)
+        for position, func in positions:
+            if values[position] is not None:
+                values[position] = func(values[position])
+        result.append(dict(zip(fields, values)))
+    return result
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson (or stdlib json as a fallback)"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
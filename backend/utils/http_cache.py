@@ -0,0 +1,123 @@
+"""
+Conditional request helpers
+
+Responses carry a strong ETag computed from their content (or supplied by the
+caller, e.g. from row versions). A request whose If-None-Match matches gets an
+empty 304 instead of the body, and a write whose If-Match doesn't match the
+current version gets 412.
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from utils.fast_json import dumps
+
+NO_CACHE = "private, no-cache"
+# Responses depend on the caller's token; a browser must not reuse them for another login
+VARY = "Authorization"
+# Content codings utils/compression.py appends to ETags
+CODINGS = ("br", "gzip")
+
+
+def json_body(content: Any) -> bytes:
+    """Serialize a Pydantic model or plain content to JSON bytes"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return dumps(content)
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag from a hash of the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """ETag of the same response sent with a content coding: "abc" -> "abc-br" (W/ kept)"""
+    return etag[:-1] + f'-{coding}"' if etag.endswith('"') else etag
+
+
+def _without_coding(etag: str) -> str:
+    """Undo coded_etag, so a validator from a compressed response matches its resource"""
+    for coding in CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def version_etag(*versions: Any) -> str:
+    """Strong ETag from one or more row versions (and IDs, for responses not keyed by URL)"""
+    return '"v' + "-".join(str(version) for version in versions) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore W/ prefixes and coding suffixes
+    candidates = [_without_coding(tag.strip().removeprefix("W/")) for tag in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def check_if_match(request: Request, etag: Optional[str]):
+    """
+    Enforce the request's If-Match header (if any) against the current ETag
+    etag is None when the resource doesn't exist yet
+    Raises 412 Precondition Failed when the client's copy is stale
+    """
+    header = request.headers.get("if-match")
+    if not header:
+        return
+    if etag is not None:
+        if header.strip() == "*":
+            return
+        # If-Match uses strong comparison; any coding of the current version matches
+        if etag in [_without_coding(tag.strip()) for tag in header.split(",")]:
+            return
+    raise precondition_failed()
+
+
+def precondition_failed() -> HTTPException:
+    """412 error for a write based on a stale version"""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource was modified by another request, reload and try again"
+    )
+
+
+def not_modified(request: Request, etag: str, cache_control: str = NO_CACHE) -> Optional[Response]:
+    """Return a 304 response if the client already has this ETag, else None"""
+    if etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": cache_control, "Vary": VARY}
+        )
+    return None
+
+
+def conditional_response(
+    request: Request,
+    content: Any,
+    etag: Optional[str] = None,
+    cache_control: str = NO_CACHE
+) -> Response:
+    """
+    Build a JSON response with ETag and Cache-Control headers
+    Returns 304 Not Modified when the client already has this version
+    """
+    body = content if isinstance(content, bytes) else json_body(content)
+    if etag is None:
+        etag = content_etag(body)
+    unchanged = not_modified(request, etag, cache_control)
+    if unchanged is not None:
+        return unchanged
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control, "Vary": VARY}
+    )
@@ -0,0 +1,226 @@
+"""
+Idempotency-Key support for retried writes
+
+Clients on flaky networks resend writes. A request to an opted-in route that
+carries an `Idempotency-Key` header runs once per (caller, route, key): its
+response (status, a few headers, body) is kept for a TTL and later requests
+with the same key get that response back without reaching auth, the database
+or the handler. A duplicate that arrives while the original is still running
+waits for it instead of running a second time. Reusing a key with a
+different body is rejected with 422.
+
+Stored responses live in a per-process LRU bounded by entry count and total
+bytes. 5xx and 429 responses are not stored, so those retries run again.
+Nothing is shared between worker processes: with several workers a retry
+only replays if it reaches the worker that handled the original.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Response headers worth replaying; the rest (date, content-length) are regenerated
+KEPT_HEADERS = (b"content-type", b"location", b"etag")
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status", "headers", "body", "expires_at")
+
+    def __init__(self, fingerprint: bytes, status: int, headers: list, body: bytes, expires_at: float):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers) + 64
+
+
+class IdempotencyStore:
+    """LRU of completed responses plus the keys currently being processed"""
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, StoredResponse] = OrderedDict()
+        self._bytes = 0
+        self._in_flight: dict[tuple, asyncio.Event] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, fingerprint: bytes, status: int, headers: list, body: bytes):
+        entry = StoredResponse(fingerprint, status, headers, body, time.monotonic() + self.ttl)
+        if entry.size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def claim(self, key: tuple) -> Optional[asyncio.Event]:
+        """Mark a key in flight; returns None if we own it, else the event to wait on"""
+        event = self._in_flight.get(key)
+        if event is None:
+            self._in_flight[key] = asyncio.Event()
+        return event
+
+    def release(self, key: tuple):
+        event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _error(status_code: int, detail: str) -> Response:
+    return JSONResponse({"detail": detail}, status_code=status_code)
+
+
+class IdempotencyMiddleware:
+    """
+    Replays stored responses for requests to `routes` ((method, path) pairs)
+    that carry an Idempotency-Key. `identify` maps the request headers to the
+    caller (e.g. the token subject); requests it returns None for pass through
+    untouched and fail in the handler's own auth.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        routes: Iterable[tuple[str, str]],
+        identify: Callable[[Headers], Optional[str]],
+        wait_seconds: float = 10.0
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.routes = frozenset(routes)
+        self.identify = identify
+        self.wait_seconds = wait_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        caller = self.identify(headers) if idempotency_key else None
+        if caller is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.blake2b(body, digest_size=16).digest()
+        key = (caller, scope["method"], scope["path"], idempotency_key)
+
+        while True:
+            stored = self.store.get(key)
+            if stored is not None:
+                await self._replay(stored, fingerprint, scope, receive, send)
+                return
+            in_flight = self.store.claim(key)
+            if in_flight is None:
+                break
+            try:
+                await asyncio.wait_for(in_flight.wait(), self.wait_seconds)
+            except asyncio.TimeoutError:
+                await _error(409, "A request with this Idempotency-Key is still in progress")(scope, receive, send)
+                return
+            # The original finished; replay it, or run ourselves if it wasn't stored
+
+        try:
+            await self._run(key, fingerprint, body, scope, send)
+        finally:
+            self.store.release(key)
+
+    async def _replay(self, stored: StoredResponse, fingerprint: bytes, scope: Scope, receive: Receive, send: Send):
+        if stored.fingerprint != fingerprint:
+            await _error(422, "Idempotency-Key was already used with a different request body")(scope, receive, send)
+            return
+        headers = stored.headers + [
+            (b"content-length", str(len(stored.body)).encode()),
+            (REPLAYED_HEADER.lower().encode(), b"true"),
+        ]
+        await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _run(self, key: tuple, fingerprint: bytes, body: bytes, scope: Scope, send: Send):
+        sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def capture_send(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and start is not None:
+                    self._store(key, fingerprint, start, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+
+    def _store(self, key: tuple, fingerprint: bytes, start: Message, body: bytes):
+        status_code = start["status"]
+        if status_code >= 500 or status_code == 429:
+            return
+        headers = [(name, value) for name, value in start.get("headers", []) if name.lower() in KEPT_HEADERS]
+        self.store.put(key, fingerprint, status_code, headers, body)
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
@@ -0,0 +1,365 @@
+"""
+On-demand sampling profiler for single requests
+
+A request is profiled when it carries a valid signed X-Profile header (minted
+by an admin with POST /profiles/token) or is picked by PROFILER_SAMPLE_RATE.
+While at least one profiled request is running, a background thread samples
+the Python stacks of all threads every PROFILER_INTERVAL_MS and keeps the
+samples that belong to it:
+- on the event loop thread, stacks that pass through the request's own
+  middleware frame (the loop runs other requests in between)
+- on threadpool threads, stacks whose work was started from the request
+  (anyio runs it in a copy of the request's context, which carries the
+  profile)
+
+Results are written to PROFILE_DIR as collapsed stacks ("a;b;c 12" lines,
+for flamegraph tools) plus a metadata file, keyed by a profile ID returned
+in the X-Profile-Id response header; the oldest are deleted beyond
+PROFILER_MAX_PROFILES. Writing happens in the threadpool, and listings come
+from an in-memory index of the metadata. With no profiled request the cost is a header lookup
+and, if sampling is configured, one random() per request.
+"""
+import contextvars
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_active_profile: contextvars.ContextVar = contextvars.ContextVar("active_profile", default=None)
+
+
+def sign_profile_token(secret: str, owner: str, expires_at: int) -> str:
+    """Header value that enables profiling for `owner` (a company ID) until expires_at (unix time)"""
+    payload = f"{owner}.{expires_at}"
+    signature = hmac.new(secret.encode(), f"profile:{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"{payload}.{signature}"
+
+
+def verify_profile_token(secret: str, value: str) -> Optional[str]:
+    """Owner of a valid, unexpired header value, else None"""
+    owner, _, rest = value.partition(".")
+    expires_at, _, signature = rest.partition(".")
+    if not owner or not expires_at.isdigit() or not signature:
+        return None
+    expected = sign_profile_token(secret, owner, int(expires_at)).rpartition(".")[2]
+    if not hmac.compare_digest(signature, expected) or int(expires_at) < time.time():
+        return None
+    return owner
+
+
+class Profile:
+    """Samples of one request"""
+
+    def __init__(self, owner: Optional[str], method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.status: Optional[int] = None
+        self.samples: Counter = Counter()
+        self.loop_thread = threading.get_ident()
+        self.root_frame = None  # The request's middleware frame on the loop thread
+
+    def metadata(self) -> dict:
+        return {
+            "profile_id": self.id,
+            "owner": self.owner,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "samples": sum(self.samples.values()),
+        }
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame, stop=None) -> str:
+    """Root-first "a;b;c" for a leaf frame, starting below `stop` if given"""
+    names = []
+    while frame is not None and frame is not stop:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _worker_context(frame) -> Optional[contextvars.Context]:
+    """The context a threadpool thread is running work in (anyio's worker loop holds it as `context`)"""
+    while frame is not None:
+        if frame.f_code.co_name == "run" and "anyio" in frame.f_code.co_filename:
+            context = frame.f_locals.get("context")
+            return context if isinstance(context, contextvars.Context) else None
+        frame = frame.f_back
+    return None
+
+
+def _passes_through(frame, target) -> bool:
+    while frame is not None:
+        if frame is target:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class Sampler:
+    """One background thread that samples while any profile is active"""
+
+    def __init__(self):
+        self.interval = 0.005
+        self._profiles: set[Profile] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+            if not profiles:
+                self._wakeup.clear()
+                # Park until the next profiled request; exit if none comes for a while
+                if not self._wakeup.wait(60):
+                    with self._lock:
+                        if not self._profiles:
+                            self._thread = None
+                            return
+                continue
+            self._sample(own, profiles)
+            time.sleep(self.interval)
+
+    def _sample(self, own: int, profiles: list[Profile]):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            context = None
+            for profile in profiles:
+                if thread_id == profile.loop_thread:
+                    if profile.root_frame is not None and _passes_through(frame, profile.root_frame):
+                        profile.samples["loop;" + _collapse(frame, stop=profile.root_frame)] += 1
+                    continue
+                if context is None:
+                    context = _worker_context(frame) or False
+                if context and context.get(_active_profile) is profile:
+                    profile.samples["threadpool;" + _collapse(frame)] += 1
+
+
+sampler = Sampler()
+
+
+class ProfileStore:
+    """
+    Profiles on disk: <id>.collapsed and <id>.json in one directory
+    The metadata is also indexed in memory. Other workers' profiles are picked
+    up when the directory's mtime changes. Methods do file IO, so call them
+    from a worker thread.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._index: dict[str, dict] = {}  # profile_id -> metadata
+        self._scanned_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def save(self, profile: Profile):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile.id, "collapsed"), "w") as f:
+            for stack, count in profile.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        metadata = profile.metadata()
+        with open(self._path(profile.id, "json"), "w") as f:
+            json.dump(metadata, f)
+        with self._lock:
+            self._refresh()
+            self._index[profile.id] = metadata
+            expired = self._expired()
+        self._remove(expired)
+
+    def for_owner(self, owner: str) -> list[dict]:
+        with self._lock:
+            self._refresh()
+            profiles = [metadata for metadata in self._index.values() if metadata.get("owner") == owner]
+        return sorted(profiles, key=lambda metadata: metadata["started_at"], reverse=True)
+
+    def load(self, profile_id: str, owner: str) -> Optional[tuple[dict, str]]:
+        """Metadata and collapsed stacks of an owner's profile, or None"""
+        if not profile_id.isalnum():
+            return None
+        with self._lock:
+            self._refresh()
+            metadata = self._index.get(profile_id)
+        if metadata is None or metadata.get("owner") != owner:
+            return None
+        try:
+            with open(self._path(profile_id, "collapsed")) as f:
+                return metadata, f.read()
+        except OSError:
+            return None
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _refresh(self):
+        """Sync the index with the directory if anything was added or removed there; caller holds the lock"""
+        try:
+            mtime = os.stat(self.directory).st_mtime
+        except FileNotFoundError:
+            self._index.clear()
+            self._scanned_mtime = None
+            return
+        if mtime == self._scanned_mtime:
+            return
+        on_disk = {name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json")}
+        for profile_id in set(self._index) - on_disk:
+            del self._index[profile_id]
+        for profile_id in on_disk - set(self._index):
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    self._index[profile_id] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        self._scanned_mtime = mtime
+
+    def _expired(self) -> list[str]:
+        """Drop the oldest profiles beyond max_profiles from the index; caller holds the lock"""
+        excess = len(self._index) - self.max_profiles
+        if excess <= 0:
+            return []
+        oldest = sorted(self._index, key=lambda profile_id: self._index[profile_id].get("started_at", ""))[:excess]
+        for profile_id in oldest:
+            del self._index[profile_id]
+        return oldest
+
+    def _remove(self, profile_ids: list[str]):
+        for profile_id in profile_ids:
+            for extension in ("json", "collapsed"):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
+
+
+def to_speedscope(metadata: dict, collapsed: str) -> dict:
+    """Speedscope "sampled" profile from collapsed stacks"""
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+    samples, weights = [], []
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        sample = []
+        for name in stack.split(";"):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(int(count))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": f"{metadata['method']} {metadata['path']} ({metadata['profile_id']})",
+            "unit": "none",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": metadata["profile_id"],
+        "exporter": "backend request profiler",
+    }
+
+
+class ProfilerMiddleware:
+    """
+    Profiles requests with a valid X-Profile header, or a random
+    `sample_rate` share of requests whose owner `identify` can tell
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        secret: str,
+        identify: Callable[[Headers], Optional[str]],
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.identify = identify
+        self.sample_rate = sample_rate
+        sampler.interval = interval_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        owner = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                owner = verify_profile_token(self.secret, value.decode("latin-1"))
+                break
+        if owner is None and self.sample_rate and random.random() < self.sample_rate:
+            owner = self.identify(Headers(scope=scope))
+        if owner is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(owner, scope["method"], scope["path"])
+        profile.root_frame = sys._getframe()
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile.id.encode())]
+            await send(message)
+
+        token = _active_profile.set(profile)
+        sampler.add(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            sampler.remove(profile)
+            _active_profile.reset(token)
+            # Off the event loop: the response is out, but other requests are waiting
+            await run_in_threadpool(self.store.save, profile)
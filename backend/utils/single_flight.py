@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing of identical reads
+
+Routes opt in by running their expensive part through SingleFlight.run with
+a key of (route, tenant, normalized parameters). The first request for a key
+runs it in the threadpool; identical requests that arrive while it is still
+running wait for the same result instead of querying again. A follower that
+waits longer than the timeout stops waiting and runs the work itself.
+
+Results are shared between requests, so they must be immutable (encoded
+bodies) and the key must hold everything the result depends on, including
+the tenant. Errors are shared too: every waiter sees the leader's exception.
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Hashable
+from starlette.concurrency import run_in_threadpool
+
+
+class FlightStats:
+    """Per-route counts of executed and coalesced requests"""
+
+    FIELDS = ("executed", "coalesced", "timed_out")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, int]] = {}
+
+    def add(self, route: str, field: str):
+        with self._lock:
+            counts = self._routes.get(route)
+            if counts is None:
+                counts = self._routes[route] = dict.fromkeys(self.FIELDS, 0)
+            counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {route: dict(counts) for route, counts in self._routes.items()}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+class SingleFlight:
+    """In-flight calls of this event loop, by key"""
+
+    def __init__(self):
+        self.stats = FlightStats()
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._loop = None
+
+    async def run(self, route: str, key: Hashable, func: Callable[[], Any], timeout: float, enabled: bool = True) -> Any:
+        """func() in the threadpool, shared with identical calls already in flight"""
+        if not enabled:
+            return await run_in_threadpool(func)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._calls = {}
+            self._loop = loop
+
+        key = (route, key)
+        call = self._calls.get(key)
+        if call is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(call), timeout)
+            except asyncio.TimeoutError:
+                self.stats.add(route, "timed_out")
+                return await run_in_threadpool(func)
+            self.stats.add(route, "coalesced")
+            return result
+
+        # A task of its own, so the call finishes for the followers even if the leader's request is cancelled
+        call = self._calls[key] = asyncio.ensure_future(run_in_threadpool(func))
+        call.add_done_callback(lambda _: self._forget(key, call))
+        self.stats.add(route, "executed")
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()  # Mark retrieved so an unawaited failure isn't logged again
+
+
+def query_key(**params: Any) -> tuple:
+    """Key part from parsed (already normalized) parameters, independent of their order; None is dropped"""
+    return tuple(sorted((name, value) for name, value in params.items() if value is not None))
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,216 @@
+"""
+Two-tier cache for encoded read models, invalidated by tag
+
+Entries are JSON bodies keyed by a string and tagged (e.g. with their
+company and employee). Every tag has a version counter in the shared tier;
+an entry remembers the versions of its tags when it was built and is only
+served while they are unchanged. Invalidating a tag bumps its counter, which
+every worker sees on its next lookup, so no entry has to be found and
+deleted. The "all" tag is on every entry and drops everything at once.
+
+Lookups go to a per-process LRU first, then to the shared tier:
+- MemoryBackend keeps tag versions and entries in this process. It is the
+  default and the stand-in for tests; with several workers an invalidation
+  only reaches the worker that made it, and the TTL bounds the rest.
+- RedisBackend (CACHE_REDIS_URL, needs `redis`) shares both between workers.
+
+Versions are read before an entry is built, so a write that commits while
+it is being built leaves it stamped with the old version, never the new one.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from config import settings
+from utils.ttl_cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # redis is optional, the cache stays per process without it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+ALL_TAG = "all"
+
+
+class MemoryBackend:
+    """Shared tier stand-in: tag versions and entries in this process"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._versions: dict[str, int] = {}
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self, tags: list[str]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: list[str]):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared tier in Redis"""
+
+    def __init__(self, url: str, prefix: str = "read-cache:"):
+        if redis is None:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def versions(self, tags: list[str]) -> list[int]:
+        values = self._client.mget([self.prefix + "tag:" + tag for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, tags: list[str]):
+        pipeline = self._client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(self.prefix + "tag:" + tag)
+        pipeline.execute()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+def _stamp(versions: list[int]) -> bytes:
+    return ",".join(map(str, versions)).encode()
+
+
+class CacheStats:
+    """Per-route lookup outcomes"""
+
+    FIELDS = ("local_hits", "shared_hits", "misses")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, int]] = {}
+
+    def add(self, route: str, field: str):
+        with self._lock:
+            counts = self._routes.get(route)
+            if counts is None:
+                counts = self._routes[route] = dict.fromkeys(self.FIELDS, 0)
+            counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for route, counts in self._routes.items():
+                lookups = sum(counts.values())
+                hits = counts["local_hits"] + counts["shared_hits"]
+                result[route] = {**counts, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+class TaggedCache:
+    """Per-process LRU in front of a shared backend, with tag versions for invalidation"""
+
+    def __init__(self):
+        self.stats = CacheStats()
+        self._backend = None
+        self._local: Optional[TTLCache] = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.CACHE_REDIS_URL:
+                self._backend = RedisBackend(settings.CACHE_REDIS_URL)
+            else:
+                self._backend = MemoryBackend()
+        return self._backend
+
+    @property
+    def local(self) -> TTLCache:
+        if self._local is None:
+            self._local = TTLCache(settings.READ_CACHE_LOCAL_SIZE, settings.READ_CACHE_TTL_SECONDS)
+        return self._local
+
+    def get_or_build(self, route: str, key: str, tags: Iterable[str], build: Callable[[], bytes]) -> bytes:
+        """Cached body for `key`, or build() stored under the current versions of `tags`"""
+        if not settings.READ_CACHE_ENABLED:
+            return build()
+        tags = [ALL_TAG, *tags]
+        try:
+            stamp = _stamp(self.backend.versions(tags))
+        except Exception:
+            logger.exception("Read cache unavailable")
+            return build()
+
+        entry = self.local.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.stats.add(route, "local_hits")
+            return entry[1]
+
+        try:
+            shared = self.backend.get(key)
+        except Exception:
+            logger.exception("Read cache unavailable")
+            shared = None
+        if shared is not None:
+            shared_stamp, _, body = shared.partition(b"\n")
+            if shared_stamp == stamp:
+                self.local.set(key, (stamp, body))
+                self.stats.add(route, "shared_hits")
+                return body
+
+        self.stats.add(route, "misses")
+        body = build()
+        self.local.set(key, (stamp, body))
+        try:
+            self.backend.set(key, stamp + b"\n" + body, settings.READ_CACHE_TTL_SECONDS)
+        except Exception:
+            logger.exception("Read cache unavailable")
+        return body
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying one of the tags, in all workers; call after commit"""
+        if not tags:
+            return
+        try:
+            self.backend.bump(list(dict.fromkeys(tags)))
+        except Exception:
+            logger.exception("Read cache invalidation failed for %s", tags)
+
+    def invalidate_all(self):
+        self.invalidate(ALL_TAG)
+
+    def clear(self):
+        self.local.clear()
+        self.backend.clear()
+        self.stats.reset()
@@ -0,0 +1,217 @@
+"""
+Per-request phase timers
+
+TimingMiddleware starts a RequestTimings for every HTTP request and keeps it
+in a context variable, which anyio copies into threadpool calls, so code
+anywhere in the request can add to it:
+- TimedRoute (the route class of every router) splits the route into
+  dependency resolution (auth, session), the endpoint itself and response
+  serialization
+- `timed(phase)` around auth lookups and password hashing
+- engine events (database/database.py) add SQL time and query count
+
+The breakdown goes out as a Server-Timing header, which browser devtools
+show, and as one JSON access log line per request on the "access" logger.
+DB and auth time are part of the route phases, not in addition to them.
+Callers that haven't authenticated (auth dependencies call
+mark_authenticated()) only get the total: phases such as bcrypt on a login
+would tell them whether an account exists.
+"""
+import functools
+import inspect
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+access_logger = logging.getLogger("access")
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Seconds spent per phase in one request"""
+
+    __slots__ = ("start", "phases", "db_queries", "endpoint_start", "endpoint_end", "authenticated")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.db_queries = 0
+        self.endpoint_start: Optional[float] = None
+        self.endpoint_end: Optional[float] = None
+        self.authenticated = False
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self, total: float) -> bytes:
+        """Server-Timing value, durations in milliseconds; phases only for authenticated callers"""
+        parts = []
+        for phase, seconds in self.phases.items() if self.authenticated else ():
+            if phase == "db":
+                parts.append(f'db;dur={seconds * 1000:.1f};desc="queries={self.db_queries}"')
+            else:
+                parts.append(f"{phase};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts).encode()
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to `phase` of the current request, if any"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+def mark_authenticated():
+    """The current request's caller is authenticated and may see the phase breakdown"""
+    timings = _current.get()
+    if timings is not None:
+        timings.authenticated = True
+
+
+def add_db_time(seconds: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.add("db", seconds)
+        timings.db_queries += 1
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Record when the endpoint starts and returns (FastAPI still sees its signature)"""
+    if getattr(endpoint, "_timed", False):
+        return endpoint  # Already wrapped; include_router copies routes with their endpoints
+
+    def started() -> Optional[RequestTimings]:
+        timings = _current.get()
+        if timings is not None:
+            timings.endpoint_start = time.perf_counter()
+        return timings
+
+    def finished(timings: Optional[RequestTimings]):
+        if timings is not None:
+            timings.endpoint_end = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = started()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                finished(timings)
+    else:
+        # Sync endpoints stay sync so FastAPI keeps running them in the threadpool
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = started()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                finished(timings)
+
+    wrapper._timed = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Route that reports dependency, endpoint and serialization time"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timings = _current.get()
+                if timings is not None:
+                    if timings.endpoint_start is None:
+                        # A dependency answered (e.g. 401) before the endpoint ran
+                        timings.add("deps", time.perf_counter() - start)
+                    else:
+                        end = timings.endpoint_end or time.perf_counter()
+                        timings.add("deps", timings.endpoint_start - start)
+                        timings.add("handler", end - timings.endpoint_start)
+                        timings.add("serialize", time.perf_counter() - end)
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    """Server-Timing header and a structured access log line for every HTTP request"""
+
+    def __init__(self, app: ASGIApp, access_log: bool = True) -> None:
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = 500
+        size = 0
+
+        async def send_with_timing(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - timings.start
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timings.header(total))]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if self.access_log:
+                self._log(scope, timings, status, size)
+
+    def _log(self, scope: Scope, timings: RequestTimings, status: int, size: int):
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        client = scope.get("client")
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "bytes": size,
+            "duration_ms": round((time.perf_counter() - timings.start) * 1000, 1),
+            **{f"{phase}_ms": round(seconds * 1000, 1) for phase, seconds in timings.phases.items()},
+            "db_queries": timings.db_queries,
+            "client": client[0] if client else None,
+        }
+        access_logger.info(json.dumps(record))
+
+
+def configure_access_log():
+    """Print access log lines to stderr unless logging is already configured for them"""
+    if access_logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    access_logger.addHandler(handler)
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
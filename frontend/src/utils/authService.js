@@ -18,10 +18,11 @@ export const authService = {
         : { id, password };
       
       const response = await api.post(endpoint, requestBody);
-      const { access_token, token_type } = response.data;
+      const { access_token, refresh_token, token_type } = response.data;
       
-      // Store token
+      // Store tokens
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       localStorage.setItem('token_type', token_type);
       
       // Create user object with role
@@ -77,9 +78,17 @@ export const authService = {
     }
   },
 
-  // Logout function
-  logout() {
+  // Logout function - revokes the tokens on the server, then clears them locally
+  async logout() {
+    const user = this.getCurrentUser();
+    const endpoint = user?.role === 'admin' ? '/auth/company/logout' : '/auth/employee/logout';
+    try {
+      await api.post(endpoint, { refresh_token: localStorage.getItem('refresh_token') });
+    } catch (error) {
+      // The tokens are dropped locally either way
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     window.location.href = '/login';
   },